@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
+from django.db.models import F
+from apps.common.queries import display_name
+from apps.common.serializers import FileUrlField, RowSerializer
 
 User = get_user_model()
 
@@ -37,6 +40,25 @@ class UserSerializer(serializers.ModelSerializer):
         return obj.zone.name if obj.zone else None
 
 
+class UserListSerializer(RowSerializer):
+    """UserSerializer's output from UserListSerializer.rows(queryset): one query per page."""
+    id = serializers.IntegerField()
+    username = serializers.CharField()
+    email = serializers.CharField()
+    first_name = serializers.CharField()
+    last_name = serializers.CharField()
+    full_name = serializers.CharField()
+    role = serializers.CharField()
+    phone = serializers.CharField()
+    zone = serializers.IntegerField()
+    zone_name = serializers.CharField()
+    avatar = FileUrlField(User._meta.get_field('avatar'))
+
+    @classmethod
+    def rows(cls, queryset):
+        return cls.values(queryset, full_name=display_name(), zone_name=F('zone__name'))
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=6)
     password_confirm = serializers.CharField(write_only=True)
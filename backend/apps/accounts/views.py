@@ -4,7 +4,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from .serializers import (
-    CustomTokenObtainPairSerializer, UserSerializer,
+    CustomTokenObtainPairSerializer, UserSerializer, UserListSerializer,
     UserCreateSerializer, UserUpdateSerializer
 )
 from .permissions import IsAdminUser
@@ -38,15 +38,15 @@ class MeView(APIView):
 
 
 class UserListView(generics.ListAPIView):
-    serializer_class = UserSerializer
+    serializer_class = UserListSerializer
     permission_classes = [IsAdminUser]
 
     def get_queryset(self):
-        queryset = User.objects.select_related('zone').all()
+        queryset = User.objects.all()
         role = self.request.query_params.get('role')
         if role:
             queryset = queryset.filter(role=role)
-        return queryset
+        return UserListSerializer.rows(queryset)
 
 
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
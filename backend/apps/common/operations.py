@@ -0,0 +1,22 @@
+"""
+Migration operations shared by the apps.
+
+AddIndexConcurrently builds the index with CREATE INDEX CONCURRENTLY on
+PostgreSQL, so adding an index to a large table doesn't block writes to it
+while it builds. Other databases (SQLite in tests and local development)
+get a plain AddIndex. The migration needs atomic = False.
+"""
+from django.contrib.postgres import operations as postgres
+from django.db.migrations import AddIndex
+
+
+class AddIndexConcurrently(postgres.AddIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
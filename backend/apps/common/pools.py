@@ -0,0 +1,18 @@
+"""
+Process pools for CPU-bound fan-out (PDF report sections, detection chips).
+
+The work runs in Celery tasks, and a prefork worker child is a daemonic
+process: multiprocessing (and so ProcessPoolExecutor) refuses to start
+children there. billiard, Celery's fork of multiprocessing, does not, so
+the pool comes from billiard in the worker and everywhere else alike:
+
+    parts = process_map(render_section, sections, workers=4)
+"""
+
+
+def process_map(fn, items, workers, initializer=None, initargs=()):
+    """[fn(item) for item in items], computed on `workers` processes."""
+    from billiard.pool import Pool
+
+    with Pool(processes=workers, initializer=initializer, initargs=initargs) as pool:
+        return pool.map(fn, items)
@@ -0,0 +1,22 @@
+"""
+SQL expressions for display fields, so list endpoints and exports can
+read names with the rows instead of loading the related objects.
+
+    Tree.objects.annotate(planted_by_name=display_name('planted_by'))
+"""
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
+
+
+def _path(relation, field):
+    return f'{relation}__{field}' if relation else field
+
+
+def full_name(relation=None):
+    """SQL equivalent of User.get_full_name(); '' when the relation is null."""
+    return Trim(Concat(_path(relation, 'first_name'), Value(' '), _path(relation, 'last_name')))
+
+
+def display_name(relation=None):
+    """`user.get_full_name() or user.username`; NULL when the relation is null."""
+    return Coalesce(NullIf(full_name(relation), Value('')), F(_path(relation, 'username')))
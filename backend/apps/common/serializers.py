@@ -0,0 +1,57 @@
+"""
+Read-only serializers over values() rows.
+
+List endpoints fetch just the columns they return, with display names
+annotated in SQL (see queries.py), and hand the dicts to a RowSerializer:
+no model instances, no related-object lookups, and each field only
+formats a value that is already there.
+
+    class TreeRowSerializer(RowSerializer):
+        id = serializers.IntegerField()
+        zone_name = serializers.CharField()
+
+    queryset = TreeRowSerializer.values(Tree.objects.all(), zone_name=F('zone__name'))
+"""
+from functools import cached_property
+
+from rest_framework import serializers
+
+
+class RowSerializer(serializers.Serializer):
+    """
+    Every field reads row[field.source]; None stays None. Fields with
+    source='*' (SerializerMethodField) get the whole row.
+    """
+
+    @cached_property
+    def _row_fields(self):
+        return [(field.field_name, field.source, field) for field in self._readable_fields]
+
+    def to_representation(self, row):
+        data = {}
+        for name, source, field in self._row_fields:
+            value = row if source == '*' else row[source]
+            data[name] = None if value is None else field.to_representation(value)
+        return data
+
+    @classmethod
+    def values(cls, queryset, *extra, **annotations):
+        """`queryset` annotated and reduced to the columns this serializer (and `extra`) reads."""
+        columns = [f.source for f in cls().fields.values() if f.source != '*']
+        return queryset.annotate(**annotations).values(*columns, *extra)
+
+
+class FileUrlField(serializers.Field):
+    """URL of a stored file from its name, as ImageField/FileField would render it."""
+
+    def __init__(self, model_field, **kwargs):
+        self.storage = model_field.storage
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, name):
+        if not name:
+            return None
+        url = self.storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
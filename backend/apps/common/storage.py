@@ -0,0 +1,10 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+
+def export_storage():
+    """Export files aren't images; Cloudinary keeps them in its raw-file storage."""
+    if settings.USE_CLOUDINARY:
+        from cloudinary_storage.storage import RawMediaCloudinaryStorage
+        return RawMediaCloudinaryStorage()
+    return default_storage
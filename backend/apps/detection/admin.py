@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import DetectionJob
+
+
+@admin.register(DetectionJob)
+class DetectionJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'created_by', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status']
+    readonly_fields = ['result', 'error', 'attempts', 'created_at', 'started_at', 'finished_at']
@@ -0,0 +1,55 @@
+"""
+Client for the Hugging Face inference API (object detection).
+The URL is configurable (HF_INFERENCE_URL) so the local stand-in server in
+testing.py can be used in development and tests.
+"""
+import json
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+
+
+class ModelLoading(Exception):
+    """Upstream replied 503 while the model is cold-starting."""
+
+    def __init__(self, estimated_time=None):
+        super().__init__('Model is loading')
+        self.estimated_time = estimated_time
+
+
+class UpstreamError(Exception):
+    """Any other non-success reply; retryable for network-level failures."""
+
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def detect_objects(image_bytes, mime_type='image/jpeg'):
+    """
+    POST an image and return the decoded list of detections.
+    image_bytes may be bytes or a file-like buffer (an mmap or BytesIO
+    positioned at the start), which is streamed rather than copied.
+    """
+    size = image_bytes.getbuffer().nbytes if hasattr(image_bytes, 'getbuffer') else len(image_bytes)
+    headers = {'Content-Type': mime_type, 'Content-Length': str(size)}
+    if settings.HF_TOKEN:
+        headers['Authorization'] = f'Bearer {settings.HF_TOKEN}'
+
+    req = urllib.request.Request(settings.HF_INFERENCE_URL, data=image_bytes,
+                                 headers=headers, method='POST')
+    try:
+        with urllib.request.urlopen(req, timeout=settings.HF_INFERENCE_TIMEOUT) as resp:
+            return json.loads(resp.read().decode())
+    except urllib.error.HTTPError as e:
+        body = e.read().decode(errors='replace')
+        if e.code == 503:
+            try:
+                estimated = json.loads(body).get('estimated_time')
+            except (ValueError, AttributeError):
+                estimated = None
+            raise ModelLoading(estimated)
+        raise UpstreamError(f'HF API error {e.code}: {body}', retryable=e.code >= 500)
+    except (urllib.error.URLError, TimeoutError) as e:
+        raise UpstreamError(f'HF API unreachable: {e}', retryable=True)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detectionjob',
+            name='engine',
+            field=models.CharField(choices=[('remote', 'Remote DETR model'), ('local', 'Local vegetation index')], default='remote', max_length=20),
+        ),
+    ]
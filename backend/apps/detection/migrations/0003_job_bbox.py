@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0002_job_engine'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detectionjob',
+            name='bbox',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='detectionjob',
+            name='zoom',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
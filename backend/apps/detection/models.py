@@ -0,0 +1,52 @@
+from django.db import models
+from django.conf import settings
+
+
+class DetectionJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('retrying', 'Retrying'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='detection_jobs'
+    )
+    ENGINE_CHOICES = [
+        ('remote', 'Remote DETR model'),
+        ('local', 'Local vegetation index'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    engine = models.CharField(max_length=20, choices=ENGINE_CHOICES, default='remote')
+
+    # Input: either an uploaded image (removed once the job has finished)
+    # or a bbox [min_lng, min_lat, max_lng, max_lat] fetched from the tile source
+    image = models.FileField(upload_to='detection_jobs/%Y/%m/', blank=True, null=True)
+    mime_type = models.CharField(max_length=50, default='image/jpeg')
+    bbox = models.JSONField(null=True, blank=True)
+    zoom = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    # Output
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Detection job #{self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
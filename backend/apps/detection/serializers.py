@@ -0,0 +1,69 @@
+import base64
+import binascii
+import mimetypes
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from rest_framework import serializers
+from apps.trees import geo
+from .models import DetectionJob
+from .tiles import count_tiles
+
+
+class DetectionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DetectionJob
+        fields = ['id', 'status', 'engine', 'mime_type', 'bbox', 'zoom', 'attempts', 'result', 'error',
+                  'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+
+class DetectionJobCreateSerializer(serializers.Serializer):
+    """Takes either image_base64 or a bbox (fetched server-side from the tile source)."""
+    image_base64 = serializers.CharField(required=False)
+    mime_type = serializers.CharField(required=False, default='image/jpeg')
+    bbox = serializers.JSONField(required=False)
+    zoom = serializers.IntegerField(required=False, min_value=1, max_value=geo.MAX_ZOOM)
+    engine = serializers.ChoiceField(choices=DetectionJob.ENGINE_CHOICES, required=False)
+
+    def validate_image_base64(self, value):
+        try:
+            return base64.b64decode(value, validate=True)
+        except (binascii.Error, ValueError):
+            raise serializers.ValidationError('Invalid base64 image')
+
+    def validate_bbox(self, value):
+        # 'min_lng,min_lat,max_lng,max_lat' or the same four numbers as a list
+        if isinstance(value, (list, tuple)):
+            value = ','.join(str(v) for v in value)
+        try:
+            return list(geo.parse_bbox(value))
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, data):
+        if ('image_base64' in data) == ('bbox' in data):
+            raise serializers.ValidationError('Provide either image_base64 or bbox')
+        if 'bbox' in data:
+            data['zoom'] = data.get('zoom') or settings.SATELLITE_TILE_ZOOM
+            tiles = count_tiles(data['bbox'], data['zoom'])
+            if tiles > settings.SATELLITE_MAX_TILES:
+                raise serializers.ValidationError(
+                    f'Area too large: {tiles} tiles at zoom {data["zoom"]} '
+                    f'(max {settings.SATELLITE_MAX_TILES})'
+                )
+        return data
+
+    def create(self, validated_data):
+        job = DetectionJob(
+            created_by=self.context['request'].user,
+            mime_type=validated_data['mime_type'],
+            engine=validated_data.get('engine') or settings.DETECTION_ENGINE,
+            bbox=validated_data.get('bbox'),
+            zoom=validated_data.get('zoom'),
+        )
+        if 'image_base64' in validated_data:
+            extension = mimetypes.guess_extension(job.mime_type) or ''
+            job.image.save(f'upload{extension}', ContentFile(validated_data['image_base64']), save=False)
+        job.save()
+        return job
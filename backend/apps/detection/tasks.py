@@ -0,0 +1,84 @@
+import random
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+
+def retry_delay(attempt, estimated_time=None):
+    """Exponential backoff with jitter, stretched to the model's own warm-up estimate."""
+    delay = settings.DETECTION_RETRY_BASE_DELAY * (2 ** attempt)
+    if estimated_time:
+        delay = max(delay, float(estimated_time))
+    return min(delay, settings.DETECTION_RETRY_MAX_DELAY) * random.uniform(0.8, 1.2)
+
+
+@shared_task(bind=True, max_retries=None)
+def run_detection_job(self, job_id):
+    import numpy as np
+    from PIL import Image
+    from .huggingface import ModelLoading, UpstreamError, detect_objects
+    from .models import DetectionJob
+    from .tiles import stitch_bbox
+    from .tiling import detect_tiled
+    from .uploads import open_mapped
+
+    job = DetectionJob.objects.get(pk=job_id)
+    if job.is_finished:
+        return job.status
+
+    job.status = 'running'
+    job.attempts += 1
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=['status', 'attempts', 'started_at'])
+
+    try:
+        if job.bbox:
+            mosaic = stitch_bbox(job.bbox, job.zoom)
+            result = detect_tiled(mosaic.image, job.engine)
+            for d in result:
+                box = d['box']
+                lng, lat = mosaic.to_lnglat((box['xmin'] + box['xmax']) / 2, (box['ymin'] + box['ymax']) / 2)
+                d['latitude'] = round(lat, 7)
+                d['longitude'] = round(lng, 7)
+        else:
+            with open_mapped(job.image) as buffer:
+                picture = Image.open(buffer)
+                if job.engine == 'remote' and max(picture.size) <= settings.DETECTION_CHIP_SIZE:
+                    # Fits in one request: forward the upload untouched
+                    buffer.seek(0)
+                    result = detect_objects(buffer, job.mime_type)
+                    result = result if isinstance(result, list) else []
+                else:
+                    result = detect_tiled(np.asarray(picture.convert('RGB')), job.engine)
+    except (ModelLoading, UpstreamError) as e:
+        retryable = isinstance(e, ModelLoading) or e.retryable
+        if retryable and job.attempts < settings.DETECTION_MAX_ATTEMPTS:
+            job.status = 'retrying'
+            job.error = str(e)
+            job.save(update_fields=['status', 'error'])
+            countdown = retry_delay(job.attempts - 1, getattr(e, 'estimated_time', None))
+            raise self.retry(countdown=countdown, exc=e)
+        return _finish(job, 'failed', error=str(e))
+    except Exception as e:
+        return _finish(job, 'failed', error=str(e))
+
+    return _finish(job, 'completed', result=result)
+
+
+def _finish(job, status, result=None, error=''):
+    job.status = status
+    job.result = result
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    if job.image:
+        job.image.delete(save=True)
+    return status
+
+
+@shared_task
+def evict_tile_cache():
+    """Trim the satellite tile cache to SATELLITE_TILE_CACHE_MAX_MB (hourly, see config/celery.py)."""
+    from .tiles import TileCache
+    return TileCache().evict()
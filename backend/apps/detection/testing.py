@@ -0,0 +1,79 @@
+"""
+A local stand-in for the Hugging Face inference endpoint, to exercise the
+remote engine and the job retries without network access or a token:
+
+    with InferenceStandIn(responses=[503]) as server, \\
+            override_settings(HF_INFERENCE_URL=server.url):
+        get_engine('remote').detect(image)
+
+    server.requests      # [(content type, body size, status)]
+
+`responses` are status codes for the next requests before it starts
+answering with `detections`. A 503 carries the cold-start body the real
+API sends, {"error": ..., "estimated_time": `estimated_time`}.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DETECTIONS = [
+    {'label': 'tree', 'score': 0.91, 'box': {'xmin': 4, 'ymin': 6, 'xmax': 30, 'ymax': 34}},
+]
+
+
+class InferenceStandIn:
+    def __init__(self, responses=(), detections=DETECTIONS, estimated_time=20.0, latency=0):
+        self.responses = list(responses)
+        self.detections = detections
+        self.estimated_time = estimated_time
+        self.latency = latency
+        self.requests = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.block_on_close = False
+        self.url = f'http://127.0.0.1:{self.server.server_port}/models/stand-in'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reply(self, content_type, body):
+        """(status, payload) for one request."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            status = self.responses.pop(0) if self.responses else 200
+            if status == 200:
+                payload = self.detections
+            elif status == 503:
+                payload = {'error': 'Model stand-in is currently loading', 'estimated_time': self.estimated_time}
+            else:
+                payload = {'error': f'Scripted {status}'}
+            self.requests.append((content_type, len(body), status))
+            return status, payload
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                status, payload = stand_in.reply(self.headers.get('Content-Type'), body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,101 @@
+import io
+import shutil
+import tempfile
+
+import numpy as np
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .engines import get_engine
+from .huggingface import ModelLoading, UpstreamError
+from .models import DetectionJob
+from .tasks import run_detection_job
+from .testing import DETECTIONS, InferenceStandIn
+
+
+def green_image(size=64):
+    image = np.zeros((size, size, 3), dtype=np.uint8)
+    image[..., 1] = 160
+    return image
+
+
+def jpeg_bytes(size=64):
+    buffer = io.BytesIO()
+    Image.fromarray(green_image(size)).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class RemoteEngineTests(TestCase):
+    def test_returns_the_endpoints_detections(self):
+        with InferenceStandIn() as server, override_settings(HF_INFERENCE_URL=server.url):
+            detections = get_engine('remote').detect(green_image())
+        self.assertEqual(detections, DETECTIONS)
+        self.assertEqual(len(server.requests), 1)
+        content_type, size, status = server.requests[0]
+        self.assertEqual((content_type, status), ('image/jpeg', 200))
+        self.assertGreater(size, 0)
+
+    def test_cold_start_503_carries_the_estimated_time(self):
+        with InferenceStandIn(responses=[503], estimated_time=12.5) as server, \
+                override_settings(HF_INFERENCE_URL=server.url):
+            with self.assertRaises(ModelLoading) as caught:
+                get_engine('remote').detect(green_image())
+        self.assertEqual(caught.exception.estimated_time, 12.5)
+
+    def test_server_errors_are_retryable_and_client_errors_are_not(self):
+        with InferenceStandIn(responses=[500, 400]) as server, override_settings(HF_INFERENCE_URL=server.url):
+            engine = get_engine('remote')
+            with self.assertRaises(UpstreamError) as server_error:
+                engine.detect(green_image())
+            with self.assertRaises(UpstreamError) as client_error:
+                engine.detect(green_image())
+        self.assertTrue(server_error.exception.retryable)
+        self.assertFalse(client_error.exception.retryable)
+
+
+class DetectionJobRetryTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def make_job(self):
+        job = DetectionJob(engine='remote', mime_type='image/jpeg')
+        job.image.save('chip.jpg', ContentFile(jpeg_bytes()), save=False)
+        job.save()
+        return job
+
+    def run_job(self, job, responses, **settings):
+        # Eager apply() runs a retried task again straight away
+        with InferenceStandIn(responses=responses) as server, \
+                override_settings(HF_INFERENCE_URL=server.url, **settings):
+            run_detection_job.apply(args=[job.id])
+        job.refresh_from_db()
+        return server
+
+    def test_cold_start_is_retried_until_the_model_answers(self):
+        job = self.make_job()
+        server = self.run_job(job, [503, 502])
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.result, DETECTIONS)
+        self.assertEqual(job.attempts, 3)
+        self.assertEqual([status for _, _, status in server.requests], [503, 502, 200])
+        self.assertFalse(job.image)
+
+    def test_gives_up_after_max_attempts(self):
+        job = self.make_job()
+        server = self.run_job(job, [503, 503, 503], DETECTION_MAX_ATTEMPTS=2)
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(len(server.requests), 2)
+        self.assertIn('loading', job.error)
+
+    def test_client_error_fails_without_retrying(self):
+        job = self.make_job()
+        server = self.run_job(job, [422])
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(len(server.requests), 1)
+        self.assertIn('422', job.error)
@@ -0,0 +1,312 @@
+"""
+Server-side satellite imagery for detection jobs.
+
+A tile source is picked from settings.SATELLITE_TILE_SOURCE:
+
+    https://.../{z}/{y}/{x}     XYZ tile server (ESRI World Imagery by default)
+    /data/ward.mbtiles          MBTiles file (SQLite, TMS row order)
+    /data/tiles                 directory laid out as z/x/y.png|jpg|jpeg
+
+Fetched tiles go through TileCache, a content-addressed on-disk cache:
+
+    <root>/objects/ab/abcdef...     tile bytes, named by SHA-256
+    <root>/index/<source>/z/x/y     digest of the tile at z/x/y
+
+Identical tiles (open water, blank edges) are stored once. Reading a tile
+touches its blob, and evict() removes least-recently-used blobs once the
+cache grows past its size limit. An index entry whose blob is gone is a miss.
+Fetches only call evict() when the process's running byte count passes the
+limit, so the directory isn't scanned on every miss; the evict_tile_cache
+task catches growth from other processes every hour.
+
+stitch_bbox() fetches every tile in a bbox in parallel and crops the mosaic
+to the bbox. The returned Mosaic converts pixels back to lng/lat.
+"""
+import hashlib
+import io
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from apps.trees import geo
+from .huggingface import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+
+# ── Sources ───────────────────────────────────────────────────
+
+class TileSource:
+    def __init__(self, spec):
+        self.spec = spec
+        # Namespaces this source's entries in the cache index
+        self.key = hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+    def fetch(self, z, x, y):
+        """Raw tile bytes, or None if the source has no tile there."""
+        raise NotImplementedError
+
+
+class HTTPTileSource(TileSource):
+    def fetch(self, z, x, y):
+        url = self.spec.format(z=z, x=x, y=y)
+        req = urllib.request.Request(url, headers={'User-Agent': 'TreeTracker/1.0'})
+        try:
+            with urllib.request.urlopen(req, timeout=settings.SATELLITE_TILE_TIMEOUT) as resp:
+                return resp.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise UpstreamError(f'Tile server error {e.code} for {z}/{x}/{y}', retryable=e.code >= 500)
+        except (urllib.error.URLError, TimeoutError) as e:
+            raise UpstreamError(f'Tile server unreachable: {e}', retryable=True)
+
+
+class DirectoryTileSource(TileSource):
+    EXTENSIONS = ('png', 'jpg', 'jpeg')
+
+    def fetch(self, z, x, y):
+        for ext in self.EXTENSIONS:
+            path = Path(self.spec) / str(z) / str(x) / f'{y}.{ext}'
+            if path.exists():
+                return path.read_bytes()
+        return None
+
+
+class MBTilesSource(TileSource):
+    """MBTiles stores rows bottom-up (TMS); flip y from XYZ."""
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(f'file:{self.spec}?mode=ro', uri=True)
+        return conn
+
+    def fetch(self, z, x, y):
+        row = self._connection().execute(
+            'SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?',
+            (z, x, (2 ** z - 1) - y),
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+
+def get_tile_source(spec=None):
+    spec = spec or settings.SATELLITE_TILE_SOURCE
+    if spec.startswith(('http://', 'https://')):
+        return HTTPTileSource(spec)
+    if spec.endswith('.mbtiles'):
+        return MBTilesSource(spec)
+    return DirectoryTileSource(spec)
+
+
+# ── Cache ─────────────────────────────────────────────────────
+
+class TileCache:
+    # Evict down to this share of max_bytes so we don't evict on every write
+    LOW_WATERMARK = 0.9
+
+    # Bytes stored per cache root as far as this process knows: one scan,
+    # then kept up to date by put() and evict()
+    _sizes = {}
+    _sizes_lock = threading.Lock()
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = Path(root or settings.SATELLITE_TILE_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.SATELLITE_TILE_CACHE_MAX_MB * 1024 * 1024
+
+    def _index_path(self, source_key, z, x, y):
+        return self.root / 'index' / source_key / str(z) / str(x) / str(y)
+
+    def _blob_path(self, digest):
+        return self.root / 'objects' / digest[:2] / digest
+
+    def get(self, source_key, z, x, y):
+        index = self._index_path(source_key, z, x, y)
+        try:
+            digest = index.read_text().strip()
+            blob = self._blob_path(digest)
+            data = blob.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(blob)
+        return data
+
+    def put(self, source_key, z, x, y, data):
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(digest)
+        if blob.exists():
+            os.utime(blob)
+        else:
+            _atomic_write(blob, data)
+            self._grow(len(data))
+        _atomic_write(self._index_path(source_key, z, x, y), digest.encode())
+
+    def _grow(self, nbytes):
+        with self._sizes_lock:
+            if self.root not in self._sizes:
+                self._sizes[self.root] = self.size()
+            self._sizes[self.root] += nbytes
+            return self._sizes[self.root]
+
+    def size(self):
+        return sum(entry.stat().st_size for entry in self._blobs())
+
+    def _blobs(self):
+        objects = self.root / 'objects'
+        if not objects.exists():
+            return []
+        return [p for p in objects.glob('*/*') if p.is_file()]
+
+    def evict_if_full(self):
+        """evict() once the running byte count passes the limit; no scan before that."""
+        if self._grow(0) > self.max_bytes:
+            return self.evict()
+        return 0
+
+    def evict(self):
+        """Delete least-recently-used blobs while the cache is over its limit."""
+        blobs = [(p, p.stat()) for p in self._blobs()]
+        total = sum(st.st_size for _, st in blobs)
+        removed = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * self.LOW_WATERMARK
+            for path, st in sorted(blobs, key=lambda item: item[1].st_mtime):
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= st.st_size
+                removed += 1
+        with self._sizes_lock:
+            self._sizes[self.root] = total
+        return removed
+
+
+def _atomic_write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# ── Fetching & stitching ──────────────────────────────────────
+
+def tile_range(bbox, zoom):
+    """Inclusive (x0, y0, x1, y1) tile range covering a bbox."""
+    min_lng, min_lat, max_lng, max_lat = bbox
+    last = 2 ** zoom - 1
+    x0 = min(max(int(math.floor(geo.lng_to_tile_x(min_lng, zoom))), 0), last)
+    x1 = min(max(int(math.ceil(geo.lng_to_tile_x(max_lng, zoom))) - 1, x0), last)
+    y0 = min(max(int(math.floor(geo.lat_to_tile_y(max_lat, zoom))), 0), last)
+    y1 = min(max(int(math.ceil(geo.lat_to_tile_y(min_lat, zoom))) - 1, y0), last)
+    return x0, y0, x1, y1
+
+
+def count_tiles(bbox, zoom):
+    x0, y0, x1, y1 = tile_range(bbox, zoom)
+    return (x1 - x0 + 1) * (y1 - y0 + 1)
+
+
+def fetch_tiles(tiles, source=None, cache=None, workers=None):
+    """
+    Fetch (z, x, y) tiles, cache first, misses in parallel.
+    Returns {(z, x, y): bytes or None}.
+    """
+    source = source or get_tile_source()
+    cache = cache or TileCache()
+    workers = workers or settings.SATELLITE_TILE_WORKERS
+
+    found = {}
+    missing = []
+    for tile in tiles:
+        data = cache.get(source.key, *tile)
+        if data is None:
+            missing.append(tile)
+        else:
+            found[tile] = data
+
+    def load(tile):
+        data = source.fetch(*tile)
+        if data is not None:
+            cache.put(source.key, *tile, data)
+        return tile, data
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            found.update(pool.map(load, missing))
+        cache.evict_if_full()
+    return found
+
+
+class Mosaic:
+    """Stitched RGB image plus where its pixel (0, 0) sits in tile space."""
+
+    def __init__(self, image, zoom, origin_x, origin_y, tile_size):
+        self.image = image
+        self.zoom = zoom
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.tile_size = tile_size
+
+    def to_lnglat(self, px, py):
+        return (
+            geo.tile_to_lng(self.origin_x + px / self.tile_size, self.zoom),
+            geo.tile_to_lat(self.origin_y + py / self.tile_size, self.zoom),
+        )
+
+
+def stitch_bbox(bbox, zoom, source=None, cache=None):
+    """Fetch, decode and stitch the tiles for a bbox, cropped to the bbox."""
+    from PIL import Image
+
+    size = settings.SATELLITE_TILE_SIZE
+    x0, y0, x1, y1 = tile_range(bbox, zoom)
+    tiles = [(zoom, x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+    fetched = fetch_tiles(tiles, source=source, cache=cache)
+    if not any(fetched.values()):
+        raise UpstreamError('No satellite imagery available for this area', retryable=True)
+
+    canvas = np.zeros(((y1 - y0 + 1) * size, (x1 - x0 + 1) * size, 3), dtype=np.uint8)
+    for (_, x, y), data in fetched.items():
+        if not data:
+            continue
+        try:
+            tile = Image.open(io.BytesIO(data)).convert('RGB')
+        except OSError:
+            logger.warning('Skipping undecodable tile %s/%s/%s', zoom, x, y)
+            continue
+        if tile.size != (size, size):
+            tile = tile.resize((size, size))
+        top, left = (y - y0) * size, (x - x0) * size
+        canvas[top:top + size, left:left + size] = np.asarray(tile)
+
+    # Crop the tile-aligned mosaic down to the requested bbox
+    min_lng, min_lat, max_lng, max_lat = bbox
+    left = max(int(round((geo.lng_to_tile_x(min_lng, zoom) - x0) * size)), 0)
+    right = min(int(round((geo.lng_to_tile_x(max_lng, zoom) - x0) * size)), canvas.shape[1])
+    top = max(int(round((geo.lat_to_tile_y(max_lat, zoom) - y0) * size)), 0)
+    bottom = min(int(round((geo.lat_to_tile_y(min_lat, zoom) - y0) * size)), canvas.shape[0])
+    image = canvas[top:max(bottom, top + 1), left:max(right, left + 1)]
+    return Mosaic(image, zoom, x0 + left / size, y0 + top / size, size)
@@ -0,0 +1,152 @@
+"""
+Tiled batch inference.
+
+Large images (a whole ward stitched from satellite tiles) are cut into
+overlapping square chips. Each chip is run through the engine, boxes are
+shifted back into image coordinates, and the results are merged:
+
+1. Every chip owns the core of its area (its rectangle minus half the
+   overlap on each shared edge). Detections whose centre falls outside
+   the core are dropped; the neighbouring chip sees that tree whole.
+2. Non-maximum suppression removes whatever duplicates remain.
+
+CPU-bound engines fan out over a process pool (billiard's, so it also
+works inside a Celery prefork child, see common/pools.py), network-bound
+ones over a thread pool.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .engines import get_engine
+
+
+def plan_chips(height, width, chip_size, overlap):
+    """
+    Chip rectangles (x0, y0, x1, y1) covering the image with the given
+    overlap. The last row/column is shifted back to stay chip_size wide.
+    """
+    if overlap >= chip_size:
+        raise ValueError('overlap must be smaller than chip_size')
+    step = chip_size - overlap
+
+    def starts(length):
+        if length <= chip_size:
+            return [0]
+        positions = list(range(0, length - chip_size, step))
+        positions.append(length - chip_size)
+        return positions
+
+    return [
+        (x0, y0, min(x0 + chip_size, width), min(y0 + chip_size, height))
+        for y0 in starts(height)
+        for x0 in starts(width)
+    ]
+
+
+def chip_core(chip, height, width, overlap):
+    """Region of the image this chip is responsible for."""
+    x0, y0, x1, y1 = chip
+    half = overlap / 2
+    return (
+        x0 + half if x0 > 0 else 0,
+        y0 + half if y0 > 0 else 0,
+        x1 - half if x1 < width else width,
+        y1 - half if y1 < height else height,
+    )
+
+
+def nms(detections, iou_threshold=0.3):
+    """Greedy non-maximum suppression; returns the kept detections by score."""
+    if len(detections) < 2:
+        return list(detections)
+    boxes = np.array([
+        [d['box']['xmin'], d['box']['ymin'], d['box']['xmax'], d['box']['ymax']]
+        for d in detections
+    ], dtype=np.float64)
+    scores = np.array([d.get('score', 0) for d in detections], dtype=np.float64)
+    areas = (boxes[:, 2] - boxes[:, 0] + 1) * (boxes[:, 3] - boxes[:, 1] + 1)
+
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while len(order):
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0]) + 1
+        h = np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1]) + 1
+        inter = np.clip(w, 0, None) * np.clip(h, 0, None)
+        iou = inter / (areas[i] + areas[rest] - inter)
+        order = rest[iou <= iou_threshold]
+    return [detections[i] for i in keep]
+
+
+# ── Worker side ───────────────────────────────────────────────
+
+_worker_engine = None
+
+
+def _init_worker(engine_name, options):
+    global _worker_engine
+    _worker_engine = get_engine(engine_name, **options)
+
+
+def _run_chip(chip_image, engine=None):
+    return (engine or _worker_engine).detect(chip_image)
+
+
+def _offset(detections, chip, core):
+    x0, y0 = chip[0], chip[1]
+    cx0, cy0, cx1, cy1 = core
+    shifted = []
+    for d in detections:
+        box = d['box']
+        box = {
+            'xmin': box['xmin'] + x0, 'ymin': box['ymin'] + y0,
+            'xmax': box['xmax'] + x0, 'ymax': box['ymax'] + y0,
+        }
+        cx = (box['xmin'] + box['xmax']) / 2
+        cy = (box['ymin'] + box['ymax']) / 2
+        if cx0 <= cx < cx1 and cy0 <= cy < cy1:
+            shifted.append({**d, 'box': box})
+    return shifted
+
+
+def detect_tiled(image, engine_name=None, options=None, chip_size=None, overlap=None,
+                 workers=None, iou_threshold=None):
+    """
+    Run an engine over an arbitrarily large RGB array and return merged
+    detections in image coordinates. Defaults come from settings
+    (DETECTION_CHIP_SIZE, DETECTION_CHIP_OVERLAP, DETECTION_WORKERS,
+    DETECTION_NMS_IOU).
+    """
+    from django.conf import settings
+    from apps.common.pools import process_map
+
+    options = options or {}
+    chip_size = chip_size or settings.DETECTION_CHIP_SIZE
+    overlap = settings.DETECTION_CHIP_OVERLAP if overlap is None else overlap
+    workers = workers or settings.DETECTION_WORKERS or os.cpu_count() or 1
+    iou_threshold = settings.DETECTION_NMS_IOU if iou_threshold is None else iou_threshold
+
+    engine = get_engine(engine_name, **options)
+    height, width = image.shape[:2]
+    chips = plan_chips(height, width, chip_size, overlap)
+    cores = [chip_core(c, height, width, overlap) for c in chips]
+    views = [image[y0:y1, x0:x1] for x0, y0, x1, y1 in chips]
+    workers = min(workers, len(chips))
+
+    if workers <= 1:
+        results = [_run_chip(view, engine) for view in views]
+    elif engine.cpu_bound:
+        results = process_map(_run_chip, views, workers, initializer=_init_worker,
+                              initargs=(engine.name, options))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda view: _run_chip(view, engine), views))
+
+    merged = []
+    for chip, core, detections in zip(chips, cores, results):
+        merged.extend(_offset(detections, chip, core))
+    return nms(merged, iou_threshold)
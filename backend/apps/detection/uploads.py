@@ -0,0 +1,86 @@
+"""
+Streaming image uploads for detection jobs.
+
+Both multipart and raw-body uploads are written to a temporary file in
+chunks as they arrive, and the upload fails with 413 once it passes
+DETECTION_UPLOAD_MAX_BYTES. The whole body is never held in memory.
+FileSystemStorage moves the temp file into place rather than copying it,
+and the worker reads it back through open_mapped().
+"""
+import io
+import mmap
+from contextlib import contextmanager
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import BaseParser, DataAndFiles
+
+CHUNK_SIZE = 64 * 1024
+
+
+class PayloadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Upload is too large.'
+    default_code = 'payload_too_large'
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Always spools multipart files to disk, and stops at max_bytes."""
+
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.max_bytes is not None and self.received > self.max_bytes:
+            self.file.close()
+            raise PayloadTooLarge()
+        return super().receive_data_chunk(raw_data, start)
+
+
+class RawImageParser(BaseParser):
+    """
+    Request body is the image itself (Content-Type: image/jpeg, image/png ...).
+    Exposes it as request.FILES['image'], spooled to a temp file.
+    parser_context['max_bytes'] caps the size.
+    """
+    media_type = 'image/*'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        max_bytes = (parser_context or {}).get('max_bytes')
+        content_type = (media_type or 'application/octet-stream').split(';')[0].strip()
+        upload = TemporaryUploadedFile('upload', content_type, 0, None)
+        size = 0
+        while stream is not None:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                upload.close()
+                raise PayloadTooLarge()
+            upload.write(chunk)
+        upload.size = size
+        upload.seek(0)
+        return DataAndFiles({}, {'image': upload})
+
+
+@contextmanager
+def open_mapped(field_file):
+    """
+    Read-only file-like buffer over a stored file: an mmap when the storage
+    has local paths, otherwise (S3, Cloudinary) an in-memory copy. Either
+    one can go to PIL or straight into an HTTP request body.
+    """
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        with field_file.open('rb') as f:
+            yield io.BytesIO(f.read())
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
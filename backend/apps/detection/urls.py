@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import DetectionJobCreateView, DetectionJobDetailView, DetectionJobUploadView
+
+urlpatterns = [
+    path('detection/jobs/', DetectionJobCreateView.as_view(), name='detection_job_create'),
+    path('detection/jobs/upload/', DetectionJobUploadView.as_view(), name='detection_job_upload'),
+    path('detection/jobs/<int:pk>/', DetectionJobDetailView.as_view(), name='detection_job_detail'),
+    # Old synchronous proxy URL, now submits a job
+    path('trees/detect-satellite/', DetectionJobCreateView.as_view(), name='tree_detect_satellite'),
+]
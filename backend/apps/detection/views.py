@@ -0,0 +1,98 @@
+import mimetypes
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import generics, permissions, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import DetectionJob
+from .serializers import DetectionJobSerializer, DetectionJobCreateSerializer
+from .tasks import run_detection_job
+from .uploads import LimitedTemporaryFileUploadHandler, PayloadTooLarge, RawImageParser
+
+
+class DetectionJobCreateView(APIView):
+    """
+    Submit an image for tree detection; the upstream model runs in a Celery job.
+    POST /api/detection/jobs/
+    Body: { image_base64: "...", mime_type: "image/jpeg" }
+    Returns 202 with the job; poll GET /api/detection/jobs/<id>/ until
+    status is completed (result holds the detections) or failed.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = DetectionJobCreateSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        job = serializer.save()
+        transaction.on_commit(lambda: run_detection_job.delay(job.id))
+        return Response(DetectionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class DetectionJobUploadView(APIView):
+    """
+    Submit an image file for tree detection without base64-encoding it.
+    POST /api/detection/jobs/upload/?engine=local
+    Either multipart/form-data with an "image" field, or the raw image as the
+    body (Content-Type: image/jpeg, image/png ...). The body is streamed to a
+    temp file and rejected with 413 past DETECTION_UPLOAD_MAX_BYTES.
+    Returns 202 with the job, like POST /api/detection/jobs/.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, RawImageParser]
+
+    def get_parser_context(self, http_request):
+        context = super().get_parser_context(http_request)
+        context['max_bytes'] = settings.DETECTION_UPLOAD_MAX_BYTES
+        return context
+
+    def post(self, request):
+        max_bytes = settings.DETECTION_UPLOAD_MAX_BYTES
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        # Reject before a single byte of the body is read
+        if length > max_bytes:
+            raise PayloadTooLarge()
+        request._request.upload_handlers = [
+            LimitedTemporaryFileUploadHandler(request._request, max_bytes)
+        ]
+
+        upload = request.FILES.get('image')
+        if upload is None:
+            return Response({'error': 'image file required'}, status=400)
+        try:
+            mime_type = upload.content_type or ''
+            if not mime_type.startswith('image/'):
+                mime_type = mimetypes.guess_type(upload.name)[0] or ''
+            if not mime_type.startswith('image/'):
+                return Response({'error': 'Upload must be an image'}, status=400)
+
+            engine = request.query_params.get('engine') or request.data.get('engine') or settings.DETECTION_ENGINE
+            if engine not in dict(DetectionJob.ENGINE_CHOICES):
+                return Response({'error': f"Unknown engine '{engine}'"}, status=400)
+
+            job = DetectionJob(created_by=request.user, mime_type=mime_type, engine=engine)
+            extension = mimetypes.guess_extension(mime_type) or ''
+            # Local storage moves the spooled temp file into place instead of copying it
+            job.image.save(f'upload{extension}', upload, save=False)
+            job.save()
+        finally:
+            upload.close()
+        transaction.on_commit(lambda: run_detection_job.delay(job.id))
+        return Response(DetectionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class DetectionJobDetailView(generics.RetrieveAPIView):
+    serializer_class = DetectionJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = DetectionJob.objects.all()
+        # Field workers only see their own jobs
+        if self.request.user.role == 'field_worker':
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
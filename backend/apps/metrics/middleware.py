@@ -0,0 +1,77 @@
+"""
+RequestMetricsMiddleware: times every request and records it in the
+registry (see registry.py) under its URL name.
+
+    total   request in to response out (for streaming responses, up to the
+            first byte: the body is produced after the middleware returns)
+    db      time inside SQL queries, from QueryRecorder
+    render  DRF / template response rendering, i.e. JSON serialisation
+    queries number of SQL queries
+
+Requests that repeat one SQL shape METRICS_N_PLUS_ONE_THRESHOLD times are
+logged as possible N+1s. With METRICS_RESPONSE_HEADERS (default: DEBUG),
+responses carry X-Query-Count and a Server-Timing header that browser dev
+tools show next to the request.
+"""
+import logging
+import time
+
+from django.conf import settings
+
+from .queries import QueryRecorder
+from .registry import RequestSample, get_registry
+
+logger = logging.getLogger(__name__)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    return match.view_name or match._func_path
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        request._metrics_render = 0.0
+        started = time.perf_counter()
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        view = view_label(request)
+        duplicates = recorder.repeated()
+        for shape, count in duplicates:
+            logger.warning('Possible N+1 in %s %s (%s): %d x %s',
+                           request.method, request.path, view, count, shape)
+
+        get_registry().observe(RequestSample(
+            view=view, method=request.method, path=request.path, status=response.status_code,
+            total=total, db=recorder.duration, render=request._metrics_render,
+            queries=recorder.count, duplicates=duplicates[:3], at=time.time(),
+        ))
+
+        if settings.METRICS_RESPONSE_HEADERS:
+            response['X-Query-Count'] = str(recorder.count)
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1000:.1f}, '
+                f'render;dur={request._metrics_render * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # Runs just before the handler renders; the callback runs just after
+        rendering_started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render += time.perf_counter() - rendering_started
+
+        response.add_post_render_callback(rendered)
+        return response
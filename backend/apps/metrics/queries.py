@@ -0,0 +1,65 @@
+"""
+Per-request SQL accounting through a connection.execute_wrapper.
+
+Queries are grouped by shape: the SQL with literals replaced by ? and
+IN (...) lists collapsed, so `WHERE tree_id = 1` and `WHERE tree_id = 2`
+(or the same statement with different parameters) count as one shape.
+A shape repeated METRICS_N_PLUS_ONE_THRESHOLD times in one request is the
+classic N+1: one query per row of an earlier result.
+
+    with QueryRecorder() as recorder:
+        ...
+    recorder.count, recorder.duration, recorder.repeated()
+"""
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def sql_shape(sql):
+    shape = _STRING.sub('?', sql)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+class QueryRecorder:
+    """Counts and times every query on all database connections while active."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def repeated(self, threshold=None):
+        """[(shape, count)] of shapes run at least `threshold` times, most first."""
+        threshold = threshold or settings.METRICS_N_PLUS_ONE_THRESHOLD
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
@@ -0,0 +1,169 @@
+"""
+In-process request metrics: cumulative histograms per (view, method) and a
+ring buffer of the most recent requests.
+
+Each worker process keeps its own registry, as Prometheus client libraries
+do without a multiprocess directory; scrape every worker, or read the
+numbers as per-worker samples.
+
+    registry.observe(RequestSample(view='tree_list', method='GET', status=200, ...))
+    registry.prometheus()   # text exposition format
+    registry.hot_paths()    # per-view summary of the recent requests
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque, namedtuple
+
+import numpy as np
+from django.conf import settings
+
+PREFIX = 'treetracker'
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+RequestSample = namedtuple('RequestSample', [
+    'view', 'method', 'path', 'status', 'total', 'db', 'render', 'queries', 'duplicates', 'at',
+])
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum:g}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Registry:
+    HISTOGRAMS = (
+        # attribute, metric name, help, buckets
+        ('total', 'http_request_duration_seconds', 'Time from request to response', SECONDS_BUCKETS),
+        ('db', 'http_request_db_seconds', 'Time spent in SQL queries', SECONDS_BUCKETS),
+        ('render', 'http_request_render_seconds', 'Time spent rendering (serialising) the response',
+         SECONDS_BUCKETS),
+        ('queries', 'http_request_queries', 'SQL queries per request', QUERY_BUCKETS),
+    )
+
+    def __init__(self, recent=None):
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=recent or settings.METRICS_RECENT_REQUESTS)
+        self.histograms = {}           # (view, method) -> {attribute: Histogram}
+        self.requests = Counter()      # (view, method, status) -> count
+        self.n_plus_one = Counter()    # (view, method) -> requests with repeated queries
+        self.started = time.time()
+
+    def observe(self, sample):
+        key = (sample.view, sample.method)
+        with self.lock:
+            histograms = self.histograms.get(key)
+            if histograms is None:
+                histograms = self.histograms[key] = {
+                    attr: Histogram(buckets) for attr, _, _, buckets in self.HISTOGRAMS
+                }
+            for attr, *_ in self.HISTOGRAMS:
+                histograms[attr].observe(getattr(sample, attr))
+            self.requests[(sample.view, sample.method, sample.status)] += 1
+            if sample.duplicates:
+                self.n_plus_one[key] += 1
+            self.recent.append(sample)
+
+    def prometheus(self):
+        with self.lock:
+            lines = [
+                f'# HELP {PREFIX}_http_requests_total Requests by view, method and status',
+                f'# TYPE {PREFIX}_http_requests_total counter',
+            ]
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(f'{PREFIX}_http_requests_total{{view="{_escape(view)}",method="{method}",'
+                             f'status="{status}"}} {count}')
+
+            for attr, name, help_text, _ in self.HISTOGRAMS:
+                lines += [f'# HELP {PREFIX}_{name} {help_text}', f'# TYPE {PREFIX}_{name} histogram']
+                for (view, method), histograms in sorted(self.histograms.items()):
+                    lines += histograms[attr].lines(
+                        f'{PREFIX}_{name}', f'view="{_escape(view)}",method="{method}"')
+
+            lines += [
+                f'# HELP {PREFIX}_http_n_plus_one_total Requests that repeated one SQL statement '
+                f'at least METRICS_N_PLUS_ONE_THRESHOLD times',
+                f'# TYPE {PREFIX}_http_n_plus_one_total counter',
+            ]
+            for (view, method), count in sorted(self.n_plus_one.items()):
+                lines.append(f'{PREFIX}_http_n_plus_one_total{{view="{_escape(view)}",method="{method}"}} {count}')
+
+            lines += [
+                f'# HELP {PREFIX}_metrics_start_time_seconds When this process started collecting',
+                f'# TYPE {PREFIX}_metrics_start_time_seconds gauge',
+                f'{PREFIX}_metrics_start_time_seconds {self.started:.0f}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+    def hot_paths(self):
+        """
+        Per (view, method) over the recent requests, most total time first:
+        count, p50/p95/max latency, DB and render share, queries, N+1 hits
+        and the most repeated SQL statement.
+        """
+        with self.lock:
+            samples = list(self.recent)
+        groups = {}
+        for sample in samples:
+            groups.setdefault((sample.view, sample.method), []).append(sample)
+
+        report = []
+        for (view, method), group in groups.items():
+            total = np.array([s.total for s in group]) * 1000
+            queries = np.array([s.queries for s in group])
+            repeated = Counter()
+            for s in group:
+                for sql, count in s.duplicates:
+                    repeated[sql] = max(repeated[sql], count)
+            worst = repeated.most_common(1)
+            report.append({
+                'view': view,
+                'method': method,
+                'requests': len(group),
+                'total_ms': round(float(total.sum()), 1),
+                'p50_ms': round(float(np.percentile(total, 50)), 1),
+                'p95_ms': round(float(np.percentile(total, 95)), 1),
+                'max_ms': round(float(total.max()), 1),
+                'db_ms_avg': round(float(np.mean([s.db for s in group])) * 1000, 1),
+                'render_ms_avg': round(float(np.mean([s.render for s in group])) * 1000, 1),
+                'queries_avg': round(float(queries.mean()), 1),
+                'queries_max': int(queries.max()),
+                'n_plus_one_requests': sum(1 for s in group if s.duplicates),
+                'most_repeated_sql': {'sql': worst[0][0], 'count': worst[0][1]} if worst else None,
+            })
+        report.sort(key=lambda r: r['total_ms'], reverse=True)
+        return report
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = Registry()
+    return _registry
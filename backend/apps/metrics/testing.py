@@ -0,0 +1,70 @@
+"""
+Query budgets for tests: fail when a block or an endpoint runs more SQL
+than allowed, listing the repeated statements so an N+1 is obvious.
+
+    from apps.metrics.testing import QUERY_BUDGETS, assert_query_budget, query_budget
+
+    with query_budget(3):
+        build_dashboard(today)
+
+    assert_query_budget(client, 'tree_list')                 # budget from QUERY_BUDGETS
+    assert_query_budget(client, 'zone_stats', budget=2, kwargs={'pk': zone.id})
+
+Budgets are fixed numbers on purpose: the count must not grow with the
+number of rows, so test with more than one row per relation.
+"""
+from contextlib import contextmanager
+
+from django.urls import reverse
+
+from .queries import QueryRecorder
+
+# URL name -> maximum queries for a GET (authentication included)
+QUERY_BUDGETS = {
+    'tree_list': 4,
+    'tree_detail': 4,
+    'tree_map': 4,
+    'tree_map_tile': 4,
+    'tree_nearby': 3,
+    'species_list': 3,
+    'zone_list': 3,
+    'zone_detail': 2,
+    'zone_stats': 2,
+    'task_list': 4,
+    'dashboard_summary': 5,
+    'monthly_trends': 3,
+    'health_history': 3,
+    'export_csv': 2,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(budget, label='block'):
+    """Raise QueryBudgetExceeded if the block runs more than `budget` queries."""
+    with QueryRecorder() as recorder:
+        yield recorder
+    if recorder.count > budget:
+        repeated = recorder.repeated(threshold=2)
+        details = ''.join(f'\n  {count} x {shape}' for shape, count in repeated[:5])
+        raise QueryBudgetExceeded(
+            f'{label} ran {recorder.count} queries (budget {budget})'
+            + (f'; repeated:{details}' if details else '')
+        )
+
+
+def assert_query_budget(client, url_name, budget=None, kwargs=None, query=None, method='get', **extra):
+    """
+    Request the named URL with a (logged-in) test client and check its budget.
+    Returns the response.
+    """
+    budget = QUERY_BUDGETS[url_name] if budget is None else budget
+    url = reverse(url_name, kwargs=kwargs)
+    with query_budget(budget, label=f'{method.upper()} {url}'):
+        response = getattr(client, method)(url, query or {}, **extra)
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+    return response
@@ -0,0 +1,83 @@
+import math
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.reports.benchmarks import Context
+from apps.tasks.models import MaintenanceTask
+from apps.trees import geo
+from apps.trees.models import Tree
+from apps.trees.synthetic import generate
+
+from .testing import QUERY_BUDGETS, QueryBudgetExceeded, assert_query_budget, query_budget
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Small, but with several rows behind every relation a page reads
+        generate(zones=3, users=9, trees=90, logs=300, tasks=30, seed=1, history_days=30)
+        get_user_model().objects.create_user('budget-admin', password='budget-admin', role='admin')
+
+    def setUp(self):
+        self.ctx = Context()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.ctx.admin)}')
+
+    def requests(self):
+        """url name -> (kwargs, query) for every entry in QUERY_BUDGETS."""
+        zone = self.ctx.zone
+        tree = (Tree.objects.filter(zone=zone).annotate(logs=Count('health_logs'))
+                .order_by('-logs', 'id').first())
+        lat, lng = zone.center_lat, zone.center_lng
+        z = 15
+        x, y = math.floor(geo.lng_to_tile_x(lng, z)), math.floor(geo.lat_to_tile_y(lat, z))
+        return {
+            'tree_list': (None, {}),
+            'tree_detail': ({'pk': tree.id}, {}),
+            'tree_map': (None, {'bbox': self.ctx.bbox}),
+            'tree_map_tile': ({'z': z, 'x': x, 'y': y}, {}),
+            'tree_nearby': (None, {'lat': lat, 'lng': lng, 'radius': 2000}),
+            'species_list': (None, {}),
+            'zone_list': (None, {}),
+            'zone_detail': ({'pk': zone.id}, {}),
+            'zone_stats': ({'pk': zone.id}, {}),
+            'task_list': (None, {}),
+            'dashboard_summary': (None, {}),
+            'monthly_trends': (None, {}),
+            'health_history': (None, {'interval': 'week'}),
+            'export_csv': (None, {}),
+        }
+
+    def test_data_has_more_than_one_row_per_relation(self):
+        zone = self.ctx.zone
+        self.assertGreater(Tree.objects.filter(zone=zone).count(), 1)
+        self.assertGreater(Tree.objects.filter(zone=zone).values('species').distinct().count(), 1)
+        self.assertGreater(
+            Tree.objects.annotate(logs=Count('health_logs')).filter(zone=zone, logs__gt=1).count(), 1)
+        self.assertGreater(MaintenanceTask.objects.filter(zone=zone).count(), 1)
+
+    def test_every_endpoint_stays_within_its_budget(self):
+        requests = self.requests()
+        self.assertEqual(set(requests), set(QUERY_BUDGETS))
+        for url_name, (kwargs, query) in requests.items():
+            with self.subTest(url_name):
+                response = assert_query_budget(self.client, url_name, kwargs=kwargs, query=query)
+                self.assertEqual(response.status_code, 200)
+
+    def test_field_worker_lists_stay_within_budget(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.ctx.worker)}')
+        for url_name in ('tree_list', 'task_list', 'zone_list'):
+            with self.subTest(url_name):
+                response = assert_query_budget(self.client, url_name)
+                self.assertEqual(response.status_code, 200)
+
+    def test_exceeding_the_budget_names_the_repeated_query(self):
+        with self.assertRaises(QueryBudgetExceeded) as caught:
+            with query_budget(1):
+                for tree in Tree.objects.all()[:3]:
+                    tree.zone.name
+        self.assertIn('zones_zone', str(caught.exception))
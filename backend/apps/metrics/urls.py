@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import HotPathsView, MetricsView
+
+urlpatterns = [
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('metrics/hot-paths/', HotPathsView.as_view(), name='metrics_hot_paths'),
+]
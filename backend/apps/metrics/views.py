@@ -0,0 +1,43 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.accounts.permissions import IsAdminUser
+from .registry import get_registry
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint (text exposition format, this worker only).
+    Requires `Authorization: Bearer <METRICS_TOKEN>`; without a token
+    configured it is only served when DEBUG is on.
+    """
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if token:
+            given = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+            if not hmac.compare_digest(given, token):
+                return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+        elif not settings.DEBUG:
+            return HttpResponse('Set METRICS_TOKEN to enable metrics\n', status=403, content_type='text/plain')
+        return HttpResponse(get_registry().prometheus(), content_type='text/plain; version=0.0.4')
+
+
+class HotPathsView(APIView):
+    """
+    Slowest endpoints over this worker's recent requests (METRICS_RECENT_REQUESTS),
+    most total time first, with query counts and repeated-SQL (N+1) hits.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        registry = get_registry()
+        return Response({
+            'window': len(registry.recent),
+            'views': registry.hot_paths(),
+        })
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'to_email', 'subject', 'category', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['status', 'category', 'backend']
+    search_fields = ['to_email', 'subject']
+    readonly_fields = ['attempts', 'backend', 'provider_id', 'last_error', 'created_at', 'sent_at']
+    actions = ['requeue']
+
+    @admin.action(description='Send again (reset attempts)')
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now(), locked_until=None)
+        self.message_user(request, f'{count} email(s) queued')
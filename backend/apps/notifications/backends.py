@@ -0,0 +1,221 @@
+"""
+Email providers for the delivery worker (delivery.py).
+
+A backend's send(emails) takes up to batch_size OutboundEmail rows and
+returns, in order, each message's provider id or the DeliveryError it
+failed with. It raises DeliveryError when the whole request failed.
+
+    resend  Resend HTTP API, up to 100 messages per POST /emails/batch,
+            over a pool of keep-alive HTTPS connections. RESEND_API_URL is
+            configurable so the stand-in server in testing.py can be used.
+    smtp    Django's EMAIL_BACKEND (SMTP in production, the console in
+            development); the messages of a batch share one connection.
+"""
+import hashlib
+import http.client
+import json
+import queue
+import smtplib
+from email.utils import parseaddr
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class DeliveryError(Exception):
+    """A failed send; retryable for network errors, 429s and 5xx replies."""
+
+    def __init__(self, message, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def sender(email):
+    return email.from_email or settings.DEFAULT_FROM_EMAIL
+
+
+class EmailBackend:
+    name = None
+    batch_size = 1
+
+    def send(self, emails):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, shared by the worker threads."""
+
+    def __init__(self, url, size, timeout):
+        parts = urlsplit(url)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def request(self, method, path, body, headers):
+        """
+        Returns (status, headers, body). A reused connection that the server
+        has closed in the meantime is retried once on a new connection.
+        """
+        while True:
+            try:
+                connection, reused = self.idle.get_nowait(), True
+            except queue.Empty:
+                connection, reused = self.connection_class(self.host, self.port, timeout=self.timeout), False
+            try:
+                connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                try:
+                    self.idle.put_nowait(connection)
+                except queue.Full:
+                    connection.close()
+            return response.status, response.headers, data
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _retry_after(headers):
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class ResendBackend(EmailBackend):
+    name = 'resend'
+    batch_size = 100  # the batch endpoint's limit
+
+    def __init__(self):
+        if not settings.RESEND_API_KEY:
+            raise ImproperlyConfigured('RESEND_API_KEY not set')
+        self.pool = ConnectionPool(
+            settings.RESEND_API_URL, size=settings.EMAIL_OUTBOX_WORKERS, timeout=settings.EMAIL_OUTBOX_TIMEOUT,
+        )
+
+    def payload(self, email):
+        # Resend wants the bare address, not "Name <address>"
+        item = {
+            'from': parseaddr(sender(email))[1],
+            'to': [email.to_email],
+            'subject': email.subject,
+            'html': email.html_body,
+        }
+        if email.text_body:
+            item['text'] = email.text_body
+        return item
+
+    def send(self, emails):
+        single = len(emails) == 1
+        body = self.payload(emails[0]) if single else [self.payload(e) for e in emails]
+        headers = {
+            'Authorization': f'Bearer {settings.RESEND_API_KEY}',
+            'Content-Type': 'application/json',
+            # A retried request for the same messages isn't sent twice
+            'Idempotency-Key': hashlib.sha256(','.join(str(e.id) for e in emails).encode()).hexdigest(),
+        }
+        try:
+            status, reply_headers, data = self.pool.request(
+                'POST', '/emails' if single else '/emails/batch', json.dumps(body).encode('utf-8'), headers,
+            )
+        except (OSError, http.client.HTTPException) as e:
+            raise DeliveryError(f'Resend API unreachable: {e}', retryable=True)
+
+        if status >= 300:
+            message = f"Resend API error {status}: {data.decode(errors='replace')}"
+            if status == 429:
+                raise DeliveryError(message, retryable=True, retry_after=_retry_after(reply_headers))
+            raise DeliveryError(message, retryable=status >= 500)
+
+        result = json.loads(data)
+        return [result['id']] if single else [item['id'] for item in result['data']]
+
+    def close(self):
+        self.pool.close()
+
+
+class SMTPBackend(EmailBackend):
+    name = 'smtp'
+    batch_size = 20
+
+    def send(self, emails):
+        from django.core.mail import EmailMultiAlternatives, get_connection, make_msgid
+        from django.core.mail.utils import DNS_NAME
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except (smtplib.SMTPException, OSError) as e:
+            raise DeliveryError(f'SMTP connection failed: {e}', retryable=True)
+
+        results = []
+        try:
+            for email in emails:
+                message_id = make_msgid(domain=DNS_NAME)
+                message = EmailMultiAlternatives(
+                    subject=email.subject, body=email.text_body or 'Please enable HTML email.',
+                    from_email=sender(email), to=[email.to_email],
+                    headers={'Message-ID': message_id}, connection=connection,
+                )
+                message.attach_alternative(email.html_body, 'text/html')
+                try:
+                    message.send()
+                except smtplib.SMTPRecipientsRefused as e:
+                    results.append(DeliveryError(f'Recipient refused: {e}'))
+                except smtplib.SMTPResponseException as e:
+                    results.append(DeliveryError(f'SMTP error {e.smtp_code}: {e.smtp_error!r}',
+                                                 retryable=e.smtp_code < 500))
+                except (smtplib.SMTPException, OSError) as e:
+                    # The connection is gone; the rest of the batch goes next time
+                    error = DeliveryError(f'SMTP error: {e}', retryable=True)
+                    results += [error] * (len(emails) - len(results))
+                    break
+                else:
+                    results.append(message_id)
+        finally:
+            try:
+                connection.close()
+            except (smtplib.SMTPException, OSError):
+                pass
+        return results
+
+
+BACKENDS = {
+    ResendBackend.name: ResendBackend,
+    SMTPBackend.name: SMTPBackend,
+}
+
+
+def get_backend(name=None):
+    """Build a backend by name; defaults to settings.EMAIL_OUTBOX_BACKEND."""
+    name = name or settings.EMAIL_OUTBOX_BACKEND
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown email backend '{name}'. Choose from: {', '.join(BACKENDS)}")
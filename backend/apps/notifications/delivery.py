@@ -0,0 +1,187 @@
+"""
+The outbox delivery worker.
+
+deliver() claims due messages (pending, or 'sending' with an expired
+lease) and sends them through the configured backend (backends.py):
+
+  - in batches of backend.batch_size (100 per Resend batch request)
+  - on EMAIL_OUTBOX_WORKERS threads sharing the backend's keep-alive
+    connections; only the calling thread touches the database
+  - at most EMAIL_OUTBOX_RATE_LIMIT provider requests per second
+    (TokenBucket); a 429 empties the bucket for its Retry-After
+  - retried after 30s, 60s, 120s ... (EMAIL_OUTBOX_RETRY_*), or after
+    Retry-After; permanent failures, and messages out of attempts, are
+    marked 'dead'. A batch the provider rejects as a whole is bisected
+    and resent, so one bad address doesn't hold back the rest.
+
+Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED where the database
+supports it, so concurrent workers never pick the same message; the rate
+limit applies per worker.
+"""
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .backends import DeliveryError, get_backend
+from .models import OutboundEmail
+
+RESULT_FIELDS = ['status', 'next_attempt_at', 'locked_until', 'backend', 'provider_id', 'last_error', 'sent_at']
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second, up to `capacity` saved. acquire() takes a
+    token, going into debt if there is none, and sleeps (outside the lock)
+    until the debt is repaid. A rate of 0 means no limit.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            self.sleep(wait)
+
+    def pause(self, seconds):
+        """Hand out nothing for `seconds` (the provider asked us to back off)."""
+        if self.rate <= 0:
+            return
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+def retry_delay(attempt, retry_after=None):
+    """Exponential backoff with jitter, at least the provider's Retry-After."""
+    delay = settings.EMAIL_OUTBOX_RETRY_BASE_DELAY * (2 ** (attempt - 1))
+    if retry_after:
+        delay = max(delay, retry_after)
+    return min(delay, settings.EMAIL_OUTBOX_RETRY_MAX_DELAY) * random.uniform(0.8, 1.2)
+
+
+def claim(limit, now=None):
+    """Mark up to `limit` due messages as being sent by this worker and return them."""
+    now = now or timezone.now()
+    due = Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', locked_until__lt=now)
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True).filter(due).order_by('next_attempt_at')[:limit]
+        )
+        if not emails:
+            return []
+        locked_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+        OutboundEmail.objects.filter(id__in=[e.id for e in emails]).update(
+            status='sending', attempts=F('attempts') + 1, locked_until=locked_until,
+        )
+    for email in emails:
+        email.status = 'sending'
+        email.attempts += 1
+        email.locked_until = locked_until
+    return emails
+
+
+def send_batch(backend, bucket, batch):
+    """[(email, provider id or DeliveryError)] for one provider request."""
+    bucket.acquire()
+    try:
+        results = backend.send(batch)
+    except DeliveryError as e:
+        if e.retry_after:
+            bucket.pause(e.retry_after)
+        if e.retryable or len(batch) == 1:
+            return [(email, e) for email in batch]
+        # Rejected as a whole: bisect to find the bad message(s)
+        half = len(batch) // 2
+        return send_batch(backend, bucket, batch[:half]) + send_batch(backend, bucket, batch[half:])
+    except Exception as e:
+        return [(email, DeliveryError(f'{type(e).__name__}: {e}', retryable=True)) for email in batch]
+    return list(zip(batch, results))
+
+
+def record(pairs, backend_name, now=None):
+    """Store the outcome of a batch; returns Counter of sent / retrying / dead."""
+    now = now or timezone.now()
+    outcome = Counter()
+    for email, result in pairs:
+        email.backend = backend_name
+        email.locked_until = None
+        if isinstance(result, DeliveryError):
+            email.last_error = str(result)
+            if result.retryable and email.attempts < settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                email.status = 'pending'
+                email.next_attempt_at = now + timedelta(seconds=retry_delay(email.attempts, result.retry_after))
+                outcome['retrying'] += 1
+            else:
+                email.status = 'dead'
+                outcome['dead'] += 1
+        else:
+            email.status = 'sent'
+            email.provider_id = result or ''
+            email.last_error = ''
+            email.sent_at = now
+            outcome['sent'] += 1
+    OutboundEmail.objects.bulk_update([email for email, _ in pairs], RESULT_FIELDS)
+    return outcome
+
+
+def deliver(backend, bucket, limit=None):
+    """One pass: claim, send concurrently, record. Returns Counter of outcomes."""
+    emails = claim(limit or settings.EMAIL_OUTBOX_CLAIM_SIZE)
+    outcome = Counter()
+    if not emails:
+        return outcome
+
+    size = backend.batch_size
+    batches = [emails[i:i + size] for i in range(0, len(emails), size)]
+    with ThreadPoolExecutor(max_workers=min(settings.EMAIL_OUTBOX_WORKERS, len(batches))) as pool:
+        futures = [pool.submit(send_batch, backend, bucket, batch) for batch in batches]
+        for future in as_completed(futures):
+            outcome += record(future.result(), backend.name)
+    return outcome
+
+
+def deliver_pending(backend=None, max_seconds=None):
+    """
+    Deliver passes until nothing is due or `max_seconds` have passed.
+    Returns {'sent': n, 'retrying': n, 'dead': n}.
+    """
+    backend = backend or get_backend()
+    bucket = TokenBucket(settings.EMAIL_OUTBOX_RATE_LIMIT)
+    started = time.monotonic()
+    total = Counter()
+    try:
+        while True:
+            outcome = deliver(backend, bucket)
+            total += outcome
+            if not outcome:
+                break
+            if max_seconds is not None and time.monotonic() - started >= max_seconds:
+                break
+    finally:
+        backend.close()
+    return {key: total[key] for key in ('sent', 'retrying', 'dead')}
@@ -0,0 +1,34 @@
+"""
+Send due outbox emails now, as the deliver_outbox Celery task does every
+minute. --requeue-dead gives dead messages a fresh set of attempts first.
+Usage: python manage.py deliver_emails [--backend resend|smtp] [--requeue-dead]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', help='resend or smtp (EMAIL_OUTBOX_BACKEND)')
+        parser.add_argument('--requeue-dead', action='store_true', help='Retry dead messages')
+
+    def handle(self, *args, **options):
+        from apps.notifications.backends import get_backend
+        from apps.notifications.delivery import deliver_pending
+        from apps.notifications.models import OutboundEmail
+
+        try:
+            backend = get_backend(options['backend'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['requeue_dead']:
+            count = OutboundEmail.objects.filter(status='dead').update(
+                status='pending', attempts=0, next_attempt_at=timezone.now())
+            self.stdout.write(f'Requeued {count} dead message(s)')
+
+        result = deliver_pending(backend)
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {result['sent']}, retrying {result['retrying']}, dead {result['dead']}"))
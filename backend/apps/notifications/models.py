@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """
+    One email in the outbox. Jobs only insert rows (see outbox.enqueue);
+    delivery.deliver() claims due rows, sends them in batches and records
+    the outcome. A failed send is retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS, then left as 'dead' for inspection.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    ]
+
+    to_email = models.EmailField()
+    # Blank: DEFAULT_FROM_EMAIL when sent
+    from_email = models.CharField(max_length=254, blank=True)
+    subject = models.CharField(max_length=255)
+    html_body = models.TextField()
+    text_body = models.TextField(blank=True)
+    # What produced it, e.g. 'overdue_alerts'
+    category = models.CharField(max_length=50, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # A 'sending' row whose lease has run out (the worker died) is claimed again
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    # Outcome
+    backend = models.CharField(max_length=20, blank=True)
+    provider_id = models.CharField(max_length=255, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # The delivery worker's claim query
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Email #{self.id} to {self.to_email} ({self.status})"
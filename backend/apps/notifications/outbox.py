@@ -0,0 +1,18 @@
+"""
+Queueing email for the delivery worker (see delivery.py).
+
+enqueue has the send_fn signature the reminder jobs take, so a job hands
+its messages to the outbox instead of talking to the provider:
+
+    send_overdue_task_alerts_resend(partial(enqueue, category='overdue_alerts'))
+    deliver_outbox.delay()
+"""
+from .models import OutboundEmail
+
+
+def enqueue(to_email, subject, html_body, text_body='', category='', from_email=''):
+    """Store one message for delivery; returns the OutboundEmail."""
+    return OutboundEmail.objects.create(
+        to_email=to_email, from_email=from_email, subject=subject,
+        html_body=html_body, text_body=text_body, category=category,
+    )
@@ -0,0 +1,9 @@
+from celery import shared_task
+from django.conf import settings
+
+
+@shared_task
+def deliver_outbox():
+    """Send due outbox emails; scheduled every minute and queued after each reminder job."""
+    from .delivery import deliver_pending
+    return deliver_pending(max_seconds=settings.EMAIL_OUTBOX_RUN_SECONDS)
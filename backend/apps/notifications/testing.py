@@ -0,0 +1,98 @@
+"""
+A local stand-in for the Resend API, to exercise the outbox without
+network access or an API key:
+
+    with ResendStandIn(responses=[429, 500]) as server, \\
+            override_settings(RESEND_API_URL=server.url, RESEND_API_KEY='test'):
+        deliver_pending(get_backend('resend'))
+
+    server.emails        # every message accepted, in order
+    server.requests      # [(path, messages in the request, status)]
+    server.connections   # TCP connections opened; keep-alive reuses them
+
+`responses` are status codes for the next requests before it starts
+accepting (a 429 carries Retry-After: `retry_after`). A request with a
+message to an address in `reject` fails with 422, as Resend validates a
+batch as a whole. A replayed Idempotency-Key gets the first reply again.
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ResendStandIn:
+    def __init__(self, responses=(), reject=(), retry_after=1, latency=0):
+        self.responses = list(responses)
+        self.reject = set(reject)
+        self.retry_after = retry_after
+        self.latency = latency
+        self.emails = []
+        self.requests = []
+        self.connections = 0
+        self.replies = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.block_on_close = False
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reply(self, path, body, key):
+        """(status, headers, payload) for one request."""
+        if self.latency:
+            time.sleep(self.latency)
+        messages = body if isinstance(body, list) else [body]
+        with self.lock:
+            if key and key in self.replies:
+                return self.replies[key]
+            if self.responses:
+                status = self.responses.pop(0)
+                headers = {'Retry-After': str(self.retry_after)} if status == 429 else {}
+                result = status, headers, {'name': 'stand_in_error', 'message': f'Scripted {status}'}
+            elif any(to in self.reject for m in messages for to in m.get('to', [])):
+                result = 422, {}, {'name': 'validation_error', 'message': 'Invalid `to` field'}
+            else:
+                ids = [str(uuid.uuid4()) for _ in messages]
+                self.emails += messages
+                payload = {'data': [{'id': i} for i in ids]} if path.endswith('/batch') else {'id': ids[0]}
+                result = 200, {}, payload
+                if key:
+                    self.replies[key] = result
+            self.requests.append((path, len(messages), result[0]))
+            return result
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with stand_in.lock:
+                    stand_in.connections += 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                status, headers, payload = stand_in.reply(self.path, body, self.headers.get('Idempotency-Key'))
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
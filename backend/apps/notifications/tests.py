@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .backends import get_backend
+from .delivery import TokenBucket, deliver, deliver_pending
+from .models import OutboundEmail
+from .outbox import enqueue
+from .testing import ResendStandIn
+
+
+def queue_emails(count, bad=()):
+    for i in range(count):
+        enqueue(f'worker{i}@example.com', f'Reminder {i}', f'<p>Reminder {i}</p>', category='test')
+    for to in bad:
+        enqueue(to, 'Reminder', '<p>Reminder</p>', category='test')
+
+
+class ResendOutboxTests(TestCase):
+    def deliver(self, server, once=False, **settings):
+        with override_settings(RESEND_API_URL=server.url, RESEND_API_KEY='test',
+                               EMAIL_OUTBOX_RATE_LIMIT=0, EMAIL_OUTBOX_WORKERS=2, **settings):
+            backend = get_backend('resend')
+            if not once:
+                return deliver_pending(backend)
+            try:
+                return deliver(backend, TokenBucket(0))
+            finally:
+                backend.close()
+
+    def test_messages_are_sent_in_batches_of_100(self):
+        queue_emails(250)
+        with ResendStandIn() as server:
+            result = self.deliver(server)
+        self.assertEqual(result, {'sent': 250, 'retrying': 0, 'dead': 0})
+        self.assertEqual(sorted(size for _, size, _ in server.requests), [50, 100, 100])
+        self.assertEqual({path for path, _, _ in server.requests}, {'/emails/batch'})
+        self.assertEqual(len(server.emails), 250)
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+        self.assertFalse(OutboundEmail.objects.filter(provider_id='').exists())
+
+    def test_429_is_retried_no_sooner_than_retry_after(self):
+        queue_emails(3)
+        before = timezone.now()
+        with ResendStandIn(responses=[429], retry_after=600) as server:
+            outcome = self.deliver(server, once=True)
+        self.assertEqual(outcome['retrying'], 3)
+        for email in OutboundEmail.objects.all():
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertIn('429', email.last_error)
+            # retry_delay() jitters by +-20%
+            self.assertGreaterEqual(email.next_attempt_at, before + timedelta(seconds=600 * 0.8))
+
+    def test_429_pauses_the_token_bucket(self):
+        now = [0.0]
+        slept = []
+        bucket = TokenBucket(2, clock=lambda: now[0], sleep=slept.append)
+        bucket.pause(10)
+        bucket.acquire()
+        self.assertAlmostEqual(slept[0], 10.5)
+
+    def test_rejected_batch_is_bisected_down_to_the_bad_address(self):
+        queue_emails(7, bad=['not-an-inbox@example.invalid'])
+        with ResendStandIn(reject=['not-an-inbox@example.invalid']) as server:
+            result = self.deliver(server)
+        self.assertEqual(result, {'sent': 7, 'retrying': 0, 'dead': 1})
+        dead = OutboundEmail.objects.get(status='dead')
+        self.assertEqual(dead.to_email, 'not-an-inbox@example.invalid')
+        self.assertIn('422', dead.last_error)
+        self.assertEqual(dead.attempts, 1)
+        self.assertEqual(len(server.emails), 7)
+        # 8 -> 4 + 4 -> 2 + 2 -> 1 + 1: one rejected request per level
+        self.assertEqual(sum(1 for _, _, status in server.requests if status == 422), 4)
+
+    def test_message_is_dead_after_max_attempts(self):
+        queue_emails(1)
+        email = OutboundEmail.objects.get()
+        with ResendStandIn(responses=[500, 502, 503, 500]) as server:
+            for attempt in range(1, 4):
+                OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+                self.deliver(server, once=True, EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+                email.refresh_from_db()
+                self.assertEqual(email.attempts, attempt)
+                self.assertEqual(email.status, 'pending' if attempt < 3 else 'dead')
+            # Nothing left to claim
+            self.assertEqual(self.deliver(server, once=True, EMAIL_OUTBOX_MAX_ATTEMPTS=3), {})
+        self.assertEqual(len(server.requests), 3)
+        self.assertIn('503', email.last_error)
+        self.assertEqual(server.emails, [])
@@ -0,0 +1,250 @@
+"""
+Benchmarks for the hot endpoints and jobs.
+
+Each case runs a view (through DRF's request factory, authenticated as a
+user of the right role) or a job function in-process, `repeat` times after
+one warm-up run, and records the number of SQL queries and the p50/p95
+latency:
+
+    results = run(cases=['map_markers', 'dashboard'], repeat=10)
+    regressions = compare(results, load_baseline()['small'])
+
+Query counts are compared exactly: a count that grows with the data is the
+N+1 these benchmarks exist to catch. Latency may be up to
+BENCHMARK_LATENCY_TOLERANCE above the baseline p95 (plus
+BENCHMARK_LATENCY_SLACK_MS, for very fast cases) before it is a regression.
+
+Run against synthetic data at a known size (see generate_data) so the
+baseline stays comparable: baselines are keyed by that size label.
+"""
+import contextlib
+import io
+import json
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# setup runs before each timed run, outside the timer
+Case = namedtuple('Case', ['name', 'run', 'setup', 'repeat'], defaults=[None, None])
+CASES = {}
+
+
+def case(name, setup=None, repeat=None):
+    def register(fn):
+        CASES[name] = Case(name, fn, setup, repeat)
+        return fn
+    return register
+
+
+class Context:
+    """Users and a sample area to point the cases at, picked once per run."""
+
+    def __init__(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models import Count
+        from apps.zones.models import Zone
+
+        User = get_user_model()
+        self.admin = User.objects.filter(role='admin').order_by('id').first()
+        if self.admin is None:
+            raise ValueError('No admin user to run the benchmarks as (run generate_data first)')
+        # The busiest zone, and a supervisor and field worker who work there
+        self.zone = Zone.objects.annotate(n=Count('trees')).order_by('-n', 'id').first()
+        if self.zone is None:
+            raise ValueError('No zones to benchmark (run generate_data first)')
+        self.supervisor = User.objects.filter(role='supervisor', zone=self.zone).first() or self.admin
+        self.worker = User.objects.filter(role='field_worker', zone=self.zone).first() or self.admin
+        lat, lng = self.zone.center_lat, self.zone.center_lng
+        # Roughly one zone on screen, and a whole city zoomed out
+        self.bbox = f'{lng - 0.01},{lat - 0.01},{lng + 0.01},{lat + 0.01}'
+        self.city_bbox = f'{lng - 0.15},{lat - 0.15},{lng + 0.15},{lat + 0.15}'
+
+    def get(self, view, path, user, **kwargs):
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        request = APIRequestFactory().get(path, HTTP_ACCEPT='application/json')
+        force_authenticate(request, user=user)
+        response = view.as_view()(request, **kwargs)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        else:
+            response.render()
+        if response.status_code >= 400:
+            raise RuntimeError(f'GET {path} returned {response.status_code}')
+        return response
+
+
+class _Sink:
+    def write(self, data):
+        return len(data)
+
+
+# ── Cases ─────────────────────────────────────────────────────
+
+@case('map_markers')
+def map_markers(ctx):
+    from apps.trees.views import MapDataView
+    ctx.get(MapDataView, f'/api/trees/map/?bbox={ctx.bbox}', ctx.worker)
+
+
+@case('map_clusters')
+def map_clusters(ctx):
+    from apps.trees.views import MapDataView
+    ctx.get(MapDataView, f'/api/trees/map/?bbox={ctx.city_bbox}&zoom=11', ctx.worker)
+
+
+@case('tree_list')
+def tree_list(ctx):
+    from apps.trees.views import TreeListCreateView
+    ctx.get(TreeListCreateView, '/api/trees/', ctx.worker)
+
+
+@case('tree_list_zone')
+def tree_list_zone(ctx):
+    from apps.trees.views import TreeListCreateView
+    ctx.get(TreeListCreateView, f'/api/trees/?zone={ctx.zone.id}&health=at_risk', ctx.supervisor)
+
+
+def _cold_cache(ctx):
+    from .cache import bump_version
+    bump_version()
+
+
+@case('dashboard', setup=_cold_cache)
+def dashboard(ctx):
+    from .views import DashboardSummaryView
+    ctx.get(DashboardSummaryView, '/api/reports/summary/', ctx.admin)
+
+
+@case('zone_list')
+def zone_list(ctx):
+    from apps.zones.views import ZoneListCreateView
+    ctx.get(ZoneListCreateView, '/api/zones/', ctx.admin)
+
+
+@case('export_csv', repeat=3)
+def export_csv(ctx):
+    from .views import ExportCSVView
+    ctx.get(ExportCSVView, '/api/reports/export/csv/', ctx.admin)
+
+
+@case('export_ndjson', repeat=3)
+def export_ndjson(ctx):
+    from .exports import get_dataset
+    from .writers import write_export
+
+    dataset = get_dataset('tasks')
+    write_export(_Sink(), 'ndjson', dataset, dataset.filter({}), list(dataset.columns))
+
+
+def _no_send(**kwargs):
+    pass
+
+
+@case('overdue_alerts', repeat=3)
+def overdue_alerts(ctx):
+    from apps.tasks.tasks import send_overdue_task_alerts_resend
+    with contextlib.redirect_stdout(io.StringIO()):
+        send_overdue_task_alerts_resend(_no_send)
+
+
+@case('inspection_reminders', repeat=3)
+def inspection_reminders(ctx):
+    from apps.trees.tasks import send_health_check_reminders_resend
+    with contextlib.redirect_stdout(io.StringIO()):
+        send_health_check_reminders_resend(_no_send)
+
+
+# ── Running and comparing ─────────────────────────────────────
+
+def measure(bench, ctx, repeat):
+    timings = []
+    queries = 0
+    for i in range(repeat + 1):
+        if bench.setup:
+            bench.setup(ctx)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            bench.run(ctx)
+            elapsed = time.perf_counter() - started
+        if i:  # the first run only warms caches up
+            timings.append(elapsed * 1000)
+            queries = max(queries, len(captured))
+    return {
+        'queries': queries,
+        'p50_ms': round(float(np.percentile(timings, 50)), 2),
+        'p95_ms': round(float(np.percentile(timings, 95)), 2),
+        'runs': len(timings),
+    }
+
+
+def run(cases=None, repeat=None, progress=None):
+    """{case name: {queries, p50_ms, p95_ms, runs}} for the given cases (default all)."""
+    unknown = [name for name in cases or () if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown cases: {', '.join(unknown)}. Choose from: {', '.join(CASES)}")
+    ctx = Context()
+    results = {}
+    for name in cases or CASES:
+        bench = CASES[name]
+        results[name] = measure(bench, ctx, repeat or bench.repeat or settings.BENCHMARK_REPEAT)
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def data_sizes():
+    from django.contrib.auth import get_user_model
+    from apps.tasks.models import MaintenanceTask
+    from apps.trees.models import HealthLog, Tree
+    from apps.zones.models import Zone
+
+    return {
+        'zones': Zone.objects.count(), 'users': get_user_model().objects.count(),
+        'trees': Tree.objects.count(), 'logs': HealthLog.objects.count(),
+        'tasks': MaintenanceTask.objects.count(),
+    }
+
+
+def compare(results, baseline, tolerance=None, slack_ms=None):
+    """Regressions of `results` against one baseline entry, as readable strings."""
+    tolerance = settings.BENCHMARK_LATENCY_TOLERANCE if tolerance is None else tolerance
+    slack_ms = settings.BENCHMARK_LATENCY_SLACK_MS if slack_ms is None else slack_ms
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('cases', {}).get(name)
+        if not base:
+            continue
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: {result['queries']} queries (baseline {base['queries']})")
+        limit = base['p95_ms'] * (1 + tolerance) + slack_ms
+        if result['p95_ms'] > limit:
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms (baseline {base['p95_ms']} ms, "
+                               f"limit {limit:.1f} ms)")
+    return regressions
+
+
+def load_baseline(path=None):
+    try:
+        with open(path or settings.BENCHMARK_BASELINE, encoding='utf-8') as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(label, sizes, results, path=None):
+    path = path or settings.BENCHMARK_BASELINE
+    baseline = load_baseline(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    entry = baseline.setdefault(label, {'cases': {}})
+    entry['sizes'] = sizes
+    entry['cases'].update(results)
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(baseline, fh, indent=2, sort_keys=True)
+        fh.write('\n')
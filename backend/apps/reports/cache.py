@@ -0,0 +1,56 @@
+"""
+Versioned cache for report payloads.
+
+Every cached payload key embeds the current dataset version:
+
+    reports:<name>:v<version>
+
+Any write to trees, health logs, tasks or zones bumps the version (see
+signals.py), which orphans every cached payload at once. Nothing has to be
+deleted key by key, and the orphans simply expire.
+
+Usage:
+    from apps.reports import cache as report_cache
+    data = report_cache.cached('dashboard', build_dashboard, today.isoformat())
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'reports:dataset_version'
+
+
+def dataset_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seeded from the clock so a lost key never reuses an old version
+        cache.add(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # Key missing (first write, eviction or restart)
+        version = time.time_ns() // 1000
+        cache.set(VERSION_KEY, version, timeout=None)
+        return version
+
+
+def cache_key(name, *parts):
+    suffix = ':'.join(str(p) for p in parts)
+    key = f'reports:{name}:v{dataset_version()}'
+    return f'{key}:{suffix}' if suffix else key
+
+
+def cached(name, builder, *parts, timeout=None):
+    """Return the cached payload for (name, parts) or build and store it."""
+    key = cache_key(name, *parts)
+    data = cache.get(key)
+    if data is None:
+        data = builder()
+        cache.set(key, data, timeout or settings.REPORTS_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,104 @@
+"""
+The runner behind /api/cron/ and the daily Celery beat entries.
+
+    run, dispatch = trigger('overdue_alerts')   # today's CronRun; dispatch: it needs a worker
+    execute(run.id)                             # in the worker (tasks.run_cron_job)
+
+A job runs at most once a day. trigger() hands back the day's run, only
+asking for a worker while it hasn't completed. execute() first takes a
+lease on the row, so two workers never run a job at the same time, and
+the job writes its emails to the outbox (apps.notifications) in the same
+transaction that marks the run completed: a run that fails or loses its
+lease queues nothing, and a retried one can't queue the emails twice.
+deliver_outbox sends them afterwards.
+"""
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# job -> function taking send_fn(to_email, subject, html_body), returning a summary
+JOBS = {
+    'overdue_alerts': 'apps.tasks.tasks.send_overdue_task_alerts_resend',
+    'inspection_reminders': 'apps.trees.tasks.send_health_check_reminders_resend',
+}
+
+
+class LeaseLost(Exception):
+    """Another worker took the run over (our lease expired) before we finished."""
+
+
+def trigger(job, today=None):
+    """(run, dispatch): today's CronRun for `job` and whether a worker should be started for it."""
+    from .models import CronRun
+
+    today = today or timezone.localdate()
+    with transaction.atomic():
+        run, created = CronRun.objects.select_for_update().get_or_create(job=job, run_date=today)
+        if created or run.status == 'pending':
+            # A repeated dispatch is harmless: only one worker gets the lease
+            return run, True
+        if run.status == 'completed':
+            return run, False
+        if run.status == 'running' and run.lease_expires_at and run.lease_expires_at > timezone.now():
+            return run, False
+        # Failed, or its worker died: run it again
+        run.status = 'pending'
+        run.save(update_fields=['status'])
+        return run, True
+
+
+def execute(run_id):
+    """
+    Run a CronRun under a lease. Returns the final status, or 'skipped'
+    when the run is finished or another worker holds it.
+    """
+    from apps.notifications.outbox import enqueue
+    from .models import CronRun
+
+    owner = uuid.uuid4().hex
+    now = timezone.now()
+    taken = CronRun.objects.filter(pk=run_id).exclude(status='completed').filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+    ).update(
+        status='running', attempts=F('attempts') + 1, started_at=now, error='',
+        lease_owner=owner, lease_expires_at=now + timedelta(seconds=settings.CRON_LEASE_SECONDS),
+    )
+    if not taken:
+        return 'skipped'
+
+    run = CronRun.objects.get(pk=run_id)
+    started = time.monotonic()
+    queued = 0
+
+    def send(to_email, subject, html_body):
+        nonlocal queued
+        enqueue(to_email, subject, html_body, category=run.job)
+        queued += 1
+
+    def finish(**fields):
+        released = CronRun.objects.filter(pk=run_id, lease_owner=owner).update(
+            finished_at=timezone.now(), duration_seconds=round(time.monotonic() - started, 3),
+            lease_owner='', lease_expires_at=None, **fields,
+        )
+        if not released:
+            raise LeaseLost()
+
+    try:
+        with transaction.atomic():
+            result = import_string(JOBS[run.job])(send)
+            finish(status='completed', result=result, emails_queued=queued)
+    except LeaseLost:
+        return 'skipped'
+    except Exception as e:
+        try:
+            finish(status='failed', error=str(e), emails_queued=0)
+        except LeaseLost:
+            return 'skipped'
+        return 'failed'
+    return 'completed'
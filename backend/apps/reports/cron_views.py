@@ -1,86 +1,58 @@
-import os
-import json
-import threading
-import traceback
-import urllib.request
+import hmac
+import logging
+
+from django.conf import settings
+from django.db import transaction
 from django.http import JsonResponse
-from django.views import View
 from django.utils.decorators import method_decorator
+from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 
+logger = logging.getLogger(__name__)
 
-def verify_cron_token(request):
-    token = request.headers.get('X-Cron-Token') or request.GET.get('token')
-    expected = os.environ.get('CRON_SECRET_TOKEN', '')
-    return token == expected and expected != ''
-
-
-def send_email_via_resend(to_email, subject, html_body):
-    """Send email using Resend HTTP API (port 443 - not blocked by Render)"""
-    api_key = os.environ.get('RESEND_API_KEY', '')
-    if not api_key:
-        raise ValueError("RESEND_API_KEY not set")
-
-    from_email = os.environ.get('DEFAULT_FROM_EMAIL', 'onboarding@resend.dev')
-    # Extract just the email if format is "Name <email>"
-    if '<' in from_email:
-        from_email = from_email.split('<')[1].strip('>')
 
-    payload = json.dumps({
-        'from': from_email,
-        'to': [to_email],
-        'subject': subject,
-        'html': html_body,
-    }).encode('utf-8')
+def verify_cron_token(request):
+    token = request.headers.get('X-Cron-Token') or request.GET.get('token') or ''
+    expected = settings.CRON_SECRET_TOKEN
+    return bool(expected) and hmac.compare_digest(token, expected)
 
-    req = urllib.request.Request(
-        'https://api.resend.com/emails',
-        data=payload,
-        headers={
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json',
-        },
-        method='POST'
-    )
 
-    try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            result = json.loads(resp.read())
-            return result
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode()
-        raise Exception(f"Resend API error {e.code}: {error_body}")
+def run_response(request, run, status=200):
+    from .serializers import CronRunSerializer
+    return JsonResponse(CronRunSerializer(run, context={'request': request}).data, status=status)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class SendOverdueAlertsView(View):
+class CronTriggerView(View):
+    """
+    POST starts today's run of `job` on a worker and answers 202 with the
+    run (poll its status_url). Once the day's run has completed, further
+    triggers return it with 200 and send nothing. See cron.py.
+    """
+    job = None
+
     def post(self, request):
+        from .cron import trigger
+        from .tasks import run_cron_job
+
         if not verify_cron_token(request):
             return JsonResponse({'error': 'Unauthorized'}, status=401)
-        try:
-            print("[CRON] Starting overdue alerts...")
-            from apps.tasks.tasks import send_overdue_task_alerts_resend
-            result = send_overdue_task_alerts_resend(send_email_via_resend)
-            print(f"[CRON] Done: {result}")
-            return JsonResponse({'status': 'success', 'result': result})
-        except Exception as e:
-            tb = traceback.format_exc()
-            print(f"[CRON] FAILED:\n{tb}")
-            return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
+        run, dispatch = trigger(self.job)
+        if dispatch:
+            transaction.on_commit(lambda: run_cron_job.delay(run.id))
+        logger.info('Cron trigger %s: run #%s %s%s', self.job, run.id, run.status,
+                    '' if dispatch else ' (not started again)')
+        return run_response(request, run, status=200 if run.status == 'completed' else 202)
+
+
+class CronRunDetailView(View):
+    def get(self, request, pk):
+        from .models import CronRun
 
-@method_decorator(csrf_exempt, name='dispatch')
-class SendInspectionRemindersView(View):
-    def post(self, request):
         if not verify_cron_token(request):
             return JsonResponse({'error': 'Unauthorized'}, status=401)
-        try:
-            print("[CRON] Starting inspection reminders...")
-            from apps.trees.tasks import send_health_check_reminders_resend
-            result = send_health_check_reminders_resend(send_email_via_resend)
-            print(f"[CRON] Done: {result}")
-            return JsonResponse({'status': 'success', 'result': result})
-        except Exception as e:
-            tb = traceback.format_exc()
-            print(f"[CRON] FAILED:\n{tb}")
-            return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
\ No newline at end of file
+        run = CronRun.objects.filter(pk=pk).first()
+        if run is None:
+            return JsonResponse({'error': 'Cron run not found'}, status=404)
+        return run_response(request, run)
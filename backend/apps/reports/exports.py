@@ -0,0 +1,235 @@
+"""
+Tree, health-log and task exports.
+
+Each exportable table is a Dataset: its columns (header, queryset path or
+expression, value kind), the FilterSet its list endpoint already uses and,
+for GeoJSON, where its coordinates live.
+
+Rows are read with QuerySet.iterator(), which on PostgreSQL uses a
+server-side cursor and fetches EXPORT_CHUNK_SIZE rows per round trip, and
+are written one chunk at a time, so memory stays flat however many rows
+match. Only the selected columns are fetched, as plain values_list tuples.
+
+    dataset = get_dataset('trees')
+    columns = dataset.parse_columns('tag_number,species')
+    rows = dataset.rows(dataset.filter({'zone': 3}), columns)
+    StreamingHttpResponse(stream_csv(rows, dataset.headers(columns), gzip=True))
+
+Background jobs write the same rows through writers.py (see ExportJob).
+"""
+import csv
+import zlib
+from collections import namedtuple
+
+from django.conf import settings
+from django_filters import rest_framework as django_filters
+
+from apps.common.queries import full_name
+from apps.trees.models import HealthLog, Tree
+
+Column = namedtuple('Column', ['header', 'source', 'kind'])
+
+
+class Dataset:
+    name = None
+    columns = {}
+    geometry = None  # (latitude path, longitude path)
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_filterset_class(self):
+        raise NotImplementedError
+
+    def scope(self, queryset, user):
+        """Restrict rows to what `user` may see through the API."""
+        return queryset
+
+    def scope_key(self, user):
+        """Part of the export cache key: who the scope depends on, if anyone."""
+        return None
+
+    def filter(self, params, user=None):
+        """Apply the list endpoint's filters; raises ValueError with the form errors."""
+        queryset = self.get_queryset()
+        if user is not None:
+            queryset = self.scope(queryset, user)
+        filterset = self.get_filterset_class()(params, queryset=queryset)
+        if not filterset.is_valid():
+            raise ValueError(filterset.errors)
+        return filterset.qs
+
+    def clean_filters(self, params):
+        """Known, non-empty filters only, as strings (stable for hashing)."""
+        known = self.get_filterset_class().base_filters
+        return {key: str(params[key]) for key in sorted(params)
+                if key in known and params[key] not in (None, '')}
+
+    def parse_columns(self, value):
+        """'tag_number,zone' or a list -> ['tag_number', 'zone']; raises ValueError on unknown names."""
+        if not value:
+            return list(self.columns)
+        if isinstance(value, str):
+            value = value.split(',')
+        columns = [c.strip() for c in value if c and c.strip()]
+        unknown = [c for c in columns if c not in self.columns]
+        if unknown or not columns:
+            raise ValueError(f"Unknown columns: {', '.join(unknown) or value}. "
+                             f"Choose from: {', '.join(self.columns)}")
+        return columns
+
+    def headers(self, columns):
+        return [self.columns[c].header for c in columns]
+
+    def rows(self, queryset, columns, extra=(), chunk_size=None):
+        """Yield one tuple per row: the selected columns, then any `extra` paths."""
+        annotations = {}
+        fields = []
+        for name in columns:
+            source = self.columns[name].source
+            if isinstance(source, str):
+                fields.append(source)
+            else:
+                annotations[f'_{name}'] = source
+                fields.append(f'_{name}')
+        return queryset.annotate(**annotations).order_by('id').values_list(*fields, *extra).iterator(
+            chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+
+
+class TreeDataset(Dataset):
+    name = 'trees'
+    columns = {
+        'tag_number': Column('Tag Number', 'tag_number', 'str'),
+        'species': Column('Species', 'species__common_name', 'str'),
+        'zone': Column('Zone', 'zone__name', 'str'),
+        'latitude': Column('Latitude', 'latitude', 'float'),
+        'longitude': Column('Longitude', 'longitude', 'float'),
+        'health': Column('Health Status', 'current_health', 'str'),
+        'planted_date': Column('Planted Date', 'planted_date', 'date'),
+        'height_cm': Column('Height (cm)', 'height_cm', 'int'),
+        'location_description': Column('Location Description', 'location_description', 'str'),
+        'planted_by': Column('Planted By', full_name('planted_by'), 'str'),
+        'notes': Column('Notes', 'notes', 'str'),
+    }
+    geometry = ('latitude', 'longitude')
+
+    def get_queryset(self):
+        return Tree.objects.all()
+
+    def get_filterset_class(self):
+        from apps.trees.views import TreeFilter
+        return TreeFilter
+
+
+class HealthLogFilter(django_filters.FilterSet):
+    tree = django_filters.NumberFilter(field_name='tree')
+    zone = django_filters.NumberFilter(field_name='tree__zone')
+    species = django_filters.NumberFilter(field_name='tree__species')
+    health = django_filters.CharFilter(field_name='health_status')
+    logged_after = django_filters.DateFilter(field_name='logged_at', lookup_expr='date__gte')
+    logged_before = django_filters.DateFilter(field_name='logged_at', lookup_expr='date__lte')
+
+    class Meta:
+        model = HealthLog
+        fields = ['tree', 'zone', 'species', 'health', 'logged_after', 'logged_before']
+
+
+class HealthLogDataset(Dataset):
+    name = 'health_logs'
+    columns = {
+        'id': Column('Log ID', 'id', 'int'),
+        'tree_tag': Column('Tag Number', 'tree__tag_number', 'str'),
+        'zone': Column('Zone', 'tree__zone__name', 'str'),
+        'species': Column('Species', 'tree__species__common_name', 'str'),
+        'previous_health': Column('Previous Health', 'previous_health', 'str'),
+        'health': Column('Health Status', 'health_status', 'str'),
+        'notes': Column('Notes', 'notes', 'str'),
+        'logged_by': Column('Logged By', full_name('logged_by'), 'str'),
+        'logged_at': Column('Logged At', 'logged_at', 'datetime'),
+    }
+    geometry = ('tree__latitude', 'tree__longitude')
+
+    def get_queryset(self):
+        return HealthLog.objects.all()
+
+    def get_filterset_class(self):
+        return HealthLogFilter
+
+
+class TaskDataset(Dataset):
+    name = 'tasks'
+    columns = {
+        'id': Column('Task ID', 'id', 'int'),
+        'title': Column('Title', 'title', 'str'),
+        'task_type': Column('Type', 'task_type', 'str'),
+        'priority': Column('Priority', 'priority', 'str'),
+        'status': Column('Status', 'status', 'str'),
+        'zone': Column('Zone', 'zone__name', 'str'),
+        'tree_tag': Column('Tag Number', 'tree__tag_number', 'str'),
+        'assigned_to': Column('Assigned To', full_name('assigned_to'), 'str'),
+        'due_date': Column('Due Date', 'due_date', 'date'),
+        'completed_at': Column('Completed At', 'completed_at', 'datetime'),
+    }
+    # Zone-wide tasks have no tree, and so no point
+    geometry = ('tree__latitude', 'tree__longitude')
+
+    def get_queryset(self):
+        from apps.tasks.models import MaintenanceTask
+        return MaintenanceTask.objects.all()
+
+    def get_filterset_class(self):
+        from apps.tasks.views import TaskFilter
+        return TaskFilter
+
+    def scope(self, queryset, user):
+        # Same rule as the task list: field workers only see their own tasks
+        if user.role == 'field_worker':
+            return queryset.filter(assigned_to=user)
+        return queryset
+
+    def scope_key(self, user):
+        return user.id if user.role == 'field_worker' else None
+
+
+DATASETS = {cls.name: cls for cls in (TreeDataset, HealthLogDataset, TaskDataset)}
+
+
+def get_dataset(name):
+    try:
+        return DATASETS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown dataset '{name}'. Choose from: {', '.join(DATASETS)}")
+
+
+class _Buffer:
+    """File-like sink for csv.writer that just hands the line back."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, headers, gzip=False, chunk_size=None):
+    """Yield the CSV as byte chunks (header first), gzip-compressed if asked."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    writer = csv.writer(_Buffer())
+    compressor = zlib.compressobj(wbits=31) if gzip else None  # 31: gzip container
+
+    def emit(text):
+        data = text.encode('utf-8')
+        return compressor.compress(data) if compressor else data
+
+    yield emit(writer.writerow(headers))
+    lines = []
+    for row in rows:
+        lines.append(writer.writerow(['' if v is None else v for v in row]))
+        if len(lines) >= chunk_size:
+            # compressobj may buffer everything; only yield when it emits
+            data = emit(''.join(lines))
+            lines = []
+            if data:
+                yield data
+    tail = emit(''.join(lines))
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
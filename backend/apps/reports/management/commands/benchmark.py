@@ -0,0 +1,90 @@
+"""
+Time the hot endpoints and jobs, and fail on regressions against the stored
+baseline (BENCHMARK_BASELINE). See apps/reports/benchmarks.py.
+
+With --sizes, synthetic data is regenerated at each profile (generate_data)
+and results are compared under that profile's name. Without it the current
+database is measured under --label.
+Usage: python manage.py benchmark [--sizes small,medium] [--case map_markers --case dashboard]
+       [--repeat 10] [--label current] [--save-baseline] [--tolerance 0.5] [--output results.json]
+       [--noinput]
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Benchmark hot endpoints (query counts, p50/p95 latency) against a stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', help='Comma-separated generate_data profiles to run at')
+        parser.add_argument('--case', action='append', dest='cases', help='Case to run (repeatable)')
+        parser.add_argument('--repeat', type=int, help='Timed runs per case (BENCHMARK_REPEAT)')
+        parser.add_argument('--label', default='current',
+                            help='Baseline entry for runs without --sizes')
+        parser.add_argument('--baseline', help='Baseline JSON file (BENCHMARK_BASELINE)')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Store these results as the new baseline instead of comparing')
+        parser.add_argument('--tolerance', type=float,
+                            help='Allowed p95 increase as a fraction (BENCHMARK_LATENCY_TOLERANCE)')
+        parser.add_argument('--output', help='Also write the results to this JSON file')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Do not ask before regenerating synthetic data')
+
+    def handle(self, *args, **options):
+        from apps.reports import benchmarks
+        from apps.trees import synthetic
+
+        sizes = [s.strip() for s in (options['sizes'] or '').split(',') if s.strip()]
+        unknown = [s for s in sizes if s not in synthetic.PROFILES]
+        if unknown:
+            raise CommandError(f"Unknown sizes: {', '.join(unknown)}. "
+                               f"Choose from: {', '.join(synthetic.PROFILES)}")
+        if sizes and options['interactive']:
+            answer = input('This deletes and regenerates the synthetic data set. Continue? [y/N] ')
+            if answer.strip().lower() not in ('y', 'yes'):
+                raise CommandError('Cancelled')
+
+        baseline = benchmarks.load_baseline(options['baseline'])
+        report = {}
+        regressions = []
+        for label in sizes or [options['label']]:
+            if sizes:
+                self.stdout.write(f'Generating the {label} data set...')
+                synthetic.reset()
+                synthetic.generate(**synthetic.PROFILES[label])
+            counts = benchmarks.data_sizes()
+            self.stdout.write(f'[{label}] ' + ', '.join(f'{v} {k}' for k, v in counts.items()))
+
+            def progress(name, result):
+                self.stdout.write(f"  {name:<22} {result['queries']:>5} queries"
+                                  f"  p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms")
+
+            try:
+                results = benchmarks.run(options['cases'], options['repeat'], progress=progress)
+            except ValueError as e:
+                raise CommandError(str(e))
+            report[label] = {'sizes': counts, 'cases': results}
+
+            if options['save_baseline']:
+                benchmarks.save_baseline(label, counts, results, options['baseline'])
+                continue
+            if label not in baseline:
+                self.stdout.write(self.style.WARNING(f'  No baseline for {label}; run with --save-baseline'))
+                continue
+            if baseline[label].get('sizes') != counts:
+                self.stdout.write(self.style.WARNING(
+                    f"  Data differs from the baseline's ({baseline[label].get('sizes')})"))
+            regressions += [f'[{label}] {r}' for r in
+                            benchmarks.compare(results, baseline[label], options['tolerance'])]
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, indent=2)
+        if options['save_baseline']:
+            self.stdout.write(self.style.SUCCESS('Baseline saved'))
+        elif regressions:
+            raise CommandError('Regressions:\n  ' + '\n  '.join(regressions))
+        else:
+            self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,57 @@
+"""
+EXPLAIN the SQL of the hot views and jobs and fail when a filtered query
+reads a large table with a full scan. See apps/reports/plans.py.
+
+With --size, synthetic data is regenerated at that profile first
+(generate_data); otherwise the current database is checked.
+Usage: python manage.py check_query_plans [--size small] [--check task_list_overdue --check tree_detail]
+       [--planner-defaults] [--noinput]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Check that the hot queries use indexes instead of full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', help='generate_data profile to regenerate the data at first')
+        parser.add_argument('--check', action='append', dest='checks', help='Check to run (repeatable)')
+        parser.add_argument('--planner-defaults', action='store_true',
+                            help="PostgreSQL: keep enable_seqscan on (plans as they'd run on this data)")
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Do not ask before regenerating synthetic data')
+
+    def handle(self, *args, **options):
+        from apps.reports import benchmarks, plans
+        from apps.trees import synthetic
+
+        size = options['size']
+        if size:
+            if size not in synthetic.PROFILES:
+                raise CommandError(f"Unknown size: {size}. Choose from: {', '.join(synthetic.PROFILES)}")
+            if options['interactive']:
+                answer = input('This deletes and regenerates the synthetic data set. Continue? [y/N] ')
+                if answer.strip().lower() not in ('y', 'yes'):
+                    raise CommandError('Cancelled')
+            self.stdout.write(f'Generating the {size} data set...')
+            synthetic.reset()
+            synthetic.generate(**synthetic.PROFILES[size])
+        counts = benchmarks.data_sizes()
+        self.stdout.write(', '.join(f'{v} {k}' for k, v in counts.items()))
+
+        def progress(name, scans):
+            status = self.style.SUCCESS('ok') if not scans else self.style.ERROR(
+                'full scan of ' + ', '.join(sorted({table for table, _ in scans})))
+            self.stdout.write(f'  {name:<24} {status}')
+
+        try:
+            results = plans.run(options['checks'], options['planner_defaults'], progress=progress)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        failures = [(name, table, sql) for name, scans in results.items() for table, sql in scans]
+        if failures:
+            for name, table, sql in failures:
+                self.stderr.write(f'{name}: {table}\n    {sql}')
+            raise CommandError(f'{len(failures)} queries fall back to a full scan')
+        self.stdout.write(self.style.SUCCESS(f'All {len(results)} checks use indexes'))
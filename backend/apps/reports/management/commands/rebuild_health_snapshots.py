@@ -0,0 +1,22 @@
+"""
+Rebuild the daily HealthSnapshot table by replaying HealthLog history.
+Run after importing historical trees/logs or editing them outside the API.
+Usage: python manage.py rebuild_health_snapshots [--start 2024-01-01]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Replay health logs into daily per-zone/per-species snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat,
+                            help='Only rewrite snapshots from this date (YYYY-MM-DD) onwards')
+
+    def handle(self, *args, **options):
+        from apps.reports.snapshots import rebuild
+
+        rows = rebuild(start=options['start'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} health snapshot rows'))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('zones', '0004_backfill_zone_stats'),
+        ('trees', '0006_tag_number_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('healthy', models.IntegerField(default=0)),
+                ('at_risk', models.IntegerField(default=0)),
+                ('dead', models.IntegerField(default=0)),
+                ('planted_total', models.IntegerField(default=0)),
+                ('died_total', models.IntegerField(default=0)),
+                ('species', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='health_snapshots', to='trees.species')),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='health_snapshots', to='zones.zone')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['zone', 'date'], name='health_snapshot_zone_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='healthsnapshot',
+            constraint=models.UniqueConstraint(fields=('date', 'zone', 'species'), name='unique_health_snapshot'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def backfill_health_snapshots(apps, schema_editor):
+    from apps.reports.snapshots import rebuild
+
+    rebuild(models={
+        'Tree': apps.get_model('trees', 'Tree'),
+        'HealthLog': apps.get_model('trees', 'HealthLog'),
+        'HealthSnapshot': apps.get_model('reports', 'HealthSnapshot'),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_health_snapshots, migrations.RunPython.noop),
+    ]
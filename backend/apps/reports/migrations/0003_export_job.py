@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:52
+
+import apps.common.storage
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0002_backfill_health_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('dataset', models.CharField(choices=[('trees', 'Trees'), ('health_logs', 'Health logs'), ('tasks', 'Maintenance tasks')], max_length=20)),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('ndjson', 'Newline-delimited JSON'), ('geojson', 'GeoJSON FeatureCollection'), ('parquet', 'Parquet'), ('arrow', 'Arrow IPC')], max_length=20)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('columns', models.JSONField(blank=True, default=list)),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('dataset_version', models.BigIntegerField(blank=True, null=True)),
+                ('file', models.FileField(blank=True, null=True, storage=apps.common.storage.export_storage, upload_to='exports/%Y/%m/')),
+                ('row_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('size_bytes', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_export_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='dataset',
+            field=models.CharField(choices=[('trees', 'Trees'), ('health_logs', 'Health logs'), ('tasks', 'Maintenance tasks'), ('report', 'PDF report')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='exportjob',
+            name='format',
+            field=models.CharField(choices=[('csv', 'CSV'), ('ndjson', 'Newline-delimited JSON'), ('geojson', 'GeoJSON FeatureCollection'), ('parquet', 'Parquet'), ('arrow', 'Arrow IPC'), ('pdf', 'PDF')], max_length=20),
+        ),
+    ]
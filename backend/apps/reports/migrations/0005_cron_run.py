@@ -0,0 +1,39 @@
+# Generated by Django 4.2.9 on 2026-10-17 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_report_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CronRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(choices=[('overdue_alerts', 'Overdue task alerts'), ('inspection_reminders', 'Inspection reminders')], max_length=50)),
+                ('run_date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('lease_owner', models.CharField(blank=True, max_length=32)),
+                ('lease_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('result', models.TextField(blank=True)),
+                ('emails_queued', models.PositiveIntegerField(blank=True, null=True)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='cronrun',
+            constraint=models.UniqueConstraint(fields=('job', 'run_date'), name='unique_cron_run_per_day'),
+        ),
+    ]
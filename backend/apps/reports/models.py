@@ -0,0 +1,175 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from apps.common.storage import export_storage
+
+
+class HealthSnapshot(models.Model):
+    """
+    End-of-day tree counts per (zone, species), the store behind trend charts.
+    healthy/at_risk/dead are the counts on that day; planted_total and
+    died_total are cumulative, so a period's flow is the difference between
+    its last day and the day before it. Filled by snapshots.py.
+    """
+    date = models.DateField()
+    zone = models.ForeignKey('zones.Zone', on_delete=models.CASCADE, related_name='health_snapshots')
+    species = models.ForeignKey('trees.Species', on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='health_snapshots')
+    healthy = models.IntegerField(default=0)
+    at_risk = models.IntegerField(default=0)
+    dead = models.IntegerField(default=0)
+    planted_total = models.IntegerField(default=0)
+    died_total = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'zone', 'species'], name='unique_health_snapshot'),
+        ]
+        indexes = [
+            models.Index(fields=['zone', 'date'], name='health_snapshot_zone_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Snapshot {self.date} zone #{self.zone_id} species #{self.species_id}"
+
+
+class ExportJob(models.Model):
+    """
+    A bulk export or PDF report built by a Celery worker (see
+    tasks.run_export_job and tasks.run_report_job).
+    content_hash identifies the query (dataset, format, filters, columns,
+    scope) at a dataset version, so a finished file can be handed out again
+    until the data changes.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    DATASET_CHOICES = [
+        ('trees', 'Trees'),
+        ('health_logs', 'Health logs'),
+        ('tasks', 'Maintenance tasks'),
+        ('report', 'PDF report'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('ndjson', 'Newline-delimited JSON'),
+        ('geojson', 'GeoJSON FeatureCollection'),
+        ('parquet', 'Parquet'),
+        ('arrow', 'Arrow IPC'),
+        ('pdf', 'PDF'),
+    ]
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='export_jobs'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    dataset = models.CharField(max_length=20, choices=DATASET_CHOICES)
+    format = models.CharField(max_length=20, choices=FORMAT_CHOICES)
+    filters = models.JSONField(default=dict, blank=True)
+    columns = models.JSONField(default=list, blank=True)
+
+    content_hash = models.CharField(max_length=64, db_index=True)
+    dataset_version = models.BigIntegerField(null=True, blank=True)
+
+    # Output
+    file = models.FileField(upload_to='exports/%Y/%m/', storage=export_storage, blank=True, null=True)
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    size_bytes = models.PositiveBigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Export job #{self.id} {self.dataset}.{self.format} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    def reuse_finished(self):
+        """Point this job at an existing file built for the same hash; returns True if found."""
+        done = ExportJob.objects.filter(
+            content_hash=self.content_hash, status='completed'
+        ).exclude(file='').exclude(file=None).first()
+        if not done:
+            return False
+        self.status = 'completed'
+        self.file.name = done.file.name
+        self.row_count = done.row_count
+        self.size_bytes = done.size_bytes
+        self.started_at = self.finished_at = timezone.now()
+        return True
+
+    @staticmethod
+    def make_hash(dataset, fmt, filters, columns, version, scope=None):
+        payload = json.dumps(
+            [dataset, fmt, filters, columns, version, scope], sort_keys=True, separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CronRun(models.Model):
+    """
+    One day's run of a scheduled job (see cron.py). (job, run_date) is
+    unique, so a repeated trigger finds the day's run instead of sending
+    the emails again. The worker executing it holds a lease
+    (lease_owner until lease_expires_at); a run whose worker died can be
+    taken over once the lease has expired.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    JOB_CHOICES = [
+        ('overdue_alerts', 'Overdue task alerts'),
+        ('inspection_reminders', 'Inspection reminders'),
+    ]
+
+    job = models.CharField(max_length=50, choices=JOB_CHOICES)
+    run_date = models.DateField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+
+    lease_owner = models.CharField(max_length=32, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+    # Output
+    result = models.TextField(blank=True)
+    emails_queued = models.PositiveIntegerField(null=True, blank=True)
+    duration_seconds = models.FloatField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'run_date'], name='unique_cron_run_per_day'),
+        ]
+
+    def __str__(self):
+        return f"Cron run #{self.id} {self.job} {self.run_date} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
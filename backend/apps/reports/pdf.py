@@ -0,0 +1,201 @@
+"""
+Full PDF report: a city summary followed by a section per zone (species
+mix, at-risk trees, overdue tasks).
+
+All data is read up front in a handful of grouped queries and split into
+plain dicts, one per section. Rendering is the slow part, so sections are
+rendered independently in a process pool (REPORT_WORKERS, 0 = one per CPU,
+see common/pools.py for why it also works inside the Celery worker) and the
+resulting PDFs are stitched together with pypdf. Worker processes never
+touch the database.
+
+    with open('report.pdf', 'wb') as fh:
+        pages = render_report(fh, date.today())
+"""
+import io
+import os
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+HEADER_GREEN = '#2d6a4f'
+HEADER_LIGHT = '#52b788'
+
+
+def _survival(healthy, at_risk, total):
+    return round(((healthy + at_risk) / total * 100), 1) if total else 0
+
+
+# ── Data ──────────────────────────────────────────────────────
+
+def report_sections(day):
+    """[summary section, zone section, ...] as picklable dicts."""
+    from apps.common.queries import full_name
+    from apps.tasks.models import MaintenanceTask
+    from apps.trees.models import Tree
+    from .views import build_dashboard
+
+    summary = build_dashboard(day)
+    zones = {
+        z['id']: {**z, 'kind': 'zone', 'day': day, 'species': [], 'at_risk': [], 'overdue': []}
+        for z in summary['zones']
+    }
+
+    for r in Tree.objects.values('zone_id', 'species__common_name').annotate(
+        total=Count('id'),
+        healthy=Count('id', filter=Q(current_health='healthy')),
+        at_risk=Count('id', filter=Q(current_health='at_risk')),
+        dead=Count('id', filter=Q(current_health='dead')),
+    ).order_by('zone_id', '-total'):
+        zones[r['zone_id']]['species'].append(
+            [r['species__common_name'] or 'Unknown', r['total'], r['healthy'], r['at_risk'], r['dead']]
+        )
+
+    for zone_id, *row in Tree.objects.filter(current_health='at_risk').order_by(
+            'zone_id', 'tag_number').values_list(
+            'zone_id', 'tag_number', 'species__common_name', 'planted_date',
+            'location_description').iterator():
+        zones[zone_id]['at_risk'].append(row)
+
+    for zone_id, *row in MaintenanceTask.objects.filter(
+            status='pending', due_date__lt=day).annotate(assignee=full_name('assigned_to')).order_by(
+            'zone_id', 'due_date').values_list(
+            'zone_id', 'title', 'priority', 'due_date', 'assignee', 'tree__tag_number').iterator():
+        zones[zone_id]['overdue'].append(row)
+
+    summary = {
+        'kind': 'summary', 'day': day, 'trees': summary['trees'], 'tasks': summary['tasks'],
+        'zones': summary['zones'],
+    }
+    return [summary] + list(zones.values())
+
+
+# ── Rendering ─────────────────────────────────────────────────
+
+def _table(rows, widths, header_color=HEADER_LIGHT):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    table = Table(rows, colWidths=widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header_color)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f4f0')]),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#cccccc')),
+    ]))
+    return table
+
+
+def _summary_story(section, styles):
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Spacer
+
+    trees = section['trees']
+    tasks = section['tasks']
+    story = [
+        Paragraph("🌳 Tree & Green Asset Tracker", styles['Title']),
+        Paragraph(f"Summary Report — Generated on {section['day'].strftime('%B %d, %Y')}", styles['Normal']),
+        Spacer(1, 0.3 * inch),
+        Paragraph("City-Wide Summary", styles['Heading2']),
+        _table([
+            ['Metric', 'Count'],
+            ['Total Trees', str(trees['total'])],
+            ['Healthy', str(trees['healthy'])],
+            ['At Risk', str(trees['at_risk'])],
+            ['Dead', str(trees['dead'])],
+            ['Survival Rate', f"{trees['survival_rate']}%"],
+            ['Pending Tasks', str(tasks['pending'])],
+            ['Overdue Tasks', str(tasks['overdue'])],
+        ], [3 * inch, 2 * inch], HEADER_GREEN),
+        Spacer(1, 0.3 * inch),
+        Paragraph("Zone-wise Breakdown", styles['Heading2']),
+    ]
+    zone_rows = [['Zone', 'Total', 'Healthy', 'At Risk', 'Dead', 'Survival %']]
+    for z in section['zones']:
+        sr = _survival(z['healthy_count'], z['at_risk_count'], z['total'])
+        zone_rows.append([z['name'], z['total'], z['healthy_count'], z['at_risk_count'],
+                          z['dead_count'], f"{sr}%"])
+    story.append(_table(zone_rows, [2 * inch, 0.8 * inch, 0.8 * inch, 0.8 * inch, 0.7 * inch, 1 * inch]))
+    return story
+
+
+def _zone_story(section, styles):
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Spacer
+
+    sr = _survival(section['healthy_count'], section['at_risk_count'], section['total'])
+    story = [
+        Paragraph(escape(f"{section['name']} — {section['city']}"), styles['Heading1']),
+        Paragraph(
+            f"{section['total']} trees: {section['healthy_count']} healthy, "
+            f"{section['at_risk_count']} at risk, {section['dead_count']} dead "
+            f"({sr}% survival). {len(section['overdue'])} overdue tasks.",
+            styles['Normal'],
+        ),
+        Spacer(1, 0.2 * inch),
+        Paragraph("Species Mix", styles['Heading2']),
+    ]
+    if section['species']:
+        story.append(_table([['Species', 'Total', 'Healthy', 'At Risk', 'Dead']] + section['species'],
+                            [2.2 * inch, 0.9 * inch, 0.9 * inch, 0.9 * inch, 0.9 * inch]))
+    else:
+        story.append(Paragraph("No trees registered.", styles['Normal']))
+
+    story += [Spacer(1, 0.2 * inch), Paragraph("At-Risk Trees", styles['Heading2'])]
+    if section['at_risk']:
+        rows = [['Tag', 'Species', 'Planted', 'Location']] + [
+            [tag, species or '', planted.isoformat(), location]
+            for tag, species, planted, location in section['at_risk']
+        ]
+        story.append(_table(rows, [1.1 * inch, 1.5 * inch, 1.1 * inch, 2.4 * inch]))
+    else:
+        story.append(Paragraph("None.", styles['Normal']))
+
+    story += [Spacer(1, 0.2 * inch), Paragraph("Overdue Tasks", styles['Heading2'])]
+    if section['overdue']:
+        rows = [['Task', 'Priority', 'Due', 'Assigned To', 'Tree']] + [
+            [Paragraph(escape(title), styles['Normal']), priority, due.isoformat(), assignee or '-', tag or '-']
+            for title, priority, due, assignee, tag in section['overdue']
+        ]
+        story.append(_table(rows, [2.3 * inch, 0.8 * inch, 0.9 * inch, 1.2 * inch, 0.9 * inch]))
+    else:
+        story.append(Paragraph("None.", styles['Normal']))
+    return story
+
+
+def render_section(section):
+    """One section dict -> PDF bytes."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72,
+                            topMargin=72, bottomMargin=18)
+    styles = getSampleStyleSheet()
+    story = _summary_story(section, styles) if section['kind'] == 'summary' else _zone_story(section, styles)
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def render_report(fh, day, workers=None):
+    """Write the full report for `day` to `fh`; returns the page count."""
+    from pypdf import PdfWriter
+    from apps.common.pools import process_map
+
+    sections = report_sections(day)
+    workers = min(workers or settings.REPORT_WORKERS or os.cpu_count() or 1, len(sections))
+
+    if workers <= 1:
+        parts = [render_section(s) for s in sections]
+    else:
+        parts = process_map(render_section, sections, workers)
+
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(io.BytesIO(part))
+    writer.write(fh)
+    return len(writer.pages)
@@ -0,0 +1,193 @@
+"""
+Query-plan checks for the hot filters: each check runs a real view or job
+(like the benchmarks in benchmarks.py), captures the SELECTs it sends,
+EXPLAINs them and fails when one of the check's tables is read with a full
+scan instead of through an index:
+
+    results = run(checks=['task_list_overdue'])   # {name: [(table, sql)]}, empty when fine
+
+A full scan is a Seq Scan, or an index scan without an index condition
+(reading the whole index in order) on PostgreSQL, and any SCAN on SQLite,
+where a lookup through an index shows up as SEARCH. On PostgreSQL the
+plans are taken with enable_seqscan off (unless planner_defaults=True):
+the planner then only falls back to a Seq Scan when no index can serve the
+query, so the checks don't depend on the data being large enough for the
+index to win. Run them against synthetic data (generate_data) so every
+query has rows to look at.
+
+Tables are only listed where a filter should narrow the rows down: the
+dashboard still counts every tree, and the inspection reminders read most
+living trees when inspections fall behind; those are full scans by design.
+"""
+import json
+import re
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Django's subquery aliases: FROM "trees_healthlog" U0
+_ALIAS = re.compile(r'"(\w+)" (?:AS )?"?([A-Z]\d+)"?')
+
+PlanCheck = namedtuple('PlanCheck', ['name', 'run', 'tables'])
+CHECKS = {}
+
+
+def plan_check(name, tables):
+    def register(fn):
+        CHECKS[name] = PlanCheck(name, fn, tuple(tables))
+        return fn
+    return register
+
+
+# ── Checks ────────────────────────────────────────────────────
+
+@plan_check('tree_list_zone_health', tables=['trees_tree'])
+def tree_list_zone_health(ctx):
+    from apps.trees.views import TreeListCreateView
+    ctx.get(TreeListCreateView, f'/api/trees/?zone={ctx.zone.id}&health=at_risk', ctx.supervisor)
+
+
+@plan_check('tree_list_health', tables=['trees_tree'])
+def tree_list_health(ctx):
+    from apps.trees.views import TreeListCreateView
+    ctx.get(TreeListCreateView, '/api/trees/?health=dead', ctx.admin)
+
+
+@plan_check('tree_list_planted', tables=['trees_tree'])
+def tree_list_planted(ctx):
+    from apps.trees.views import TreeListCreateView
+    since = timezone.localdate() - timedelta(days=30)
+    ctx.get(TreeListCreateView, f'/api/trees/?planted_after={since}', ctx.admin)
+
+
+@plan_check('tree_list_stale', tables=['trees_tree'])
+def tree_list_stale(ctx):
+    from apps.trees.views import TreeListCreateView
+    since = timezone.localdate() - timedelta(days=90)
+    ctx.get(TreeListCreateView, f'/api/trees/?inspected_before={since}', ctx.admin)
+
+
+@plan_check('map_markers', tables=['trees_tree'])
+def map_markers(ctx):
+    from apps.trees.views import MapDataView
+    ctx.get(MapDataView, f'/api/trees/map/?bbox={ctx.bbox}', ctx.worker)
+
+
+@plan_check('tree_detail', tables=['trees_healthlog'])
+def tree_detail(ctx):
+    from apps.trees.models import Tree
+    from apps.trees.views import TreeDetailView
+    tree_id = Tree.objects.filter(zone=ctx.zone).values_list('id', flat=True).first()
+    ctx.get(TreeDetailView, f'/api/trees/{tree_id}/', ctx.worker, pk=tree_id)
+
+
+@plan_check('task_list_worker', tables=['tasks_maintenancetask'])
+def task_list_worker(ctx):
+    from apps.tasks.views import TaskListCreateView
+    ctx.get(TaskListCreateView, '/api/tasks/?status=pending', ctx.worker)
+
+
+@plan_check('task_list_overdue', tables=['tasks_maintenancetask'])
+def task_list_overdue(ctx):
+    from apps.tasks.views import TaskListCreateView
+    ctx.get(TaskListCreateView, f'/api/tasks/?zone={ctx.zone.id}&overdue=true', ctx.supervisor)
+
+
+@plan_check('dashboard_activity', tables=['trees_healthlog'])
+def dashboard_activity(ctx):
+    from .cache import bump_version
+    from .views import DashboardSummaryView
+    bump_version()
+    ctx.get(DashboardSummaryView, '/api/reports/summary/', ctx.admin)
+
+
+@plan_check('overdue_refresh', tables=['tasks_maintenancetask'])
+def overdue_refresh(ctx):
+    from apps.zones.stats import refresh_overdue
+    refresh_overdue()
+
+
+# ── Explaining ────────────────────────────────────────────────
+
+@contextmanager
+def capture_selects():
+    """Collects (sql, params) of the SELECTs run in the block."""
+    statements = []
+
+    def wrapper(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield statements
+
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _walk(child)
+
+
+def full_scans(sql, params, tables, planner_defaults=False):
+    """The tables among `tables` that the plan for `sql` reads with a full scan."""
+    prefix = connection.ops.explain_query_prefix(format='json' if connection.vendor == 'postgresql' else None)
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            if not planner_defaults:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'{prefix} {sql}', params)
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return sorted({
+                node['Relation Name'] for node in _walk(plan[0]['Plan'])
+                if node.get('Relation Name') in tables and (
+                    node['Node Type'] == 'Seq Scan'
+                    or node['Node Type'] in ('Index Scan', 'Index Only Scan') and 'Index Cond' not in node
+                )
+            })
+
+        # SQLite: "SCAN trees_tree" or its alias, "SCAN U0", with or without "USING ... INDEX"
+        cursor.execute(f'{prefix} {sql}', params)
+        aliases = {alias: table for table, alias in _ALIAS.findall(sql)}
+        scanned = set()
+        for row in cursor.fetchall():
+            detail = row[-1].split()
+            if len(detail) < 2 or detail[0] != 'SCAN':
+                continue
+            table = aliases.get(detail[1], detail[1])
+            if table in tables:
+                scanned.add(table)
+        return sorted(scanned)
+
+
+def check(plan, ctx, planner_defaults=False):
+    """[(table, sql)] for every full scan of the check's tables."""
+    with capture_selects() as statements:
+        plan.run(ctx)
+    failures = []
+    for sql, params in statements:
+        if not any(table in sql for table in plan.tables):
+            continue
+        for table in full_scans(sql, params, plan.tables, planner_defaults):
+            failures.append((table, sql))
+    return failures
+
+
+def run(checks=None, planner_defaults=False, progress=None):
+    """{check name: [(table, sql)] of full scans} for the given checks (default all)."""
+    from .benchmarks import Context
+
+    unknown = [name for name in checks or () if name not in CHECKS]
+    if unknown:
+        raise ValueError(f"Unknown checks: {', '.join(unknown)}. Choose from: {', '.join(CHECKS)}")
+    ctx = Context()
+    results = {}
+    for name in checks or CHECKS:
+        results[name] = check(CHECKS[name], ctx, planner_defaults)
+        if progress:
+            progress(name, results[name])
+    return results
@@ -0,0 +1,85 @@
+from django.urls import reverse
+from rest_framework import serializers
+from .cache import dataset_version
+from .exports import DATASETS, get_dataset
+from .models import CronRun, ExportJob
+from .writers import WRITERS
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'status', 'dataset', 'format', 'filters', 'columns', 'row_count', 'size_bytes',
+                  'error', 'download_url', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'completed' or not obj.file:
+            return None
+        url = reverse('export_job_download', args=[obj.id])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class CronRunSerializer(serializers.ModelSerializer):
+    status_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CronRun
+        fields = ['id', 'job', 'run_date', 'status', 'attempts', 'result', 'emails_queued',
+                  'duration_seconds', 'error', 'status_url', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+    def get_status_url(self, obj):
+        url = reverse('cron_run_detail', args=[obj.id])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class ExportJobCreateSerializer(serializers.Serializer):
+    """
+    { dataset: "trees", format: "geojson", filters: {"zone": 3}, columns: ["tag_number", ...] }
+    filters are the dataset's list-endpoint filters; columns default to all.
+    """
+    dataset = serializers.ChoiceField(choices=list(DATASETS))
+    format = serializers.ChoiceField(choices=list(WRITERS))
+    filters = serializers.DictField(required=False, default=dict)
+    columns = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+
+    def validate(self, data):
+        dataset = get_dataset(data['dataset'])
+        user = self.context['request'].user
+        data['filters'] = dataset.clean_filters(data['filters'])
+        try:
+            data['columns'] = dataset.parse_columns(data['columns'])
+        except ValueError as e:
+            raise serializers.ValidationError({'columns': e.args[0]})
+        try:
+            dataset.filter(data['filters'], user=user)
+        except ValueError as e:
+            raise serializers.ValidationError({'filters': e.args[0]})
+        data['scope'] = dataset.scope_key(user)
+        return data
+
+    def create(self, validated_data):
+        version = dataset_version()
+        content_hash = ExportJob.make_hash(
+            validated_data['dataset'], validated_data['format'], validated_data['filters'],
+            validated_data['columns'], version, validated_data['scope'],
+        )
+        job = ExportJob(
+            created_by=self.context['request'].user,
+            dataset=validated_data['dataset'],
+            format=validated_data['format'],
+            filters=validated_data['filters'],
+            columns=validated_data['columns'],
+            content_hash=content_hash,
+            dataset_version=version,
+        )
+
+        # Same query, same data: share the finished file instead of rebuilding it
+        job.reuse_finished()
+        job.save()
+        return job
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from apps.tasks.models import MaintenanceTask
+from apps.trees.models import HealthLog, Tree
+from apps.trees.signals import trees_bulk_created
+from apps.zones.models import Zone
+
+from .cache import bump_version
+
+WATCHED_MODELS = (Tree, HealthLog, MaintenanceTask, Zone)
+
+
+def invalidate_reports(sender, **kwargs):
+    # After commit, so a concurrent reader can't re-cache pre-commit data
+    transaction.on_commit(bump_version)
+
+
+for model in WATCHED_MODELS:
+    post_save.connect(invalidate_reports, sender=model, dispatch_uid=f'reports_save_{model.__name__}')
+    post_delete.connect(invalidate_reports, sender=model, dispatch_uid=f'reports_delete_{model.__name__}')
+trees_bulk_created.connect(invalidate_reports, sender=Tree, dispatch_uid='reports_bulk_trees')
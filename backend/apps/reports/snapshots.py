@@ -0,0 +1,301 @@
+"""
+Daily health snapshots (HealthSnapshot) and the range queries over them.
+
+History is rebuilt by replaying plantings and HealthLog transitions:
+
+    planted_date      +1 in the tree's first known state
+    each health log   -1 previous state, +1 new state (on the local date)
+
+Both are counted per day and (zone, species) in the database. replay()
+sums everything before the first day it writes into one total per
+combination, then walks forward a day at a time adding that day's counts,
+so memory grows with the number of combinations, not with the length of
+the history. Trees are attributed to their current zone and species.
+
+Each night take_daily_snapshot() adds the current day from the trees table
+plus that day's plantings and deaths, replaying first if days are missing.
+
+series() answers range queries by reading only the rows at period ends:
+
+    series(date(2020, 1, 1), date(2025, 12, 31), interval='month', zone=3)
+"""
+import heapq
+from datetime import date, datetime, time, timedelta
+from operator import itemgetter
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, NullIf, TruncDate
+from django.utils import timezone
+
+HEALTH_STATES = ('healthy', 'at_risk', 'dead')
+STATE_INDEX = {state: i for i, state in enumerate(HEALTH_STATES)}
+DEAD = STATE_INDEX['dead']
+INTERVALS = ('day', 'week', 'month')
+# Bounds for range queries: no history before this, and at most this many points
+EARLIEST_DATE = date(1900, 1, 1)
+MAX_PERIODS = {'day': 731, 'week': 520, 'month': 600}
+BATCH_SIZE = 5000
+
+
+def _models(models):
+    if models:
+        return models['Tree'], models['HealthLog'], models['HealthSnapshot']
+    from apps.trees.models import HealthLog, Tree
+    from .models import HealthSnapshot
+    return Tree, HealthLog, HealthSnapshot
+
+
+# ── Building ──────────────────────────────────────────────────
+
+def _plantings(Tree, HealthLog, end):
+    """Trees planted by `end`, with the state they were planted in as first_state."""
+    first = HealthLog.objects.filter(tree=OuterRef('pk')).order_by('logged_at', 'id')
+    return Tree.objects.filter(planted_date__lte=end).annotate(first_state=Coalesce(
+        NullIf(Subquery(first.values('previous_health')[:1]), Value('')),
+        Subquery(first.values('health_status')[:1]),
+        F('current_health'),
+    ))
+
+
+def _transitions(HealthLog, end):
+    """Health changes up to `end`, on their local date but never before the planting."""
+    day = Greatest(TruncDate('logged_at', tzinfo=timezone.get_current_timezone()), F('tree__planted_date'))
+    return HealthLog.objects.filter(
+        tree__planted_date__lte=end, previous_health__in=HEALTH_STATES, health_status__in=HEALTH_STATES,
+    ).exclude(previous_health=F('health_status')).annotate(day=day).filter(day__lte=end)
+
+
+def _counts(queryset, *fields):
+    return queryset.values(*fields).annotate(n=Count('id')).order_by()
+
+
+def replay(start=None, end=None, models=None):
+    """
+    Yields (day, rows) for every day from `start` (default: the first
+    planting) to `end`, where rows are (zone_id, species_id, healthy,
+    at_risk, dead, planted_total, died_total) for each combination planted
+    by then.
+    """
+    Tree, HealthLog, _ = _models(models)
+    end = end or timezone.localdate()
+    first_day = Tree.objects.filter(planted_date__lte=end).aggregate(first=Min('planted_date'))['first']
+    if first_day is None:
+        return
+    start = max(start or first_day, first_day)
+
+    combos = list(Tree.objects.filter(planted_date__lte=end).order_by().values_list(
+        'zone_id', 'species_id').distinct())
+    combo_index = {combo: k for k, combo in enumerate(combos)}
+    stocks = np.zeros((len(combos), len(HEALTH_STATES)), dtype=np.int64)
+    planted = np.zeros(len(combos), dtype=np.int64)
+    died = np.zeros(len(combos), dtype=np.int64)
+
+    def plant(r):
+        state = STATE_INDEX.get(r['first_state'])
+        if state is not None:
+            k = combo_index[r['zone_id'], r['species_id']]
+            stocks[k, state] += r['n']
+            planted[k] += r['n']
+
+    def change(r):
+        k = combo_index[r['tree__zone_id'], r['tree__species_id']]
+        stocks[k, STATE_INDEX[r['previous_health']]] -= r['n']
+        stocks[k, STATE_INDEX[r['health_status']]] += r['n']
+        if r['health_status'] == 'dead':
+            died[k] += r['n']
+
+    plantings = _plantings(Tree, HealthLog, end)
+    transitions = _transitions(HealthLog, end)
+    plant_fields = ('zone_id', 'species_id', 'first_state')
+    change_fields = ('tree__zone_id', 'tree__species_id', 'previous_health', 'health_status')
+
+    # Everything before `start` only matters as totals per combination
+    for r in _counts(plantings.filter(planted_date__lt=start), *plant_fields):
+        plant(r)
+    for r in _counts(transitions.filter(day__lt=start), *change_fields):
+        change(r)
+
+    events = heapq.merge(
+        ((r['planted_date'], plant, r) for r in _counts(
+            plantings.filter(planted_date__gte=start), 'planted_date', *plant_fields,
+        ).order_by('planted_date').iterator(chunk_size=BATCH_SIZE)),
+        ((r['day'], change, r) for r in _counts(
+            transitions.filter(day__gte=start), 'day', *change_fields,
+        ).order_by('day').iterator(chunk_size=BATCH_SIZE)),
+        key=itemgetter(0),
+    )
+    event = next(events, None)
+    day = start
+    while day <= end:
+        while event is not None and event[0] <= day:
+            event[1](event[2])
+            event = next(events, None)
+        yield day, [
+            (*combos[k], *(int(v) for v in stocks[k]), int(planted[k]), int(died[k]))
+            for k in np.flatnonzero(planted)
+        ]
+        day += timedelta(days=1)
+
+
+def rebuild(start=None, end=None, models=None):
+    """Replay history and (re)write snapshot rows for start..end (default: everything up to today)."""
+    _, _, HealthSnapshot = _models(models)
+    end = end or timezone.localdate()
+
+    with transaction.atomic():
+        stale = HealthSnapshot.objects.filter(date__lte=end)
+        if start:
+            stale = stale.filter(date__gte=start)
+        stale.delete()
+
+        batch = []
+        written = 0
+        for day, rows in replay(start, end, models):
+            batch += [
+                HealthSnapshot(date=day, zone_id=zone_id, species_id=species_id,
+                               healthy=healthy, at_risk=at_risk, dead=dead,
+                               planted_total=planted_total, died_total=died_total)
+                for zone_id, species_id, healthy, at_risk, dead, planted_total, died_total in rows
+            ]
+            if len(batch) >= BATCH_SIZE:
+                HealthSnapshot.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        HealthSnapshot.objects.bulk_create(batch)
+        return written + len(batch)
+
+
+def take_daily_snapshot(day=None):
+    """
+    Write the snapshot for `day` (default today) from current tree states.
+    Falls back to a replay when earlier days are missing.
+    """
+    from apps.trees.models import HealthLog, Tree
+    from .models import HealthSnapshot
+
+    day = day or timezone.localdate()
+    previous_day = day - timedelta(days=1)
+    last = HealthSnapshot.objects.filter(date__lt=day).aggregate(last=Max('date'))['last']
+    if last != previous_day and Tree.objects.filter(planted_date__lt=day).exists():
+        return rebuild(start=(last + timedelta(days=1)) if last else None, end=day)
+
+    totals = {
+        (r.zone_id, r.species_id): (r.planted_total, r.died_total)
+        for r in HealthSnapshot.objects.filter(date=previous_day)
+    }
+    counts = Tree.objects.filter(planted_date__lte=day).values('zone_id', 'species_id').annotate(
+        **{state: Count('id', filter=Q(current_health=state)) for state in HEALTH_STATES},
+        planted_today=Count('id', filter=Q(planted_date=day)),
+    )
+    start_of_day = timezone.make_aware(datetime.combine(day, time.min))
+    died_today = {
+        (r['tree__zone_id'], r['tree__species_id']): r['n']
+        for r in HealthLog.objects.filter(
+            logged_at__gte=start_of_day, logged_at__lt=start_of_day + timedelta(days=1),
+            health_status='dead',
+        ).exclude(previous_health='dead').values('tree__zone_id', 'tree__species_id').annotate(n=Count('id'))
+    }
+
+    rows = []
+    for r in counts:
+        key = (r['zone_id'], r['species_id'])
+        planted_total, died_total = totals.get(key, (0, 0))
+        rows.append(HealthSnapshot(
+            date=day, zone_id=key[0], species_id=key[1],
+            healthy=r['healthy'], at_risk=r['at_risk'], dead=r['dead'],
+            planted_total=planted_total + r['planted_today'],
+            died_total=died_total + died_today.get(key, 0),
+        ))
+    with transaction.atomic():
+        HealthSnapshot.objects.filter(date=day).delete()
+        HealthSnapshot.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+# ── Querying ──────────────────────────────────────────────────
+
+def period_start(day, interval):
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def period_ends(start, end, interval):
+    """Last day of each day/week/month period between start and end (end included)."""
+    ends = []
+    day = start
+    while day <= end:
+        if interval == 'week':
+            period_end = day + timedelta(days=6 - day.weekday())
+        elif interval == 'month':
+            period_end = (day.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        else:
+            period_end = day
+        ends.append(min(period_end, end))
+        day = period_end + timedelta(days=1)
+    return ends
+
+
+def period_count(start, end, interval):
+    """len(period_ends(start, end, interval)) without building the list."""
+    if start > end:
+        return 0
+    if interval == 'week':
+        return ((end.toordinal() - end.weekday()) - (start.toordinal() - start.weekday())) // 7 + 1
+    if interval == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    return (end - start).days + 1
+
+
+def series(start, end, interval='day', zone=None, species=None):
+    """
+    One point per period: {period, healthy, at_risk, dead, total, planted, died}.
+    Counts are as of the period's last day; planted/died are totals within it.
+    """
+    from .models import HealthSnapshot
+
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of: {', '.join(INTERVALS)}")
+    latest = HealthSnapshot.objects.aggregate(latest=Max('date'))['latest']
+    if latest is None or start > end:
+        return []
+    end = min(end, latest)
+    ends = period_ends(start, end, interval)
+    baseline = start - timedelta(days=1)
+
+    queryset = HealthSnapshot.objects.all()
+    if zone is not None:
+        queryset = queryset.filter(zone_id=zone)
+    if species is not None:
+        queryset = queryset.filter(species_id=species)
+    if interval == 'day':
+        queryset = queryset.filter(date__gte=baseline, date__lte=end)
+    else:
+        queryset = queryset.filter(date__in=[baseline] + ends)
+    rows = {
+        r['date']: r for r in queryset.values('date').annotate(
+            healthy_sum=Sum('healthy'), at_risk_sum=Sum('at_risk'), dead_sum=Sum('dead'),
+            planted_sum=Sum('planted_total'), died_sum=Sum('died_total'),
+        )
+    }
+
+    empty = {'healthy_sum': 0, 'at_risk_sum': 0, 'dead_sum': 0, 'planted_sum': 0, 'died_sum': 0}
+    previous = rows.get(baseline, empty)
+    points = []
+    for period_end in ends:
+        row = rows.get(period_end, empty)
+        points.append({
+            'period': max(period_start(period_end, interval), start).isoformat(),
+            'healthy': row['healthy_sum'],
+            'at_risk': row['at_risk_sum'],
+            'dead': row['dead_sum'],
+            'total': row['healthy_sum'] + row['at_risk_sum'] + row['dead_sum'],
+            'planted': row['planted_sum'] - previous['planted_sum'],
+            'died': row['died_sum'] - previous['died_sum'],
+        })
+        previous = row
+    return points
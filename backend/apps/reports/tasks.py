@@ -0,0 +1,78 @@
+import tempfile
+
+from celery import shared_task
+from django.core.files import File
+from django.utils import timezone
+
+
+@shared_task
+def take_health_snapshot():
+    """Nightly: append today's per-zone/per-species health counts."""
+    from .snapshots import take_daily_snapshot
+    return f"Wrote {take_daily_snapshot()} health snapshot rows"
+
+
+def _build_file(job, write, filename):
+    """Run write(fh) -> row count into a temp file and attach it to the job."""
+    if job.is_finished:
+        return job.status
+
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+
+    try:
+        with tempfile.TemporaryFile() as fh:
+            job.row_count = write(fh)
+            job.size_bytes = fh.tell()
+            fh.seek(0)
+            job.file.save(filename, File(fh), save=False)
+        job.status = 'completed'
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'file', 'row_count', 'size_bytes', 'error', 'finished_at'])
+    return job.status
+
+
+@shared_task
+def run_export_job(job_id):
+    from .exports import get_dataset
+    from .models import ExportJob
+    from .writers import FORMATS, write_export
+
+    job = ExportJob.objects.select_related('created_by').get(pk=job_id)
+
+    def write(fh):
+        dataset = get_dataset(job.dataset)
+        queryset = dataset.filter(job.filters, user=job.created_by)
+        return write_export(fh, job.format, dataset, queryset, job.columns)
+
+    extension = FORMATS[job.format][1]
+    return _build_file(job, write, f'{job.dataset}-{timezone.now().date()}.{extension}')
+
+
+@shared_task
+def run_report_job(job_id):
+    """Render the full PDF report; row_count holds the page count."""
+    from datetime import date
+    from .models import ExportJob
+    from .pdf import render_report
+
+    job = ExportJob.objects.get(pk=job_id)
+    day = date.fromisoformat(job.filters['date'])
+    return _build_file(job, lambda fh: render_report(fh, day), f'tree-tracker-report-{day}.pdf')
+
+
+@shared_task
+def run_cron_job(run_id):
+    """Execute a CronRun (see cron.py), then start delivering the emails it queued."""
+    from apps.notifications.tasks import deliver_outbox
+    from .cron import execute
+
+    status = execute(run_id)
+    if status == 'completed':
+        deliver_outbox.delay()
+    return status
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.trees.synthetic import generate
+
+from . import snapshots
+from .models import HealthSnapshot
+
+
+def snapshot_rows(day):
+    return sorted(HealthSnapshot.objects.filter(date=day).values_list(
+        'zone_id', 'species_id', 'healthy', 'at_risk', 'dead', 'planted_total', 'died_total'))
+
+
+class SnapshotReplayTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(zones=3, users=6, trees=120, logs=500, tasks=0, seed=2, history_days=10)
+
+    def test_replay_agrees_with_the_daily_snapshot(self):
+        today = timezone.localdate()
+        snapshots.rebuild(start=today)
+        replayed = snapshot_rows(today)
+        snapshots.take_daily_snapshot(today)
+        self.assertTrue(replayed)
+        self.assertEqual(snapshot_rows(today), replayed)
+
+    def test_partial_rebuild_matches_a_full_one(self):
+        day = timezone.localdate() - timedelta(days=20)
+        snapshots.rebuild()
+        full = snapshot_rows(day)
+        HealthSnapshot.objects.all().delete()
+        # Starts from totals summed up in the database instead of day one
+        snapshots.rebuild(start=day - timedelta(days=2))
+        self.assertTrue(full)
+        self.assertEqual(snapshot_rows(day), full)
+        self.assertFalse(HealthSnapshot.objects.filter(date__lt=day - timedelta(days=2)).exists())
@@ -1,9 +1,21 @@
 from django.urls import path
-from .views import DashboardSummaryView, MonthlyTrendView, ExportReportView, ExportCSVView
+from .cron_views import CronRunDetailView, CronTriggerView
+from .views import (
+    DashboardSummaryView, MonthlyTrendView, HealthHistoryView, ExportReportView, ExportCSVView,
+    ExportJobCreateView, ExportJobDetailView, ExportJobDownloadView,
+)
 
 urlpatterns = [
     path('reports/summary/', DashboardSummaryView.as_view(), name='dashboard_summary'),
     path('reports/trends/', MonthlyTrendView.as_view(), name='monthly_trends'),
+    path('reports/health-history/', HealthHistoryView.as_view(), name='health_history'),
     path('reports/export/pdf/', ExportReportView.as_view(), name='export_pdf'),
     path('reports/export/csv/', ExportCSVView.as_view(), name='export_csv'),
+    path('reports/exports/', ExportJobCreateView.as_view(), name='export_jobs'),
+    path('reports/exports/<int:pk>/', ExportJobDetailView.as_view(), name='export_job_detail'),
+    path('reports/exports/<int:pk>/download/', ExportJobDownloadView.as_view(), name='export_job_download'),
+    path('cron/overdue-alerts/', CronTriggerView.as_view(job='overdue_alerts'), name='cron_overdue_alerts'),
+    path('cron/inspection-reminders/', CronTriggerView.as_view(job='inspection_reminders'),
+         name='cron_inspection_reminders'),
+    path('cron/runs/<int:pk>/', CronRunDetailView.as_view(), name='cron_run_detail'),
 ]
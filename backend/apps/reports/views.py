@@ -1,234 +1,285 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import permissions
-from django.http import HttpResponse
+from rest_framework import generics, permissions, status
+from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db.models import Count, Q
-import io
+from .models import ExportJob
+from .serializers import ExportJobCreateSerializer, ExportJobSerializer
+from .tasks import run_export_job, run_report_job
 
 
 class DashboardSummaryView(APIView):
-    """City-wide dashboard stats for admin"""
+    """
+    City-wide dashboard stats for admin.
+    Built from three queries (zone breakdown, task counts, recent activity)
+    and cached per dataset version, so repeat loads don't touch the database.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        from apps.trees.models import Tree
-        from apps.tasks.models import MaintenanceTask
-        from apps.zones.models import Zone
+        from .cache import cached
 
         today = timezone.now().date()
+        return Response(cached('dashboard', lambda: build_dashboard(today), today.isoformat()))
+
+
+def build_dashboard(today):
+    from apps.trees.models import HealthLog
+    from apps.tasks.models import MaintenanceTask
+    from apps.zones.models import Zone
+
+    month_start = today.replace(day=1)
+    next_month = (month_start + timezone.timedelta(days=32)).replace(day=1)
+
+    # Every tree belongs to a zone, so city totals are the sum of the zone rows
+    zone_rows = Zone.objects.annotate(
+        total=Count('trees'),
+        healthy_count=Count('trees', filter=Q(trees__current_health='healthy')),
+        at_risk_count=Count('trees', filter=Q(trees__current_health='at_risk')),
+        dead_count=Count('trees', filter=Q(trees__current_health='dead')),
+        planted_this_month=Count('trees', filter=Q(
+            trees__planted_date__gte=month_start, trees__planted_date__lt=next_month
+        )),
+    ).values('id', 'name', 'city', 'total', 'healthy_count', 'at_risk_count',
+             'dead_count', 'planted_this_month')
+
+    zones = []
+    total_trees = healthy = at_risk = dead = planted_this_month = 0
+    for row in zone_rows:
+        total_trees += row['total']
+        healthy += row['healthy_count']
+        at_risk += row['at_risk_count']
+        dead += row['dead_count']
+        planted_this_month += row.pop('planted_this_month')
+        zones.append(row)
+
+    survival_rate = round(((healthy + at_risk) / total_trees * 100), 1) if total_trees else 0
+
+    tasks = MaintenanceTask.objects.aggregate(
+        pending=Count('id', filter=Q(status='pending')),
+        overdue=Count('id', filter=Q(status='pending', due_date__lt=today)),
+        completed_this_month=Count('id', filter=Q(
+            status='completed',
+            completed_at__month=today.month,
+            completed_at__year=today.year,
+        )),
+    )
+
+    # Recent health changes (last 7 days)
+    recent_changes = HealthLog.objects.filter(
+        logged_at__gte=timezone.now() - timezone.timedelta(days=7)
+    ).select_related('tree', 'logged_by').order_by('-logged_at')[:10]
+
+    recent_activity = [
+        {
+            'tree_tag': log.tree.tag_number,
+            'from': log.previous_health,
+            'to': log.health_status,
+            'by': log.logged_by.get_full_name() if log.logged_by else 'Unknown',
+            'at': log.logged_at.isoformat(),
+        }
+        for log in recent_changes
+    ]
+
+    return {
+        'trees': {
+            'total': total_trees,
+            'healthy': healthy,
+            'at_risk': at_risk,
+            'dead': dead,
+            'survival_rate': survival_rate,
+            'planted_this_month': planted_this_month,
+        },
+        'tasks': tasks,
+        'zones': zones,
+        'recent_activity': recent_activity,
+    }
 
-        total_trees = Tree.objects.count()
-        healthy = Tree.objects.filter(current_health='healthy').count()
-        at_risk = Tree.objects.filter(current_health='at_risk').count()
-        dead = Tree.objects.filter(current_health='dead').count()
 
-        survival_rate = round(((healthy + at_risk) / total_trees * 100), 1) if total_trees else 0
+class MonthlyTrendView(APIView):
+    """
+    Planting and health trends for the last 12 months, read from daily
+    health snapshots: healthy/dead are counts at each month's end.
+    """
+    permission_classes = [permissions.IsAuthenticated]
 
-        pending_tasks = MaintenanceTask.objects.filter(status='pending').count()
-        overdue_tasks = MaintenanceTask.objects.filter(
-            status='pending', due_date__lt=today
-        ).count()
-        completed_this_month = MaintenanceTask.objects.filter(
-            status='completed',
-            completed_at__month=today.month,
-            completed_at__year=today.year
-        ).count()
-
-        # Trees planted this month
-        planted_this_month = Tree.objects.filter(
-            planted_date__month=today.month,
-            planted_date__year=today.year
-        ).count()
-
-        # Zone breakdown
-        zones = Zone.objects.annotate(
-            total=Count('trees'),
-            healthy_count=Count('trees', filter=Q(trees__current_health='healthy')),
-            at_risk_count=Count('trees', filter=Q(trees__current_health='at_risk')),
-            dead_count=Count('trees', filter=Q(trees__current_health='dead')),
-        ).values('id', 'name', 'city', 'total', 'healthy_count', 'at_risk_count', 'dead_count')
-
-        # Recent health changes (last 7 days)
-        from apps.trees.models import HealthLog
-        recent_changes = HealthLog.objects.filter(
-            logged_at__gte=timezone.now() - timezone.timedelta(days=7)
-        ).select_related('tree', 'logged_by').order_by('-logged_at')[:10]
-
-        recent_activity = [
-            {
-                'tree_tag': log.tree.tag_number,
-                'from': log.previous_health,
-                'to': log.health_status,
-                'by': log.logged_by.get_full_name() if log.logged_by else 'Unknown',
-                'at': log.logged_at.isoformat(),
-            }
-            for log in recent_changes
-        ]
+    def get(self, request):
+        from .snapshots import series
 
-        return Response({
-            'trees': {
-                'total': total_trees,
-                'healthy': healthy,
-                'at_risk': at_risk,
-                'dead': dead,
-                'survival_rate': survival_rate,
-                'planted_this_month': planted_this_month,
-            },
-            'tasks': {
-                'pending': pending_tasks,
-                'overdue': overdue_tasks,
-                'completed_this_month': completed_this_month,
-            },
-            'zones': list(zones),
-            'recent_activity': recent_activity,
-        })
+        today = timezone.localdate()
+        start = today.replace(day=1)
+        for _ in range(11):
+            start = (start - timezone.timedelta(days=1)).replace(day=1)
 
+        return Response([
+            {'month': point['period'], 'planted': point['planted'],
+             'healthy': point['healthy'], 'dead': point['dead']}
+            for point in series(start, today, interval='month')
+        ])
 
-class MonthlyTrendView(APIView):
-    """Monthly tree planting and health trends"""
+
+class HealthHistoryView(APIView):
+    """
+    Health counts over time from daily snapshots.
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD&interval=day|week|month&zone=&species=
+    (defaults: the last year, monthly). Dates start at snapshots.EARLIEST_DATE
+    and a request covers at most MAX_PERIODS[interval] periods.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        from apps.trees.models import Tree
-        from django.db.models.functions import TruncMonth
+        from datetime import date
+        from .snapshots import EARLIEST_DATE, INTERVALS, MAX_PERIODS, period_count, series
 
-        months = Tree.objects.annotate(
-            month=TruncMonth('planted_date')
-        ).values('month').annotate(
-            planted=Count('id'),
-            healthy=Count('id', filter=Q(current_health='healthy')),
-            dead=Count('id', filter=Q(current_health='dead')),
-        ).order_by('month')[-12:]
+        params = request.query_params
+        interval = params.get('interval', 'month')
+        if interval not in INTERVALS:
+            return Response({'error': f"interval must be one of: {', '.join(INTERVALS)}"}, status=400)
+        try:
+            end = date.fromisoformat(params['end']) if params.get('end') else timezone.localdate()
+            start = date.fromisoformat(params['start']) if params.get('start') else None
+            zone = int(params['zone']) if params.get('zone') else None
+            species = int(params['species']) if params.get('species') else None
+        except ValueError:
+            return Response({'error': 'start/end must be YYYY-MM-DD dates; zone and species must be ids'},
+                            status=400)
+        if end < EARLIEST_DATE or start is not None and start < EARLIEST_DATE:
+            return Response({'error': f'start and end must be on or after {EARLIEST_DATE.isoformat()}'}, status=400)
+        if start is None:
+            start = max(end - timezone.timedelta(days=365), EARLIEST_DATE)
+        # Periods past today have no snapshots, so only the rest count against the limit
+        if period_count(start, min(end, timezone.localdate()), interval) > MAX_PERIODS[interval]:
+            return Response({'error': f'At most {MAX_PERIODS[interval]} {interval}s per request; '
+                                      f'narrow start/end or use a longer interval'}, status=400)
 
-        return Response(list(months))
+        return Response({
+            'interval': interval,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'results': series(start, end, interval=interval, zone=zone, species=species),
+        })
 
 
 class ExportReportView(APIView):
-    """Export PDF summary report"""
+    """
+    Queue the full PDF report (city summary plus a section per zone).
+    POST /api/reports/export/pdf/
+    Returns 202 with an export job (poll GET /api/reports/exports/<id>/ for
+    its download_url), or 200 with a completed job when today's report has
+    already been rendered for the current data.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        from .cache import dataset_version
+
+        params = {'date': timezone.localdate().isoformat()}
+        version = dataset_version()
+        job = ExportJob(
+            created_by=request.user,
+            dataset='report',
+            format='pdf',
+            filters=params,
+            content_hash=ExportJob.make_hash('report', 'pdf', params, [], version),
+            dataset_version=version,
+        )
+        job.reuse_finished()
+        job.save()
+        data = ExportJobSerializer(job, context={'request': request}).data
+        if job.status == 'completed':
+            return Response(data, status=status.HTTP_200_OK)
+        transaction.on_commit(lambda: run_report_job.delay(job.id))
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportCSVView(APIView):
+    """
+    Stream trees as CSV.
+    Accepts the tree list filters (health, zone, species, planted_after,
+    planted_before), ?columns=tag_number,zone,... and ?gzip=1.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
+        from .exports import get_dataset, stream_csv
+
+        dataset = get_dataset('trees')
         try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.lib import colors
-            from reportlab.lib.styles import getSampleStyleSheet
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.lib.units import inch
-        except ImportError:
-            return Response({'error': 'reportlab not installed'}, status=500)
-
-        from apps.trees.models import Tree
-        from apps.zones.models import Zone
-        from django.db.models import Count, Q
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72,
-                                topMargin=72, bottomMargin=18)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Title
-        story.append(Paragraph("🌳 Tree & Green Asset Tracker", styles['Title']))
-        story.append(Paragraph(
-            f"Summary Report — Generated on {timezone.now().strftime('%B %d, %Y')}",
-            styles['Normal']
-        ))
-        story.append(Spacer(1, 0.3 * inch))
-
-        # City-wide stats
-        total = Tree.objects.count()
-        healthy = Tree.objects.filter(current_health='healthy').count()
-        at_risk = Tree.objects.filter(current_health='at_risk').count()
-        dead = Tree.objects.filter(current_health='dead').count()
-        survival = round(((healthy + at_risk) / total * 100), 1) if total else 0
-
-        story.append(Paragraph("City-Wide Summary", styles['Heading2']))
-        summary_data = [
-            ['Metric', 'Count'],
-            ['Total Trees', str(total)],
-            ['Healthy', str(healthy)],
-            ['At Risk', str(at_risk)],
-            ['Dead', str(dead)],
-            ['Survival Rate', f"{survival}%"],
-        ]
-        t = Table(summary_data, colWidths=[3 * inch, 2 * inch])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d6a4f')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f4f0')]),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#cccccc')),
-        ]))
-        story.append(t)
-        story.append(Spacer(1, 0.3 * inch))
-
-        # Zone breakdown
-        story.append(Paragraph("Zone-wise Breakdown", styles['Heading2']))
-        zones = Zone.objects.annotate(
-            total=Count('trees'),
-            h=Count('trees', filter=Q(trees__current_health='healthy')),
-            r=Count('trees', filter=Q(trees__current_health='at_risk')),
-            d=Count('trees', filter=Q(trees__current_health='dead')),
+            columns = dataset.parse_columns(request.query_params.get('columns'))
+            queryset = dataset.filter(request.query_params)
+        except ValueError as e:
+            return Response({'error': e.args[0]}, status=400)
+
+        gzip = request.query_params.get('gzip') in ('1', 'true')
+        response = StreamingHttpResponse(
+            stream_csv(dataset.rows(queryset, columns), dataset.headers(columns), gzip=gzip),
+            content_type='application/gzip' if gzip else 'text/csv',
         )
-
-        zone_data = [['Zone', 'Total', 'Healthy', 'At Risk', 'Dead', 'Survival %']]
-        for z in zones:
-            sr = round(((z.h + z.r) / z.total * 100), 1) if z.total else 0
-            zone_data.append([z.name, z.total, z.h, z.r, z.d, f"{sr}%"])
-
-        zt = Table(zone_data, colWidths=[2 * inch, 0.8 * inch, 0.8 * inch, 0.8 * inch, 0.7 * inch, 1 * inch])
-        zt.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#52b788')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f4f0')]),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#cccccc')),
-        ]))
-        story.append(zt)
-
-        doc.build(story)
-        buffer.seek(0)
-
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="tree-tracker-report-{timezone.now().date()}.pdf"'
+        filename = f"trees-{timezone.now().date()}.csv{'.gz' if gzip else ''}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Let nginx pass chunks through instead of buffering the whole body
+        response['X-Accel-Buffering'] = 'no'
         return response
 
 
-class ExportCSVView(APIView):
-    """Export all trees as CSV"""
+def _visible_export_jobs(user):
+    queryset = ExportJob.objects.all()
+    # Field workers only see their own jobs
+    if user.role == 'field_worker':
+        queryset = queryset.filter(created_by=user)
+    return queryset
+
+
+class ExportJobCreateView(APIView):
+    """
+    Queue a bulk export of trees, health logs or tasks.
+    POST /api/reports/exports/
+    Body: { dataset: "trees"|"health_logs"|"tasks",
+            format: "csv"|"ndjson"|"geojson"|"parquet"|"arrow",
+            filters: {...}, columns: [...] }
+    Returns 202 with the job (poll GET /api/reports/exports/<id>/), or 200
+    with an already completed job when the same export exists for the
+    current data.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
-        import csv
-        from apps.trees.models import Tree
+    def post(self, request):
+        serializer = ExportJobCreateSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        job = serializer.save()
+        data = ExportJobSerializer(job, context={'request': request}).data
+        if job.status == 'completed':
+            return Response(data, status=status.HTTP_200_OK)
+        transaction.on_commit(lambda: run_export_job.delay(job.id))
+        return Response(data, status=status.HTTP_202_ACCEPTED)
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="trees-{timezone.now().date()}.csv"'
 
-        writer = csv.writer(response)
-        writer.writerow([
-            'Tag Number', 'Species', 'Zone', 'Latitude', 'Longitude',
-            'Health Status', 'Planted Date', 'Height (cm)', 'Location Description',
-            'Planted By', 'Notes'
-        ])
+class ExportJobDetailView(generics.RetrieveAPIView):
+    permission_classes = [permissions.IsAuthenticated]
 
-        trees = Tree.objects.select_related('species', 'zone', 'planted_by').all()
-        for tree in trees:
-            writer.writerow([
-                tree.tag_number,
-                tree.species.common_name if tree.species else '',
-                tree.zone.name,
-                tree.latitude,
-                tree.longitude,
-                tree.current_health,
-                tree.planted_date,
-                tree.height_cm or '',
-                tree.location_description,
-                tree.planted_by.get_full_name() if tree.planted_by else '',
-                tree.notes,
-            ])
+    serializer_class = ExportJobSerializer
 
-        return response
+    def get_queryset(self):
+        return _visible_export_jobs(self.request.user)
+
+
+class ExportJobDownloadView(APIView):
+    """Stream a finished export file."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        from .writers import FORMATS
+
+        job = get_object_or_404(_visible_export_jobs(request.user), pk=pk)
+        if job.status != 'completed' or not job.file:
+            return Response({'error': f'Export is {job.status}'}, status=409)
+        content_type, extension = FORMATS[job.format]
+        name = 'tree-tracker-report' if job.dataset == 'report' else job.dataset
+        return FileResponse(
+            job.file.open('rb'), as_attachment=True, content_type=content_type,
+            filename=f'{name}-{job.created_at.date()}.{extension}',
+        )
@@ -0,0 +1,151 @@
+"""
+Chunked file writers for export jobs.
+
+Every writer takes a binary file object, the row iterator from
+Dataset.rows() and the dataset/columns, and writes EXPORT_CHUNK_SIZE rows
+at a time, returning the number of rows written:
+
+    csv      same output as /api/reports/export/csv/
+    ndjson   one JSON object per line
+    geojson  FeatureCollection of Points (rows without coordinates get a
+             null geometry); the coordinate paths are appended to each row
+    parquet  columnar file, one row group per chunk
+    arrow    Arrow IPC file, one record batch per chunk
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .exports import stream_csv
+
+# format -> (content type, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'geojson': ('application/geo+json', 'geojson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow'),
+    'pdf': ('application/pdf', 'pdf'),  # reports only, see pdf.py
+}
+
+
+def _chunks(rows, size=None):
+    size = size or settings.EXPORT_CHUNK_SIZE
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_csv(fh, rows, dataset, columns):
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    for data in stream_csv(counted(), dataset.headers(columns)):
+        fh.write(data)
+    return count
+
+
+def write_ndjson(fh, rows, dataset, columns):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    count = 0
+    for chunk in _chunks(rows):
+        fh.write(''.join(
+            encoder.encode(dict(zip(columns, row))) + '\n' for row in chunk
+        ).encode('utf-8'))
+        count += len(chunk)
+    return count
+
+
+def write_geojson(fh, rows, dataset, columns):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    width = len(columns)
+    count = 0
+    fh.write(b'{"type":"FeatureCollection","features":[\n')
+    for chunk in _chunks(rows):
+        features = []
+        for row in chunk:
+            lat, lng = row[width], row[width + 1]
+            geometry = None if lat is None or lng is None else {
+                'type': 'Point', 'coordinates': [lng, lat],
+            }
+            features.append(encoder.encode({
+                'type': 'Feature',
+                'geometry': geometry,
+                'properties': dict(zip(columns, row[:width])),
+            }))
+        fh.write(((',\n' if count else '') + ',\n'.join(features)).encode('utf-8'))
+        count += len(chunk)
+    fh.write(b'\n]}\n')
+    return count
+
+
+def _arrow_schema(dataset, columns):
+    import pyarrow as pa
+
+    types = {
+        'str': pa.string(),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'date': pa.date32(),
+        'datetime': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([(name, types[dataset.columns[name].kind]) for name in columns])
+
+
+def _record_batches(rows, schema):
+    import pyarrow as pa
+
+    for chunk in _chunks(rows):
+        values = list(zip(*chunk))
+        yield pa.record_batch(
+            [pa.array(values[i], type=field.type) for i, field in enumerate(schema)],
+            schema=schema,
+        )
+
+
+def write_parquet(fh, rows, dataset, columns):
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(dataset, columns)
+    count = 0
+    with pq.ParquetWriter(fh, schema) as writer:
+        for batch in _record_batches(rows, schema):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def write_arrow(fh, rows, dataset, columns):
+    import pyarrow as pa
+
+    schema = _arrow_schema(dataset, columns)
+    count = 0
+    with pa.ipc.new_file(fh, schema) as writer:
+        for batch in _record_batches(rows, schema):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+WRITERS = {
+    'csv': write_csv,
+    'ndjson': write_ndjson,
+    'geojson': write_geojson,
+    'parquet': write_parquet,
+    'arrow': write_arrow,
+}
+
+
+def write_export(fh, fmt, dataset, queryset, columns):
+    """Write `queryset` in `fmt` to `fh`; returns the row count."""
+    extra = dataset.geometry if fmt == 'geojson' else ()
+    return WRITERS[fmt](fh, dataset.rows(queryset, columns, extra=extra), dataset, columns)
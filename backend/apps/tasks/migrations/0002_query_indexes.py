@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-17 03:27
+
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='maintenancetask',
+            index=models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='maintenancetask',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['zone', 'due_date'], name='task_pending_zone_due_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='maintenancetask',
+            index=models.Index(fields=['assigned_to', 'status'], name='task_assignee_status_idx'),
+        ),
+    ]
@@ -79,10 +79,25 @@ class MaintenanceTask(models.Model):
 
     class Meta:
         ordering = ['due_date', '-priority']
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+            # Overdue work per zone: only pending tasks can be overdue
+            models.Index(fields=['zone', 'due_date'], condition=models.Q(status='pending'),
+                         name='task_pending_zone_due_idx'),
+            # A field worker's own tasks
+            models.Index(fields=['assigned_to', 'status'], name='task_assignee_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.zone.name} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so signal handlers can work out deltas
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     @property
     def is_overdue(self):
         from django.utils import timezone
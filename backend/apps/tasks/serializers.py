@@ -1,5 +1,9 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, Value, When
 from django.utils import timezone
+from apps.common.queries import display_name
+from apps.common.serializers import FileUrlField, RowSerializer
 from .models import MaintenanceTask
 
 
@@ -44,6 +48,47 @@ class MaintenanceTaskSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class TaskListSerializer(RowSerializer):
+    """MaintenanceTaskSerializer's output from TaskListSerializer.rows(queryset): one query per page."""
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    description = serializers.CharField()
+    task_type = serializers.CharField()
+    priority = serializers.CharField()
+    created_by = serializers.IntegerField()
+    created_by_name = serializers.CharField()
+    assigned_to = serializers.IntegerField()
+    assigned_to_name = serializers.CharField()
+    zone = serializers.IntegerField()
+    zone_name = serializers.CharField()
+    tree = serializers.IntegerField()
+    tree_tag = serializers.CharField()
+    due_date = serializers.DateField()
+    status = serializers.CharField()
+    is_overdue = serializers.BooleanField()
+    completion_notes = serializers.CharField()
+    completion_photo = FileUrlField(MaintenanceTask._meta.get_field('completion_photo'))
+    completed_at = serializers.DateTimeField()
+    completed_by = serializers.IntegerField()
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+
+    @classmethod
+    def rows(cls, queryset):
+        return cls.values(
+            queryset,
+            created_by_name=display_name('created_by'),
+            assigned_to_name=display_name('assigned_to'),
+            zone_name=F('zone__name'),
+            tree_tag=F('tree__tag_number'),
+            # Same rule as MaintenanceTask.is_overdue
+            is_overdue=Case(
+                When(status='pending', due_date__lt=timezone.now().date(), then=Value(True)),
+                default=Value(False), output_field=BooleanField(),
+            ),
+        )
+
+
 class TaskCompleteSerializer(serializers.Serializer):
     completion_notes = serializers.CharField(required=False, allow_blank=True)
     completion_photo = serializers.ImageField(required=False)
@@ -55,5 +100,9 @@ class TaskCompleteSerializer(serializers.Serializer):
         task.completion_notes = validated_data.get('completion_notes', '')
         if 'completion_photo' in validated_data:
             task.completion_photo = validated_data['completion_photo']
-        task.save()
+        with transaction.atomic():
+            task.save()
+            if task.tree_id:
+                from apps.trees.models import Tree
+                Tree.objects.filter(pk=task.tree_id).update(last_completed_task_at=task.completed_at)
         return task
@@ -0,0 +1,58 @@
+"""
+Keeps the ZoneStats rollup (pending/overdue tasks, last activity) in step
+with MaintenanceTask writes, inside the writing transaction.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.zones import stats
+
+from .models import MaintenanceTask
+
+STATE_FIELDS = ('zone_id', 'status', 'due_date')
+
+
+def _loaded_state(task):
+    loaded = getattr(task, '_loaded_values', None) or {}
+    if all(f in loaded for f in STATE_FIELDS):
+        return tuple(loaded[f] for f in STATE_FIELDS)
+    return None
+
+
+def _current_state(task):
+    return tuple(getattr(task, f) for f in STATE_FIELDS)
+
+
+@receiver(pre_save, sender=MaintenanceTask)
+def remember_previous_state(sender, instance, **kwargs):
+    if instance._state.adding or instance.pk is None:
+        instance._previous_state = None
+        return
+    previous = _loaded_state(instance)
+    if previous is None:
+        previous = MaintenanceTask.objects.filter(pk=instance.pk).values_list(*STATE_FIELDS).first()
+    instance._previous_state = previous
+
+
+@receiver(post_save, sender=MaintenanceTask)
+def update_zone_stats_on_save(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_previous_state', None)
+    current = _current_state(instance)
+    deltas = stats.new_deltas()
+    if previous:
+        stats.add_task(deltas, *previous, sign=-1)
+    stats.add_task(deltas, *current)
+    stats.apply_deltas(deltas)
+
+    # Later saves of the same instance diff against what is now stored
+    instance._loaded_values = {
+        **(getattr(instance, '_loaded_values', None) or {}),
+        **dict(zip(STATE_FIELDS, current)),
+    }
+
+
+@receiver(post_delete, sender=MaintenanceTask)
+def update_zone_stats_on_delete(sender, instance, **kwargs):
+    deltas = stats.new_deltas()
+    stats.add_task(deltas, *(_loaded_state(instance) or _current_state(instance)), sign=-1)
+    stats.apply_deltas(deltas)
@@ -1,9 +1,13 @@
+import logging
+
 from celery import shared_task
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 
 def send_overdue_task_alerts_resend(send_fn):
-    """Send overdue task alerts using provided send function"""
+    """Queue overdue task alerts through the provided send function (see reports/cron.py)"""
     from .models import MaintenanceTask
     from django.contrib.auth import get_user_model
     User = get_user_model()
@@ -21,7 +25,7 @@ def send_overdue_task_alerts_resend(send_fn):
         role__in=['supervisor', 'admin']
     ).exclude(email='').exclude(email__isnull=True)
 
-    sent_count = 0
+    queued_count = 0
     for supervisor in supervisors:
         tasks = overdue_tasks if supervisor.role == 'admin' else \
             overdue_tasks.filter(zone__isnull=False)
@@ -104,32 +108,22 @@ def send_overdue_task_alerts_resend(send_fn):
 </body>
 </html>"""
 
-        try:
-            send_fn(
-                to_email=supervisor.email,
-                subject=f'[Tree Tracker] ⚠️ {tasks.count()} overdue task{"s" if tasks.count() != 1 else ""} need attention',
-                html_body=html_body,
-            )
-            sent_count += 1
-            print(f"Sent overdue alert to {supervisor.email}")
-        except Exception as e:
-            print(f"Failed to send to {supervisor.email}: {e}")
+        send_fn(
+            to_email=supervisor.email,
+            subject=f'[Tree Tracker] ⚠️ {tasks.count()} overdue task{"s" if tasks.count() != 1 else ""} need attention',
+            html_body=html_body,
+        )
+        queued_count += 1
+        logger.info('Queued overdue alert for %s', supervisor.email)
 
-    return f"Sent {sent_count} overdue task alert emails"
+    return f"Queued {queued_count} overdue task alert emails"
 
 
 @shared_task
 def send_overdue_task_alerts():
-    """Celery version - kept for compatibility"""
-    from django.core.mail import EmailMultiAlternatives
-    from django.conf import settings
-
-    def django_send(to_email, subject, html_body):
-        msg = EmailMultiAlternatives(
-            subject=subject, body='Please enable HTML email.',
-            from_email=settings.DEFAULT_FROM_EMAIL, to=[to_email]
-        )
-        msg.attach_alternative(html_body, "text/html")
-        msg.send()
+    """Today's run through the cron runner, shared with /api/cron/, so it goes out once a day"""
+    from apps.reports.cron import trigger
+    from apps.reports.tasks import run_cron_job
 
-    return send_overdue_task_alerts_resend(django_send)
\ No newline at end of file
+    run, dispatch = trigger('overdue_alerts')
+    return run_cron_job(run.id) if dispatch else 'skipped'
\ No newline at end of file
@@ -4,7 +4,7 @@ from rest_framework.views import APIView
 from django.utils import timezone
 from django_filters import rest_framework as django_filters
 from .models import MaintenanceTask
-from .serializers import MaintenanceTaskSerializer, TaskCompleteSerializer
+from .serializers import MaintenanceTaskSerializer, TaskCompleteSerializer, TaskListSerializer
 from apps.accounts.permissions import IsAdminOrSupervisor
 
 
@@ -27,7 +27,6 @@ class TaskFilter(django_filters.FilterSet):
 
 
 class TaskListCreateView(generics.ListCreateAPIView):
-    serializer_class = MaintenanceTaskSerializer
     filterset_class = TaskFilter
     search_fields = ['title', 'description']
     ordering_fields = ['due_date', 'priority', 'created_at']
@@ -37,17 +36,22 @@ class TaskListCreateView(generics.ListCreateAPIView):
             return [IsAdminOrSupervisor()]
         return [permissions.IsAuthenticated()]
 
+    def get_serializer_class(self):
+        if self.request.method == 'POST':
+            return MaintenanceTaskSerializer
+        return TaskListSerializer
+
     def get_queryset(self):
         user = self.request.user
-        queryset = MaintenanceTask.objects.select_related(
-            'assigned_to', 'created_by', 'zone', 'tree'
-        ).all()
+        queryset = MaintenanceTask.objects.all()
 
         # Field workers only see their own tasks
         if user.role == 'field_worker':
             queryset = queryset.filter(assigned_to=user)
 
-        return queryset
+        if self.request.method == 'POST':
+            return queryset
+        return TaskListSerializer.rows(queryset)
 
 
 class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -0,0 +1,46 @@
+"""
+Tree.last_inspected_at and Tree.last_completed_task_at: the time of a
+tree's latest health log and of its latest completed task, stored on the
+tree so staleness filters ("not inspected since ...") read an index
+instead of aggregating HealthLog.
+
+The API writes set them in the writing transaction
+(HealthUpdateSerializer.update_tree_health, TaskCompleteSerializer.complete_task).
+Paths that bypass those (generate_data, shell fixes) call rebuild()
+afterwards; `python manage.py backfill_tree_activity` does the same.
+"""
+from django.db.models import Max, OuterRef, Subquery
+
+
+def latest_log(tree_ref):
+    from .models import HealthLog
+    return HealthLog.objects.filter(tree=tree_ref).order_by('-logged_at').values('logged_at')[:1]
+
+
+def latest_completed_task(tree_ref):
+    from apps.tasks.models import MaintenanceTask
+    return MaintenanceTask.objects.filter(
+        tree=tree_ref, status='completed', completed_at__isnull=False,
+    ).order_by('-completed_at').values('completed_at')[:1]
+
+
+def rebuild(zone_ids=None, batch_size=10_000):
+    """
+    Recompute both columns for every tree (or the trees of these zones),
+    one UPDATE per `batch_size` ids so no statement holds the table for
+    long. Returns the number of trees updated.
+    """
+    from .models import Tree
+
+    trees = Tree.objects.all()
+    if zone_ids is not None:
+        trees = trees.filter(zone_id__in=zone_ids)
+    last_id = trees.aggregate(last=Max('id'))['last'] or 0
+
+    updated = 0
+    for start in range(0, last_id + 1, batch_size):
+        updated += trees.filter(id__gte=start, id__lt=start + batch_size).update(
+            last_inspected_at=Subquery(latest_log(OuterRef('pk'))),
+            last_completed_task_at=Subquery(latest_completed_task(OuterRef('pk'))),
+        )
+    return updated
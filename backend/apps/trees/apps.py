@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class TreesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.trees'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,173 @@
+"""
+Server-side grid clustering for the map.
+
+Below settings.MAP_CLUSTER_ZOOM the map gets one point per grid cell instead of
+one per tree. Cells are CELL_BITS levels finer than the XYZ tile at the same
+zoom (4x4 cells per 256px tile, i.e. ~64px clusters on screen).
+
+Counts are stored per zone in TreeCluster so the map can be filtered by zone
+and so a change to one tree only touches its own cells.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Sum
+
+from . import geo
+
+CELL_BITS = 2
+HEALTH_FIELDS = ('healthy', 'at_risk', 'dead')
+COUNTER_FIELDS = ('tree_count',) + HEALTH_FIELDS + ('lat_sum', 'lng_sum')
+
+
+def cluster_zoom():
+    """Zoom level from which individual trees are served instead of clusters."""
+    return getattr(settings, 'MAP_CLUSTER_ZOOM', 15)
+
+
+def cell_for(lat, lng, zoom):
+    scale = 2 ** (zoom + CELL_BITS)
+    x = int(geo.lng_to_tile_x(lng, zoom + CELL_BITS))
+    y = int(geo.lat_to_tile_y(lat, zoom + CELL_BITS))
+    return min(max(x, 0), scale - 1), min(max(y, 0), scale - 1)
+
+
+def add_delta(deltas, zone_id, lat, lng, health, sign=1):
+    """Accumulate the contribution of one tree (sign=-1 to remove it) at every clustered zoom."""
+    if zone_id is None or lat is None or lng is None:
+        return
+    for zoom in range(cluster_zoom()):
+        cx, cy = cell_for(lat, lng, zoom)
+        d = deltas[(zone_id, zoom, cx, cy)]
+        d['tree_count'] += sign
+        if health in HEALTH_FIELDS:
+            d[health] += sign
+        d['lat_sum'] += sign * lat
+        d['lng_sum'] += sign * lng
+
+
+def new_deltas():
+    return defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+
+
+def apply_deltas(deltas, chunk_size=500):
+    """Apply accumulated deltas to TreeCluster rows, creating cells as needed."""
+    if not deltas:
+        return
+    try:
+        _apply_deltas(deltas, chunk_size)
+    except IntegrityError:
+        # Another writer created one of our cells first; it exists now.
+        _apply_deltas(deltas, chunk_size)
+
+
+def _apply_deltas(deltas, chunk_size):
+    from django.utils import timezone
+    from apps.zones.models import Zone
+    from .models import TreeCluster
+
+    now = timezone.now()
+    keys = list(deltas)
+    with transaction.atomic():
+        live_zones = set(Zone.objects.filter(
+            id__in={k[0] for k in keys}
+        ).values_list('id', flat=True))
+        keys = [k for k in keys if k[0] in live_zones]
+
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            match = Q()
+            for zone_id, zoom, cx, cy in chunk:
+                match |= Q(zone_id=zone_id, zoom=zoom, cell_x=cx, cell_y=cy)
+            existing = {
+                (c.zone_id, c.zoom, c.cell_x, c.cell_y): c
+                for c in TreeCluster.objects.select_for_update().filter(match)
+            }
+
+            to_create, to_update = [], []
+            for key in chunk:
+                cluster = existing.get(key)
+                if cluster is None:
+                    zone_id, zoom, cx, cy = key
+                    cluster = TreeCluster(zone_id=zone_id, zoom=zoom, cell_x=cx, cell_y=cy)
+                    to_create.append(cluster)
+                else:
+                    to_update.append(cluster)
+                for field, value in deltas[key].items():
+                    setattr(cluster, field, getattr(cluster, field) + value)
+                cluster.updated_at = now
+
+            TreeCluster.objects.bulk_update(to_update, COUNTER_FIELDS + ('updated_at',))
+            TreeCluster.objects.bulk_create(to_create)
+
+
+def rebuild(zone_ids=None, batch_size=2000):
+    """Recompute clusters from scratch for the given zones (all zones if None)."""
+    from .models import Tree, TreeCluster
+
+    trees = Tree.objects.all()
+    clusters = TreeCluster.objects.all()
+    if zone_ids is not None:
+        trees = trees.filter(zone_id__in=zone_ids)
+        clusters = clusters.filter(zone_id__in=zone_ids)
+
+    deltas = new_deltas()
+    rows = trees.values_list('zone_id', 'latitude', 'longitude', 'current_health')
+    for zone_id, lat, lng, health in rows.iterator(chunk_size=batch_size):
+        add_delta(deltas, zone_id, lat, lng, health)
+
+    with transaction.atomic():
+        clusters.delete()
+        TreeCluster.objects.bulk_create(
+            [TreeCluster(zone_id=zone_id, zoom=zoom, cell_x=cx, cell_y=cy, **counts)
+             for (zone_id, zoom, cx, cy), counts in deltas.items()],
+            batch_size=batch_size,
+        )
+    return len(deltas)
+
+
+def clusters_in_bbox(bbox, zoom, zone=None):
+    """TreeCluster rows overlapping the bbox at the given zoom (not yet merged across zones)."""
+    from .models import TreeCluster
+
+    min_lng, min_lat, max_lng, max_lat = bbox
+    x0, y0 = cell_for(max_lat, min_lng, zoom)
+    x1, y1 = cell_for(min_lat, max_lng, zoom)
+    queryset = TreeCluster.objects.filter(
+        zoom=zoom, cell_x__gte=x0, cell_x__lte=x1, cell_y__gte=y0, cell_y__lte=y1,
+    )
+    if zone:
+        queryset = queryset.filter(zone=zone)
+    return queryset
+
+
+def summarise(queryset, health=None):
+    """Merge per-zone rows into one point per cell with per-health counts."""
+    if health:
+        if health not in HEALTH_FIELDS:
+            return []
+        queryset = queryset.filter(**{f'{health}__gt': 0})
+    else:
+        queryset = queryset.filter(tree_count__gt=0)
+
+    rows = queryset.values('cell_x', 'cell_y').annotate(
+        n=Sum('tree_count'), n_healthy=Sum('healthy'), n_at_risk=Sum('at_risk'),
+        n_dead=Sum('dead'), sum_lat=Sum('lat_sum'), sum_lng=Sum('lng_sum'),
+    ).order_by()
+
+    result = []
+    for row in rows:
+        n = row['n']
+        if not n:
+            continue
+        result.append({
+            'cluster': True,
+            'latitude': round(row['sum_lat'] / n, 6),
+            'longitude': round(row['sum_lng'] / n, 6),
+            'count': row[f'n_{health}'] if health else n,
+            'healthy': row['n_healthy'],
+            'at_risk': row['n_at_risk'],
+            'dead': row['n_dead'],
+        })
+    return result
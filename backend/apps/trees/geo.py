@@ -0,0 +1,162 @@
+"""
+Geometry helpers for the map endpoints.
+Tiles follow the usual slippy-map (XYZ / Web Mercator) numbering used by Leaflet.
+Bounding boxes are (min_lng, min_lat, max_lng, max_lat), the same order as
+Leaflet's LatLngBounds.toBBoxString().
+"""
+import math
+
+MAX_ZOOM = 22
+MAX_LAT = 85.0511287798
+
+
+def tile_to_lng(x, z):
+    return x / (2 ** z) * 360.0 - 180.0
+
+
+def tile_to_lat(y, z):
+    n = math.pi - 2.0 * math.pi * y / (2 ** z)
+    return math.degrees(math.atan(math.sinh(n)))
+
+
+def lng_to_tile_x(lng, z):
+    """Fractional tile column for a longitude at zoom z."""
+    return (lng + 180.0) / 360.0 * (2 ** z)
+
+
+def lat_to_tile_y(lat, z):
+    """Fractional tile row for a latitude at zoom z."""
+    rad = math.radians(max(min(lat, MAX_LAT), -MAX_LAT))
+    return (1.0 - math.log(math.tan(rad) + 1.0 / math.cos(rad)) / math.pi) / 2.0 * (2 ** z)
+
+
+def tile_bbox(z, x, y):
+    """Bounding box covered by tile z/x/y. Raises ValueError for tiles outside the grid."""
+    if not 0 <= z <= MAX_ZOOM:
+        raise ValueError(f'Zoom must be between 0 and {MAX_ZOOM}')
+    size = 2 ** z
+    if not (0 <= x < size and 0 <= y < size):
+        raise ValueError(f'Tile {z}/{x}/{y} is outside the grid')
+    return (
+        tile_to_lng(x, z),
+        tile_to_lat(y + 1, z),
+        tile_to_lng(x + 1, z),
+        tile_to_lat(y, z),
+    )
+
+
+def parse_bbox(value):
+    """Parse 'min_lng,min_lat,max_lng,max_lat'. Raises ValueError on bad input."""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in value.split(','))
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError('bbox must be min_lng,min_lat,max_lng,max_lat')
+    if not all(math.isfinite(v) for v in (min_lng, min_lat, max_lng, max_lat)):
+        raise ValueError('bbox values must be finite numbers')
+    if min_lng > max_lng or min_lat > max_lat:
+        raise ValueError('bbox minimums must not exceed maximums')
+    return (
+        max(min_lng, -180.0),
+        max(min_lat, -90.0),
+        min(max_lng, 180.0),
+        min(max_lat, 90.0),
+    )
+
+
+# ── Distances ─────────────────────────────────────────────────
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance in metres."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bbox_around(lat, lng, radius_m):
+    """Bounding box that contains the circle of radius_m around a point."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    coslat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(math.degrees(radius_m / (EARTH_RADIUS_M * coslat)), 180.0)
+    return (
+        max(lng - dlng, -180.0), max(lat - dlat, -90.0),
+        min(lng + dlng, 180.0), min(lat + dlat, 90.0),
+    )
+
+
+# ── Geohash ───────────────────────────────────────────────────
+# Stored on Tree.geohash (precision 9, ~5 m cells) and indexed, so any
+# prefix is a B-tree range scan: 'tdr1w' finds every tree in that ~5 km cell.
+
+GEOHASH_PRECISION = 9
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_encode(lat, lng, precision=GEOHASH_PRECISION):
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                value = (value << 1) | 1
+                lng_lo = mid
+            else:
+                value <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """(lat_degrees, lng_degrees) spanned by one cell at this precision."""
+    total = precision * 5
+    lng_bits = (total + 1) // 2
+    lat_bits = total // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def geohash_cover(lat, lng, radius_m):
+    """
+    Geohash prefixes whose cells together cover the circle of radius_m around
+    the point: the cell containing it plus its eight neighbours, at the finest
+    precision where one cell is still at least radius_m across.
+    """
+    coslat = max(math.cos(math.radians(lat)), 1e-6)
+    precision = 1
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        dlat, dlng = geohash_cell_size(p)
+        height_m = math.radians(dlat) * EARTH_RADIUS_M
+        width_m = math.radians(dlng) * EARTH_RADIUS_M * coslat
+        if min(height_m, width_m) >= radius_m:
+            precision = p
+            break
+
+    dlat, dlng = geohash_cell_size(precision)
+    cells = set()
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            cell_lat = max(min(lat + i * dlat, 90.0), -90.0)
+            cell_lng = (lng + j * dlng + 180.0) % 360.0 - 180.0
+            cells.add(geohash_encode(cell_lat, cell_lng, precision))
+    return sorted(cells)
@@ -0,0 +1,412 @@
+"""
+Bulk tree import from CSV or GeoJSON (e.g. a municipal tree census).
+
+    with open('census.csv', 'rb') as fh, open('errors.csv', 'w', newline='') as report:
+        counts = import_trees(fh, 'csv', user=admin, report=report)
+
+Records are streamed off the file and handled TREE_IMPORT_BATCH_SIZE at a
+time, so memory does not grow with the file:
+
+1. Parse: coordinates, heights and dates are converted a whole column at a
+   time with NumPy; a column falls back to per-value conversion only when it
+   holds bad values, to find which ones.
+2. Resolve: species (common or scientific name) and zones are matched by
+   case-insensitive name through dicts loaded once. Rows without a zone are
+   placed by the ZoneLocator, and rows without a tag get numbers from the
+   tag sequence, as in ingest.py.
+3. Load: PostgreSQL COPY ... FROM STDIN (bulk_create on other databases),
+   one transaction per batch.
+
+Like seed_data, the import then rebuilds map clusters and zone stats for
+the zones it touched, plus health snapshots from the earliest planting
+date, once at the end. Doing that per batch through trees_bulk_created
+would cost more than the load itself.
+
+Rejected rows go to `report` as CSV: the row number, the reasons, and the
+original values under the canonical headers, so it can be fixed and
+re-imported as is.
+
+CSV headers are matched case-insensitively, with a few aliases (lat, lng,
+health, tag, height ...). GeoJSON must be a FeatureCollection of Points;
+feature properties use the same names as the CSV columns.
+"""
+import codecs
+import csv
+import io
+import json
+import re
+from datetime import date
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Species, Tree, advance_tag_numbers, format_tag, reserve_tag_numbers
+
+FORMATS = ('csv', 'geojson')
+FIELDS = ('tag_number', 'species', 'zone', 'latitude', 'longitude', 'health', 'planted_date',
+          'height_cm', 'location_description', 'notes')
+ALIASES = {
+    'tag': 'tag_number', 'tag_no': 'tag_number',
+    'species_name': 'species', 'common_name': 'species', 'scientific_name': 'species',
+    'zone_name': 'zone', 'ward': 'zone',
+    'lat': 'latitude', 'y': 'latitude',
+    'lng': 'longitude', 'lon': 'longitude', 'long': 'longitude', 'x': 'longitude',
+    'current_health': 'health', 'health_status': 'health', 'condition': 'health',
+    'planted': 'planted_date', 'planted_on': 'planted_date',
+    'height': 'height_cm',
+    'location': 'location_description', 'description': 'location_description',
+}
+HEALTH_VALUES = np.array([value for value, _ in Tree.HEALTH_CHOICES])
+REPORT_HEADER = ['row', 'errors', *FIELDS]
+
+
+def canonical_field(name):
+    key = re.sub(r'[\s\-]+', '_', str(name).strip().lower())
+    return ALIASES.get(key, key if key in FIELDS else None)
+
+
+def guess_format(filename):
+    name = (filename or '').lower()
+    return 'geojson' if name.endswith(('.geojson', '.json')) else 'csv'
+
+
+# ── Readers ───────────────────────────────────────────────────
+
+def read_csv(fh):
+    """Yield one {field: raw value} dict per CSV data row."""
+    reader = csv.reader(io.TextIOWrapper(fh, encoding='utf-8-sig', newline=''))
+    header = next(reader, None) or []
+    columns = [(i, canonical_field(name)) for i, name in enumerate(header)]
+    columns = [(i, field) for i, field in columns if field]
+    for row in reader:
+        yield {field: row[i] for i, field in columns if i < len(row)}
+
+
+_FEATURES = re.compile(r'"features"\s*:\s*\[')
+_SEPARATOR = re.compile(r'[\s,]*')
+
+
+def read_geojson(fh, chunk_size=64 * 1024):
+    """
+    Yield one {field: raw value} dict per feature of a FeatureCollection,
+    decoding features one at a time rather than loading the whole document.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        data = fh.read(chunk_size)
+        eof = not data
+        buffer = buffer[pos:] + text.decode(data, final=eof)
+        pos = 0
+        return not eof
+
+    while True:
+        match = _FEATURES.search(buffer)
+        if match:
+            pos = match.end()
+            break
+        if not fill():
+            raise ValueError('Not a GeoJSON FeatureCollection: no "features" array')
+
+    while True:
+        pos = _SEPARATOR.match(buffer, pos).end()
+        if pos == len(buffer):
+            if not fill():
+                raise ValueError('Unterminated "features" array')
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            feature, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Most likely a feature cut off at the end of the buffer
+            if not fill():
+                raise ValueError('Invalid GeoJSON feature')
+            continue
+        yield _feature_record(feature)
+
+
+def _feature_record(feature):
+    if not isinstance(feature, dict):
+        return {}
+    properties = feature.get('properties') or {}
+    record = {}
+    for key, value in properties.items():
+        field = canonical_field(key)
+        if field:
+            record[field] = value
+    geometry = feature.get('geometry') or {}
+    coordinates = geometry.get('coordinates')
+    if geometry.get('type') == 'Point' and isinstance(coordinates, list) and len(coordinates) >= 2:
+        record['longitude'], record['latitude'] = coordinates[0], coordinates[1]
+    return record
+
+
+READERS = {'csv': read_csv, 'geojson': read_geojson}
+
+
+# ── Column conversion ─────────────────────────────────────────
+
+def _text(records, field):
+    return np.array(['' if r.get(field) is None else str(r.get(field)).strip() for r in records],
+                    dtype=object)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _floats(raw):
+    """Text column -> (float array, invalid mask); blanks are NaN and not invalid."""
+    blank = raw == ''
+    try:
+        values = np.where(blank, 'nan', raw).astype(float)
+    except ValueError:
+        values = np.array([_to_float(v) for v in np.where(blank, 'nan', raw)], dtype=float)
+    return values, ~blank & ~np.isfinite(values)
+
+
+def _to_date(value):
+    try:
+        return np.datetime64(date.fromisoformat(value), 'D')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+def _dates(raw):
+    """Text column of ISO dates -> (datetime64[D] array, invalid mask)."""
+    blank = raw == ''
+    strings = np.where(blank, 'NaT', raw).astype(str)
+    try:
+        values = strings.astype('datetime64[D]')
+    except ValueError:
+        values = np.array([_to_date(v) if v != 'NaT' else np.datetime64('NaT') for v in strings],
+                          dtype='datetime64[D]')
+    return values, ~blank & np.isnat(values)
+
+
+# ── Import ────────────────────────────────────────────────────
+
+class TreeImporter:
+    def __init__(self, user=None, locator=None, report=None, default_planted_date=None,
+                 batch_size=None, dry_run=False):
+        from apps.zones.locator import ZoneLocator
+
+        self.user = user
+        self.locator = locator or ZoneLocator.load()
+        self.zone_index = {z.name.strip().lower(): i for i, z in enumerate(self.locator.zones)}
+        self.species_ids = {}
+        for pk, common, scientific in Species.objects.values_list('id', 'common_name', 'scientific_name'):
+            if scientific:
+                self.species_ids.setdefault(scientific.strip().lower(), pk)
+            self.species_ids[common.strip().lower()] = pk
+        self.default_planted_date = default_planted_date
+        self.batch_size = batch_size or settings.TREE_IMPORT_BATCH_SIZE
+        self.dry_run = dry_run
+        self.report = csv.writer(report) if report is not None else None
+        if self.report:
+            self.report.writerow(REPORT_HEADER)
+        self.seen_tags = set()
+        self.counts = {'rows': 0, 'created': 0, 'failed': 0}
+        self.earliest_planted = None
+        self.zone_ids = set()
+
+    def run(self, records, progress=None):
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+                if progress:
+                    progress(self.counts)
+        if batch:
+            self.import_batch(batch)
+        if progress:
+            progress(self.counts)
+        return self.counts
+
+    def import_batch(self, records):
+        first_row = self.counts['rows'] + 1
+        self.counts['rows'] += len(records)
+        size = len(records)
+        errors = [[] for _ in range(size)]
+
+        def reject(mask, message):
+            for i in np.flatnonzero(mask):
+                errors[i].append(message(i) if callable(message) else message)
+
+        lat, bad_lat = _floats(_text(records, 'latitude'))
+        lng, bad_lng = _floats(_text(records, 'longitude'))
+        reject(np.isnan(lat) & ~bad_lat | np.isnan(lng) & ~bad_lng, 'missing coordinates')
+        reject(bad_lat | bad_lng, 'coordinates are not numbers')
+        out_of_range = (np.abs(lat) > 90) | (np.abs(lng) > 180)
+        reject(out_of_range, 'coordinates out of range')
+        has_point = np.isfinite(lat) & np.isfinite(lng) & ~out_of_range
+
+        health = np.array([re.sub(r'[\s\-]+', '_', h.lower()) for h in _text(records, 'health')],
+                          dtype=object)
+        health[health == ''] = 'healthy'
+        reject(~np.isin(health.astype(str), HEALTH_VALUES), lambda i: f"unknown health '{health[i]}'")
+
+        planted_raw = _text(records, 'planted_date')
+        planted, bad_planted = _dates(planted_raw)
+        reject(bad_planted, 'planted_date must be YYYY-MM-DD')
+        if self.default_planted_date:
+            planted[np.isnat(planted) & ~bad_planted] = np.datetime64(self.default_planted_date, 'D')
+        else:
+            reject(planted_raw == '', 'missing planted_date')
+        reject(planted > np.datetime64(timezone.now().date(), 'D'), 'planted_date is in the future')
+
+        height, bad_height = _floats(_text(records, 'height_cm'))
+        reject(bad_height | (height < 0) | (height % 1 > 0), 'height_cm must be a whole number')
+
+        species_names = _text(records, 'species')
+        species = [self.species_ids.get(name.lower()) for name in species_names]
+        reject([bool(name) and pk is None for name, pk in zip(species_names, species)],
+               lambda i: f"unknown species '{species_names[i]}'")
+
+        zone_names = _text(records, 'zone')
+        zones = np.array([self.zone_index.get(name.lower(), -1) if name else -1 for name in zone_names])
+        reject((zone_names != '') & (zones == -1), lambda i: f"unknown zone '{zone_names[i]}'")
+        if not self.locator:
+            reject(zones == -1, 'no zones configured')
+        else:
+            locate = np.flatnonzero((zone_names == '') & has_point)
+            if len(locate):
+                zones[locate] = self.locator.locate_indexes(lat[locate], lng[locate])
+
+        tags = _text(records, 'tag_number')
+        given = [t for t in tags if t]
+        taken = set(Tree.objects.filter(tag_number__in=given).values_list('tag_number', flat=True)) if given else set()
+        for i, tag in enumerate(tags):
+            if not tag:
+                continue
+            if tag in taken or tag in self.seen_tags:
+                errors[i].append(f"duplicate tag_number '{tag}'")
+            else:
+                self.seen_tags.add(tag)
+
+        valid = [i for i in range(size) if not errors[i]]
+        for i in range(size):
+            if errors[i]:
+                self.counts['failed'] += 1
+                if self.report:
+                    self.report.writerow([first_row + i, '; '.join(errors[i]),
+                                          *(records[i].get(f, '') for f in FIELDS)])
+        if not valid or self.dry_run:
+            if self.dry_run:
+                self.counts['created'] += len(valid)
+            return
+
+        advance_tag_numbers(tags[i] for i in valid)
+        new_tags = iter(self.generate_tags(sum(1 for i in valid if not tags[i])))
+        planted_dates = planted.astype(object)
+        trees = []
+        for i in valid:
+            record = records[i]
+            tree = Tree(
+                tag_number=tags[i] or next(new_tags),
+                species_id=species[i],
+                zone=self.locator.zones[zones[i]],
+                planted_by=self.user,
+                latitude=round(float(lat[i]), 6),
+                longitude=round(float(lng[i]), 6),
+                current_health=health[i],
+                planted_date=planted_dates[i],
+                height_cm=None if np.isnan(height[i]) else int(height[i]),
+                location_description=str(record.get('location_description') or '')[:255],
+                notes=str(record.get('notes') or ''),
+            )
+            tree.set_geohash()
+            trees.append(tree)
+
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                copy_trees(trees)
+            else:
+                Tree.objects.bulk_create(trees, batch_size=1000)
+
+        self.counts['created'] += len(trees)
+        self.zone_ids.update(t.zone_id for t in trees)
+        earliest = min(t.planted_date for t in trees)
+        if self.earliest_planted is None or earliest < self.earliest_planted:
+            self.earliest_planted = earliest
+
+    def generate_tags(self, count):
+        """
+        `count` tags from the tag sequence. Supplied tags that look generated
+        (TRK-00042) move the sequence past them before this runs; rows saved
+        before that was the case can still hold a future number, so tags
+        already used in this import or in the database are skipped.
+        """
+        tags = []
+        while len(tags) < count:
+            drawn = [format_tag(n) for n in reserve_tag_numbers(count - len(tags))]
+            used = set(Tree.objects.filter(tag_number__in=drawn).values_list('tag_number', flat=True))
+            tags += [tag for tag in drawn if tag not in used and tag not in self.seen_tags]
+        self.seen_tags.update(tags)
+        return tags
+
+
+def copy_trees(trees):
+    """
+    Insert trees with COPY FROM STDIN (PostgreSQL only). Field values go
+    through the same pre_save/get_db_prep_save steps as bulk_create; primary
+    keys are not read back.
+    """
+    fields = [f for f in Tree._meta.concrete_fields if not f.primary_key]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for tree in trees:
+        row = []
+        for field in fields:
+            value = field.get_db_prep_save(field.pre_save(tree, True), connection)
+            row.append('\\N' if value is None else value)
+        writer.writerow(row)
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(f.column) for f in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {quote(Tree._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+
+
+def import_trees(fh, fmt, progress=None, **options):
+    """
+    Import trees from a binary file object in `fmt` ('csv' or 'geojson').
+    Options are TreeImporter's. Returns {'rows', 'created', 'failed'}.
+    """
+    if fmt not in READERS:
+        raise ValueError(f"Unknown format '{fmt}'. Choose from: {', '.join(FORMATS)}")
+    importer = TreeImporter(**options)
+    try:
+        return importer.run(READERS[fmt](fh), progress=progress)
+    finally:
+        # Also after a failure: earlier batches are already committed
+        if importer.zone_ids:
+            refresh_derived(importer.zone_ids, importer.earliest_planted)
+
+
+def refresh_derived(zone_ids, earliest_planted):
+    from apps.reports import snapshots
+    from apps.reports.cache import bump_version
+    from apps.zones import stats
+    from . import clustering
+
+    clustering.rebuild(list(zone_ids))
+    stats.rebuild(list(zone_ids))
+    # Imported history predates the snapshots already taken
+    snapshots.rebuild(start=earliest_planted)
+    bump_version()
@@ -0,0 +1,92 @@
+"""
+Set-based tree ingestion for the bulk endpoints.
+
+Rows are validated in Python, assigned to zones in one vectorised pass,
+given tag numbers in one round-trip and inserted with bulk_create inside a
+single transaction, so the cost is a handful of queries per thousand rows
+instead of two per tree.
+"""
+import math
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Tree, format_tag, reserve_tag_numbers
+from .signals import trees_bulk_created
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def ingest_detections(detections, user, locator, source='satellite_detection',
+                      min_confidence=0.3, batch_size=1000):
+    """
+    Create trees from detection dicts {latitude, longitude, confidence}.
+    Returns one result dict per input row, in input order:
+        {'index', 'status': 'created', 'id', 'tag_number', 'latitude', 'longitude', 'zone'}
+        {'index', 'status': 'skipped', 'reason'}
+    """
+    results = [None] * len(detections)
+    accepted = []
+    for index, row in enumerate(detections):
+        if not isinstance(row, dict):
+            results[index] = {'index': index, 'status': 'skipped', 'reason': 'not an object'}
+            continue
+        lat = _number(row.get('latitude'))
+        lng = _number(row.get('longitude'))
+        confidence = _number(row.get('confidence', 0)) or 0
+
+        if lat is None or lng is None:
+            reason = 'missing coordinates'
+        elif not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            reason = 'coordinates out of range'
+        elif confidence < min_confidence:
+            # Skip very low confidence detections
+            reason = 'low confidence'
+        else:
+            accepted.append((index, round(lat, 6), round(lng, 6), confidence))
+            continue
+        results[index] = {'index': index, 'status': 'skipped', 'reason': reason}
+
+    if not accepted:
+        return results
+
+    zone_indexes = locator.locate_indexes([a[1] for a in accepted], [a[2] for a in accepted])
+    tags = reserve_tag_numbers(len(accepted))
+    today = timezone.now().date()
+
+    trees = []
+    for (index, lat, lng, confidence), zone_index, tag in zip(accepted, zone_indexes, tags):
+        tree = Tree(
+            latitude=lat,
+            longitude=lng,
+            zone=locator.zones[zone_index],
+            planted_by=user,
+            planted_date=today,
+            tag_number=format_tag(tag),
+            current_health='at_risk',  # Will be properly assessed after field inspection
+            notes=f"Auto-detected via satellite imagery. Confidence: {round(confidence * 100)}%. Source: {source}",
+        )
+        tree.set_geohash()
+        trees.append(tree)
+
+    with transaction.atomic():
+        Tree.objects.bulk_create(trees, batch_size=batch_size)
+        trees_bulk_created.send(sender=Tree, trees=trees)
+
+    for (index, *_), tree in zip(accepted, trees):
+        results[index] = {
+            'index': index,
+            'status': 'created',
+            'id': tree.id,
+            'tag_number': tree.tag_number,
+            'latitude': tree.latitude,
+            'longitude': tree.longitude,
+            'zone': tree.zone.name,
+        }
+    return results
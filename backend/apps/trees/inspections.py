@@ -0,0 +1,79 @@
+"""
+Which trees need inspection, computed set-wise for the reminder emails.
+
+A living tree needs inspection when it has no health log in the last
+INSPECTION_INTERVAL, read from Tree.last_inspected_at (see activity.py).
+Two queries answer that for every zone at once, whatever the number of
+trees or recipients:
+
+    counts  zone_id -> number of trees needing inspection (GROUP BY zone)
+    rows    the `limit` longest-uninspected trees of each zone, with their
+            last log time, species and zone name (ROW_NUMBER() per zone)
+
+Per-recipient lists are then cut from that in memory: a supervisor gets
+their own zone, admins (and supervisors without a zone) get every zone,
+whose longest-uninspected trees are the merge of the per-zone ones.
+
+    due = needing_inspection(now, limit=20)
+    due.for_zone(zone_id) / due.for_all()   # -> (count, up to 20 rows)
+"""
+from datetime import timedelta
+from heapq import merge
+from itertools import islice
+
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+INSPECTION_INTERVAL = timedelta(days=14)
+
+
+def _sort_key(row):
+    # Never inspected first, then oldest inspection first
+    last = row['last_inspected_at']
+    return (last is not None, last or 0, row['id'])
+
+
+class NeedingInspection:
+    def __init__(self, counts, rows_by_zone, limit):
+        self.counts = counts
+        self.rows_by_zone = rows_by_zone
+        self.limit = limit
+
+    def for_zone(self, zone_id):
+        return self.counts.get(zone_id, 0), self.rows_by_zone.get(zone_id, [])
+
+    def for_all(self):
+        rows = merge(*self.rows_by_zone.values(), key=_sort_key)
+        return sum(self.counts.values()), list(islice(rows, self.limit))
+
+
+def due_trees(now):
+    """Living trees without a health log since now - INSPECTION_INTERVAL."""
+    from .models import Tree
+
+    return Tree.objects.exclude(current_health='dead').not_inspected_since(now - INSPECTION_INTERVAL)
+
+
+def needing_inspection(now, limit=20):
+    """Counts and the `limit` longest-uninspected trees per zone (two queries)."""
+    trees = due_trees(now)
+    counts = dict(
+        trees.order_by().values('zone_id').annotate(n=Count('id')).values_list('zone_id', 'n')
+    )
+
+    rows = trees.annotate(
+        rank=Window(
+            RowNumber(), partition_by=F('zone_id'),
+            order_by=[F('last_inspected_at').asc(nulls_first=True), F('id').asc()],
+        ),
+    ).filter(rank__lte=limit).values(
+        'id', 'zone_id', 'tag_number', 'current_health', 'last_inspected_at',
+        species_name=F('species__common_name'), zone_name=F('zone__name'),
+    ).order_by()
+
+    rows_by_zone = {}
+    for row in rows:
+        rows_by_zone.setdefault(row['zone_id'], []).append(row)
+    for zone_rows in rows_by_zone.values():
+        zone_rows.sort(key=_sort_key)
+    return NeedingInspection(counts, rows_by_zone, limit)
@@ -0,0 +1,22 @@
+"""
+Recompute Tree.last_inspected_at and Tree.last_completed_task_at from the
+health logs and completed tasks. Run after bulk edits that bypass the API
+writes, or to repair drift (see apps/trees/activity.py).
+Usage: python manage.py backfill_tree_activity [--zone 3 --zone 5] [--batch-size 10000]
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Backfill the last inspection and last completed task time of every tree (or the given zones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zone', type=int, action='append', dest='zones',
+                            help='Zone id to backfill (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Trees per UPDATE')
+
+    def handle(self, *args, **options):
+        from apps.trees import activity
+
+        trees = activity.rebuild(options['zones'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Backfilled activity for {trees} trees'))
@@ -0,0 +1,46 @@
+"""
+Generate a large synthetic dataset for load testing (see apps/trees/synthetic.py).
+Sizes come from a profile and can be overridden one by one; --reset first
+removes the previous synthetic data. Real data is never touched.
+Usage: python manage.py generate_data [--profile small|medium|large] [--trees 500000]
+       [--logs 5000000] [--zones 500] [--users 2000] [--tasks 20000] [--seed 1]
+       [--history-days 400] [--reset]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic zones, users, trees, health logs and tasks at scale'
+
+    def add_arguments(self, parser):
+        from apps.trees import synthetic
+
+        parser.add_argument('--profile', choices=list(synthetic.PROFILES), default='small')
+        for name in ('zones', 'users', 'trees', 'logs', 'tasks'):
+            parser.add_argument(f'--{name}', type=int, help=f'Number of {name} (overrides the profile)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed, same data)')
+        parser.add_argument('--batch-size', type=int, default=50_000, help='Trees per batch')
+        parser.add_argument('--history-days', type=int, default=synthetic.HISTORY_DAYS,
+                            help='Days of daily health snapshots to rebuild')
+        parser.add_argument('--reset', action='store_true', help='Delete earlier synthetic data first')
+
+    def handle(self, *args, **options):
+        from apps.trees import synthetic
+
+        if options['reset']:
+            self.stdout.write(f'Removed {synthetic.reset()} synthetic zones and their data')
+
+        sizes = {
+            name: options[name] if options[name] is not None else value
+            for name, value in synthetic.PROFILES[options['profile']].items()
+        }
+        self.stdout.write('Generating ' + ', '.join(f'{v} {k}' for k, v in sizes.items()) + '...')
+        started = time.monotonic()
+        counts = synthetic.generate(**sizes, seed=options['seed'], batch_size=options['batch_size'],
+                                    history_days=options['history_days'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            'Created ' + ', '.join(f'{v} {k}' for k, v in counts.items())
+            + f' in {time.monotonic() - started:.0f}s'
+        ))
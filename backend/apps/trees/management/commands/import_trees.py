@@ -0,0 +1,62 @@
+"""
+Import trees from a CSV or GeoJSON file (e.g. a municipal census).
+Rows are streamed, validated in batches and loaded with COPY on PostgreSQL;
+rejected rows are written to the --errors file. See apps/trees/importer.py
+for the accepted columns.
+Usage: python manage.py import_trees census.csv [--errors rejected.csv] [--user admin]
+       [--format geojson] [--planted-date 2020-01-01] [--batch-size 10000] [--dry-run]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Bulk import trees from a CSV or GeoJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or GeoJSON FeatureCollection')
+        parser.add_argument('--format', choices=['csv', 'geojson'],
+                            help='Defaults to geojson for .geojson/.json files, csv otherwise')
+        parser.add_argument('--errors', help='Write rejected rows to this CSV file')
+        parser.add_argument('--user', help='Username recorded as planted_by')
+        parser.add_argument('--planted-date', type=date.fromisoformat,
+                            help='planted_date for rows that have none (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, help='Rows per batch (TREE_IMPORT_BATCH_SIZE)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, insert nothing')
+
+    def handle(self, *args, **options):
+        from contextlib import ExitStack
+        from django.contrib.auth import get_user_model
+        from apps.trees.importer import guess_format, import_trees
+
+        user = None
+        if options['user']:
+            user = get_user_model().objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user '{options['user']}'")
+
+        def progress(counts):
+            self.stdout.write(f"  {counts['rows']} rows: {counts['created']} ok, {counts['failed']} rejected")
+
+        with ExitStack() as stack:
+            try:
+                fh = stack.enter_context(open(options['path'], 'rb'))
+            except OSError as e:
+                raise CommandError(str(e))
+            report = None
+            if options['errors']:
+                report = stack.enter_context(open(options['errors'], 'w', newline='', encoding='utf-8'))
+            try:
+                counts = import_trees(
+                    fh, options['format'] or guess_format(options['path']), progress=progress,
+                    user=user, report=report, default_planted_date=options['planted_date'],
+                    batch_size=options['batch_size'], dry_run=options['dry_run'],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {counts['created']} of {counts['rows']} rows ({counts['failed']} rejected)"
+        ))
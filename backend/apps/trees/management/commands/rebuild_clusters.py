@@ -0,0 +1,20 @@
+"""
+Recompute the precomputed map clusters from the trees table.
+Run after changing MAP_CLUSTER_ZOOM or after bulk edits that bypass signals.
+Usage: python manage.py rebuild_clusters [--zone 3 --zone 5]
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuild map cluster rollups for all zones (or the given zones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zone', type=int, action='append', dest='zones',
+                            help='Zone id to rebuild (repeatable)')
+
+    def handle(self, *args, **options):
+        from apps.trees import clustering
+
+        cells = clustering.rebuild(options['zones'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {cells} cluster cells'))
@@ -32,6 +32,16 @@ class Command(BaseCommand):
 
         zones = []
         for zd in zones_data:
+            # Square boundary around the centre; sized so neighbouring zones don't overlap
+            lat, lng, half = zd['center_lat'], zd['center_lng'], 0.03
+            zd['boundary'] = {
+                'type': 'Polygon',
+                'coordinates': [[
+                    [lng - half, lat - half], [lng + half, lat - half],
+                    [lng + half, lat + half], [lng - half, lat + half],
+                    [lng - half, lat - half],
+                ]],
+            }
             zone, _ = Zone.objects.get_or_create(name=zd['name'], defaults=zd)
             zones.append(zone)
         self.stdout.write(f'  Created {len(zones)} zones')
@@ -105,6 +115,7 @@ class Command(BaseCommand):
         self.stdout.write(f'  Created users: 1 admin, {len(supervisors)} supervisors, {len(workers)} field workers')
 
         # Create Trees
+        from apps.zones.locator import ZoneLocator
         health_weights = ['healthy'] * 6 + ['at_risk'] * 3 + ['dead'] * 1
         trees = []
 
@@ -129,16 +140,28 @@ class Command(BaseCommand):
                     ]),
                     notes=random.choice(['', '', 'Needs attention', 'Growing well', '']),
                 )
+                tree.set_geohash()
                 trees.append(tree)
 
+        # Points scattered around a centre can spill into a neighbouring zone
+        assigned = ZoneLocator(zones).locate_many(
+            [t.latitude for t in trees], [t.longitude for t in trees]
+        )
+        for tree, zone in zip(trees, assigned):
+            tree.zone = zone
+
+        # bulk_create skips Tree.save, so assign tags up front
+        from apps.trees.models import format_tag, reserve_tag_numbers
+        for tree, number in zip(trees, reserve_tag_numbers(len(trees))):
+            tree.tag_number = format_tag(number)
         Tree.objects.bulk_create(trees)
-        # Fetch back to get IDs for tag numbers
-        for tree in Tree.objects.filter(tag_number__isnull=True):
-            tree.tag_number = f"TRK-{tree.id:05d}"
-        Tree.objects.bulk_update(Tree.objects.filter(tag_number__isnull=True), ['tag_number'])
 
         self.stdout.write(f'  Created {len(trees)} trees')
 
+        # bulk_create skips the signals that maintain map clusters
+        from apps.trees import clustering
+        clustering.rebuild()
+
         # Create Maintenance Tasks
         task_types = ['water', 'prune', 'inspect', 'treat', 'fertilize']
         priorities = ['low', 'medium', 'high', 'urgent']
@@ -164,6 +187,18 @@ class Command(BaseCommand):
         MaintenanceTask.objects.bulk_create(tasks)
         self.stdout.write(f'  Created {len(tasks)} maintenance tasks')
 
+        # bulk_create skips the signals that maintain zone stats
+        from apps.zones import stats
+        stats.rebuild()
+
+        # Trend charts read daily snapshots replayed from tree history
+        from apps.reports import snapshots
+        snapshots.rebuild()
+
+        # Drop cached dashboards built from the old data
+        from apps.reports.cache import bump_version
+        bump_version()
+
         self.stdout.write(self.style.SUCCESS('''
 ✅ Demo data seeded successfully!
 
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tree',
+            index=models.Index(fields=['latitude', 'longitude'], name='tree_lat_lng_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zones', '0001_initial'),
+        ('trees', '0002_tree_lat_lng_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TreeCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('cell_x', models.IntegerField()),
+                ('cell_y', models.IntegerField()),
+                ('tree_count', models.IntegerField(default=0)),
+                ('healthy', models.IntegerField(default=0)),
+                ('at_risk', models.IntegerField(default=0)),
+                ('dead', models.IntegerField(default=0)),
+                ('lat_sum', models.FloatField(default=0)),
+                ('lng_sum', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tree_clusters', to='zones.zone')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['zoom', 'cell_x', 'cell_y'], name='tree_cluster_cell_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='treecluster',
+            constraint=models.UniqueConstraint(fields=('zone', 'zoom', 'cell_x', 'cell_y'), name='unique_tree_cluster_cell'),
+        ),
+    ]
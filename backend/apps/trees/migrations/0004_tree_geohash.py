@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0003_treecluster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tree',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Derived from latitude/longitude for spatial lookups', max_length=12),
+        ),
+    ]
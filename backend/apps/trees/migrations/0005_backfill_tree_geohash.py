@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from apps.trees.geo import geohash_encode
+
+
+def backfill_geohash(apps, schema_editor):
+    Tree = apps.get_model('trees', 'Tree')
+    batch = []
+    for tree in Tree.objects.filter(geohash='').only('id', 'latitude', 'longitude').iterator(chunk_size=2000):
+        tree.geohash = geohash_encode(tree.latitude, tree.longitude)
+        batch.append(tree)
+        if len(batch) >= 2000:
+            Tree.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        Tree.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0004_tree_geohash'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:34
+
+import re
+
+from django.db import migrations, models
+from django.db.models import Max
+
+SEQUENCE = 'trees_tag_number_seq'
+
+
+def create_tag_sequence(apps, schema_editor):
+    Tree = apps.get_model('trees', 'Tree')
+    TagCounter = apps.get_model('trees', 'TagCounter')
+
+    # Existing tags were TRK-<id>; start above both the ids and any manual tags
+    start = Tree.objects.aggregate(m=Max('id'))['m'] or 0
+    for tag in Tree.objects.filter(tag_number__startswith='TRK-').values_list('tag_number', flat=True).iterator():
+        match = re.fullmatch(r'TRK-(\d+)', tag)
+        if match:
+            start = max(start, int(match.group(1)))
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS {SEQUENCE} START WITH {start + 1}')
+    else:
+        TagCounter.objects.update_or_create(name=SEQUENCE, defaults={'value': start})
+
+
+def drop_tag_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS {SEQUENCE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0005_backfill_tree_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_tag_sequence, drop_tag_sequence),
+    ]
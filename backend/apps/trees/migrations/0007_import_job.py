@@ -0,0 +1,40 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:57
+
+import apps.common.storage
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trees', '0006_tag_number_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('geojson', 'GeoJSON FeatureCollection')], max_length=20)),
+                ('source', models.FileField(storage=apps.common.storage.export_storage, upload_to='imports/%Y/%m/')),
+                ('default_planted_date', models.DateField(blank=True, null=True)),
+                ('dry_run', models.BooleanField(default=False)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('error_report', models.FileField(blank=True, null=True, storage=apps.common.storage.export_storage, upload_to='imports/%Y/%m/')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tree_imports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.9 on 2026-10-17 03:27
+
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('trees', '0007_import_job'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='healthlog',
+            index=models.Index(fields=['tree', '-logged_at'], name='healthlog_tree_logged_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='healthlog',
+            index=models.Index(fields=['logged_at'], name='healthlog_logged_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tree',
+            index=models.Index(fields=['zone', 'current_health'], name='tree_zone_health_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tree',
+            index=models.Index(fields=['current_health'], name='tree_health_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tree',
+            index=models.Index(fields=['planted_date'], name='tree_planted_date_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.9 on 2026-10-17 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0008_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tree',
+            name='last_completed_task_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Completion time of the latest completed task', null=True),
+        ),
+        migrations.AddField(
+            model_name='tree',
+            name='last_inspected_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Time of the latest health log', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='tree',
+            index=models.Index(fields=['last_inspected_at'], name='tree_last_inspected_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tree',
+            index=models.Index(fields=['last_completed_task_at'], name='tree_last_task_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.models import Max, OuterRef, Subquery
+
+BATCH_SIZE = 10_000
+
+
+def backfill_tree_activity(apps, schema_editor):
+    Tree = apps.get_model('trees', 'Tree')
+    HealthLog = apps.get_model('trees', 'HealthLog')
+    MaintenanceTask = apps.get_model('tasks', 'MaintenanceTask')
+
+    latest_log = HealthLog.objects.filter(tree=OuterRef('pk')).order_by('-logged_at').values('logged_at')[:1]
+    latest_task = MaintenanceTask.objects.filter(
+        tree=OuterRef('pk'), status='completed', completed_at__isnull=False,
+    ).order_by('-completed_at').values('completed_at')[:1]
+
+    last_id = Tree.objects.aggregate(last=Max('id'))['last'] or 0
+    for start in range(0, last_id + 1, BATCH_SIZE):
+        Tree.objects.filter(id__gte=start, id__lt=start + BATCH_SIZE).update(
+            last_inspected_at=Subquery(latest_log),
+            last_completed_task_at=Subquery(latest_task),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0009_tree_activity'),
+        ('tasks', '0002_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_tree_activity, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,11 @@
-from django.db import models
+import re
+
+from django.db import connection, models, transaction
 from django.conf import settings
 
+from apps.common.storage import export_storage
+from . import geo
+
 
 class Species(models.Model):
     common_name = models.CharField(max_length=100)
@@ -18,6 +23,104 @@ class Species(models.Model):
         return f"{self.common_name} ({self.scientific_name})"
 
 
+TAG_SEQUENCE = 'trees_tag_number_seq'
+TAG_PATTERN = re.compile(r'TRK-(\d+)')
+
+
+def format_tag(number):
+    return f"TRK-{number:05d}"
+
+
+def reserve_tag_numbers(count):
+    """
+    Reserve `count` consecutive-ish tag numbers in a single round-trip.
+    PostgreSQL uses a real sequence (no row locks, gaps on rollback are fine);
+    other backends bump a TagCounter row, which stays locked until the
+    surrounding transaction commits.
+    """
+    if count <= 0:
+        return []
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT nextval('{TAG_SEQUENCE}') FROM generate_series(1, %s)", [count]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    with transaction.atomic():
+        TagCounter.objects.filter(name=TAG_SEQUENCE).update(value=models.F('value') + count)
+        last = TagCounter.objects.get(name=TAG_SEQUENCE).value
+    return list(range(last - count + 1, last + 1))
+
+
+def tag_sequence_number(tag):
+    """The sequence number behind a generated-looking tag (TRK-00042 -> 42), else None."""
+    match = TAG_PATTERN.fullmatch(tag or '')
+    return int(match.group(1)) if match else None
+
+
+def advance_tag_numbers(tags):
+    """
+    Move the tag sequence past any supplied tag that looks generated, so
+    reserve_tag_numbers never hands out a number that is already in use.
+    Never moves the sequence backwards.
+    """
+    number = max(filter(None, map(tag_sequence_number, tags)), default=None)
+    if number is None:
+        return
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT setval('{TAG_SEQUENCE}', %s) FROM {TAG_SEQUENCE} WHERE last_value < %s",
+                [number, number],
+            )
+        return
+    TagCounter.objects.filter(name=TAG_SEQUENCE, value__lt=number).update(value=number)
+
+
+class TagCounter(models.Model):
+    """Tag number counter for databases without sequences (see reserve_tag_numbers)."""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class TreeQuerySet(models.QuerySet):
+    def in_bbox(self, bbox):
+        """Trees inside (min_lng, min_lat, max_lng, max_lat); served by tree_lat_lng_idx."""
+        min_lng, min_lat, max_lng, max_lat = bbox
+        return self.filter(
+            latitude__gte=min_lat, latitude__lte=max_lat,
+            longitude__gte=min_lng, longitude__lte=max_lng,
+        )
+
+    def near(self, lat, lng, radius_m):
+        """
+        Candidate trees within radius_m of a point: a geohash prefix scan
+        narrowed by the bounding box. Use nearest() for exact distances.
+        """
+        cells = models.Q()
+        for prefix in geo.geohash_cover(lat, lng, radius_m):
+            cells |= models.Q(geohash__startswith=prefix)
+        return self.filter(cells).in_bbox(geo.bbox_around(lat, lng, radius_m))
+
+    def nearest(self, lat, lng, radius_m, limit=None):
+        """Trees within radius_m sorted by distance, each with a distance_m attribute."""
+        found = []
+        for tree in self.near(lat, lng, radius_m):
+            tree.distance_m = geo.haversine_m(lat, lng, tree.latitude, tree.longitude)
+            if tree.distance_m <= radius_m:
+                found.append(tree)
+        found.sort(key=lambda t: t.distance_m)
+        return found[:limit] if limit else found
+
+    def not_inspected_since(self, when):
+        """Trees whose latest health log is older than `when`, or that have none."""
+        return self.filter(models.Q(last_inspected_at__lt=when) | models.Q(last_inspected_at__isnull=True))
+
+
 class Tree(models.Model):
     HEALTH_CHOICES = [
         ('healthy', 'Healthy'),
@@ -37,6 +140,8 @@ class Tree(models.Model):
     # Location
     latitude = models.FloatField()
     longitude = models.FloatField()
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False,
+                               help_text="Derived from latitude/longitude for spatial lookups")
     location_description = models.CharField(max_length=255, blank=True,
                                             help_text="e.g. Near Gate 3, South side")
 
@@ -47,6 +152,12 @@ class Tree(models.Model):
     tag_number = models.CharField(max_length=50, unique=True, blank=True, null=True,
                                   help_text="Physical tag on the tree")
 
+    # Latest activity, kept in step by the writes (see activity.py)
+    last_inspected_at = models.DateTimeField(null=True, blank=True, editable=False,
+                                             help_text="Time of the latest health log")
+    last_completed_task_at = models.DateTimeField(null=True, blank=True, editable=False,
+                                                  help_text="Completion time of the latest completed task")
+
     # Media
     photo = models.ImageField(upload_to='trees/%Y/%m/', blank=True, null=True)
     notes = models.TextField(blank=True)
@@ -54,20 +165,50 @@ class Tree(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TreeQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Viewport (bbox / tile) queries on the map
+            models.Index(fields=['latitude', 'longitude'], name='tree_lat_lng_idx'),
+            # Health filters and per-zone health counts (list, dashboard, stats)
+            models.Index(fields=['zone', 'current_health'], name='tree_zone_health_idx'),
+            models.Index(fields=['current_health'], name='tree_health_idx'),
+            models.Index(fields=['planted_date'], name='tree_planted_date_idx'),
+            # Staleness filters (inspected_before, inspection reminders)
+            models.Index(fields=['last_inspected_at'], name='tree_last_inspected_idx'),
+            models.Index(fields=['last_completed_task_at'], name='tree_last_task_idx'),
+        ]
 
     def __str__(self):
         return f"Tree #{self.id} - {self.species} ({self.zone})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so signal handlers can work out deltas
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def set_geohash(self):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.geohash_encode(self.latitude, self.longitude)
+
     def save(self, *args, **kwargs):
+        self.set_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+
         # Auto-generate tag if not provided
         if not self.tag_number:
-            super().save(*args, **kwargs)
-            self.tag_number = f"TRK-{self.id:05d}"
-            Tree.objects.filter(pk=self.pk).update(tag_number=self.tag_number)
-        else:
-            super().save(*args, **kwargs)
+            self.tag_number = format_tag(reserve_tag_numbers(1)[0])
+            if update_fields is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'tag_number'}
+        elif self._state.adding:
+            advance_tag_numbers([self.tag_number])
+        super().save(*args, **kwargs)
 
 
 class HealthLog(models.Model):
@@ -85,6 +226,93 @@ class HealthLog(models.Model):
 
     class Meta:
         ordering = ['-logged_at']
+        indexes = [
+            # A tree's history and its latest log (inspections, detail view)
+            models.Index(fields=['tree', '-logged_at'], name='healthlog_tree_logged_idx'),
+            # Recent activity across all trees (dashboard, snapshots)
+            models.Index(fields=['logged_at'], name='healthlog_logged_at_idx'),
+        ]
 
     def __str__(self):
         return f"Health log for Tree #{self.tree_id} - {self.health_status}"
+
+
+class TreeCluster(models.Model):
+    """
+    Precomputed grid cluster for the map at low zoom levels.
+    One row per (zone, zoom, cell); kept up to date by apps.trees.signals
+    and rebuilt with `python manage.py rebuild_clusters`.
+    """
+    zone = models.ForeignKey('zones.Zone', on_delete=models.CASCADE, related_name='tree_clusters')
+    zoom = models.PositiveSmallIntegerField()
+    cell_x = models.IntegerField()
+    cell_y = models.IntegerField()
+
+    tree_count = models.IntegerField(default=0)
+    healthy = models.IntegerField(default=0)
+    at_risk = models.IntegerField(default=0)
+    dead = models.IntegerField(default=0)
+    # Sums rather than means so deltas can be applied without re-reading trees
+    lat_sum = models.FloatField(default=0)
+    lng_sum = models.FloatField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['zone', 'zoom', 'cell_x', 'cell_y'],
+                                    name='unique_tree_cluster_cell'),
+        ]
+        indexes = [
+            models.Index(fields=['zoom', 'cell_x', 'cell_y'], name='tree_cluster_cell_idx'),
+        ]
+
+    def __str__(self):
+        return f"Cluster z{self.zoom} ({self.cell_x}, {self.cell_y}) - {self.tree_count} trees"
+
+
+class ImportJob(models.Model):
+    """A CSV/GeoJSON tree import run by a Celery worker (see importer.py)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('geojson', 'GeoJSON FeatureCollection'),
+    ]
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='tree_imports'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    format = models.CharField(max_length=20, choices=FORMAT_CHOICES)
+    source = models.FileField(upload_to='imports/%Y/%m/', storage=export_storage)
+    default_planted_date = models.DateField(null=True, blank=True)
+    dry_run = models.BooleanField(default=False)
+
+    # Progress and output; rejected rows are listed in error_report
+    rows = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    error_report = models.FileField(upload_to='imports/%Y/%m/', storage=export_storage, blank=True, null=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import job #{self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
@@ -0,0 +1,170 @@
+"""
+Compact map payloads, negotiated through the Accept header.
+
+application/vnd.treetracker.columnar+json
+    {"kind": "trees", "count": N, "dictionaries": {...}, "columns": {...}}
+    Each column is an array of N values. health/species/zone are indexes into
+    the dictionaries, id is delta-encoded (sorted, first value absolute) and
+    planted_date is days since 1970-01-01 (null when missing).
+
+application/vnd.treetracker.points
+    Binary, little-endian:
+        b'TTP1' | uint32 N | uint32 header_len | header JSON | pad to 4 bytes
+        | column blocks in the order listed in header["layout"]
+    The header carries kind, count, dictionaries, string columns and the
+    layout [[name, typecode], ...]. Typecodes are Python array codes:
+    'f' float32, 'I' uint32, 'i' int32, 'H' uint16, 'B' uint8.
+    A missing planted_date is written as MISSING_DAYS (-2**31).
+
+Both formats also encode cluster responses (kind "clusters") with float32
+coordinates and uint32 counts.
+"""
+import json
+import struct
+import sys
+from array import array
+from datetime import date
+
+from rest_framework.renderers import BaseRenderer
+
+MAGIC = b'TTP1'
+EPOCH = date(1970, 1, 1)
+MISSING_DAYS = -2 ** 31
+
+HEALTH_CODES = ['healthy', 'at_risk', 'dead']
+CLUSTER_COUNT_FIELDS = ('count', 'healthy', 'at_risk', 'dead')
+
+
+def _dictionary_encode(values):
+    """Map values to small integer codes. Code 0 is reserved for None."""
+    lookup = {None: 0}
+    codes = []
+    for value in values:
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(lookup)
+        codes.append(code)
+    dictionary = [None] * len(lookup)
+    for value, code in lookup.items():
+        dictionary[code] = value
+    return dictionary, codes
+
+
+def _delta_encode(values):
+    previous = 0
+    deltas = []
+    for value in values:
+        deltas.append(value - previous)
+        previous = value
+    return deltas
+
+
+def _days(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return (value - EPOCH).days
+
+
+def encode_columns(rows):
+    """
+    Split map rows into (kind, dictionaries, numeric columns, string columns).
+    Numeric columns are (name, typecode, values) in wire order.
+    """
+    if rows and rows[0].get('cluster'):
+        numeric = [
+            ('latitude', 'f', [r['latitude'] for r in rows]),
+            ('longitude', 'f', [r['longitude'] for r in rows]),
+        ] + [(field, 'I', [r[field] for r in rows]) for field in CLUSTER_COUNT_FIELDS]
+        return 'clusters', {}, numeric, {}
+
+    rows = sorted(rows, key=lambda r: r['id'])
+    species, species_codes = _dictionary_encode(r['species__common_name'] for r in rows)
+    zones, zone_codes = _dictionary_encode(r['zone__name'] for r in rows)
+    health_lookup = {h: i for i, h in enumerate(HEALTH_CODES)}
+
+    numeric = [
+        ('id', 'I', _delta_encode([r['id'] for r in rows])),
+        ('latitude', 'f', [r['latitude'] for r in rows]),
+        ('longitude', 'f', [r['longitude'] for r in rows]),
+        ('health', 'B', [health_lookup.get(r['current_health'], 0) for r in rows]),
+        ('species', 'H', species_codes),
+        ('zone', 'H', zone_codes),
+        ('planted_date', 'i', [_days(r['planted_date']) for r in rows]),
+    ]
+    strings = {
+        'tag_number': [r['tag_number'] for r in rows],
+        'photo': [r['photo'] or None for r in rows],
+    }
+    dictionaries = {'health': HEALTH_CODES, 'species': species, 'zone': zones}
+    return 'trees', dictionaries, numeric, strings
+
+
+class ColumnarJSONRenderer(BaseRenderer):
+    media_type = 'application/vnd.treetracker.columnar+json'
+    format = 'columnar'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            # Errors are passed through untouched
+            return json.dumps(data).encode()
+        kind, dictionaries, numeric, strings = encode_columns(data)
+        columns = {name: values for name, _, values in numeric}
+        columns.update(strings)
+        return json.dumps({
+            'kind': kind,
+            'count': len(data),
+            'dictionaries': dictionaries,
+            'columns': columns,
+        }, separators=(',', ':')).encode()
+
+
+class PointsBinaryRenderer(BaseRenderer):
+    media_type = 'application/vnd.treetracker.points'
+    format = 'points'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            return json.dumps(data).encode()
+
+        kind, dictionaries, numeric, strings = encode_columns(data)
+        header = json.dumps({
+            'kind': kind,
+            'count': len(data),
+            'dictionaries': dictionaries,
+            'strings': strings,
+            'layout': [[name, typecode] for name, typecode, _ in numeric],
+        }, separators=(',', ':')).encode()
+        header += b' ' * (-len(header) % 4)
+
+        parts = [MAGIC, struct.pack('<II', len(data), len(header)), header]
+        for name, typecode, values in numeric:
+            if name == 'planted_date':
+                values = [MISSING_DAYS if v is None else v for v in values]
+            block = array(typecode, values)
+            if sys.byteorder == 'big':
+                block.byteswap()
+            parts.append(block.tobytes())
+            # Keep every block 4-byte aligned for typed-array views on the client
+            parts.append(b'\0' * (-len(parts[-1]) % 4))
+        return b''.join(parts)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """One JSON document per line; lists become one line per item."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(json.dumps(item, default=str).encode() + b'\n' for item in items)
@@ -1,5 +1,10 @@
 from rest_framework import serializers
-from .models import Tree, HealthLog, Species
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
+from apps.common.queries import display_name
+from apps.common.serializers import FileUrlField, RowSerializer
+from .models import Tree, HealthLog, Species, ImportJob
 
 
 class SpeciesSerializer(serializers.ModelSerializer):
@@ -18,32 +23,40 @@ class HealthLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'logged_at', 'logged_by', 'previous_health']
 
     def get_logged_by_name(self, obj):
+        if hasattr(obj, 'logged_by_display'):  # annotated, see TreeDetailView
+            return obj.logged_by_display
         if obj.logged_by:
             return obj.logged_by.get_full_name() or obj.logged_by.username
         return None
 
 
-class TreeListSerializer(serializers.ModelSerializer):
-    species_name = serializers.SerializerMethodField()
-    zone_name = serializers.SerializerMethodField()
-    planted_by_name = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Tree
-        fields = ['id', 'tag_number', 'species', 'species_name', 'zone', 'zone_name',
-                  'latitude', 'longitude', 'current_health', 'planted_date',
-                  'photo', 'planted_by_name', 'location_description', 'created_at']
-
-    def get_species_name(self, obj):
-        return obj.species.common_name if obj.species else None
-
-    def get_zone_name(self, obj):
-        return obj.zone.name if obj.zone else None
-
-    def get_planted_by_name(self, obj):
-        if obj.planted_by:
-            return obj.planted_by.get_full_name() or obj.planted_by.username
-        return None
+class TreeListSerializer(RowSerializer):
+    """Tree list rows from TreeListSerializer.rows(queryset): one query per page."""
+    id = serializers.IntegerField()
+    tag_number = serializers.CharField()
+    species = serializers.IntegerField()
+    species_name = serializers.CharField()
+    zone = serializers.IntegerField()
+    zone_name = serializers.CharField()
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    current_health = serializers.CharField()
+    planted_date = serializers.DateField()
+    photo = FileUrlField(Tree._meta.get_field('photo'))
+    planted_by_name = serializers.CharField()
+    location_description = serializers.CharField()
+    last_inspected_at = serializers.DateTimeField()
+    last_completed_task_at = serializers.DateTimeField()
+    created_at = serializers.DateTimeField()
+
+    @classmethod
+    def rows(cls, queryset):
+        return cls.values(
+            queryset,
+            species_name=F('species__common_name'),
+            zone_name=F('zone__name'),
+            planted_by_name=display_name('planted_by'),
+        )
 
 
 class TreeDetailSerializer(serializers.ModelSerializer):
@@ -59,6 +72,7 @@ class TreeDetailSerializer(serializers.ModelSerializer):
                   'planted_by', 'planted_by_name', 'latitude', 'longitude',
                   'location_description', 'current_health', 'planted_date',
                   'days_since_planted', 'height_cm', 'photo', 'notes',
+                  'last_inspected_at', 'last_completed_task_at',
                   'health_logs', 'created_at', 'updated_at']
         read_only_fields = ['id', 'tag_number', 'created_at', 'updated_at']
 
@@ -96,17 +110,36 @@ class HealthUpdateSerializer(serializers.Serializer):
         previous_health = tree.current_health
         new_health = validated_data['health_status']
 
-        # Create health log
-        HealthLog.objects.create(
-            tree=tree,
-            logged_by=self.context['request'].user,
-            previous_health=previous_health,
-            health_status=new_health,
-            notes=validated_data.get('notes', ''),
-            photo=validated_data.get('photo')
-        )
-
-        # Update tree
-        tree.current_health = new_health
-        tree.save(update_fields=['current_health', 'updated_at'])
+        with transaction.atomic():
+            # Create health log
+            log = HealthLog.objects.create(
+                tree=tree,
+                logged_by=self.context['request'].user,
+                previous_health=previous_health,
+                health_status=new_health,
+                notes=validated_data.get('notes', ''),
+                photo=validated_data.get('photo')
+            )
+
+            # Update tree
+            tree.current_health = new_health
+            tree.last_inspected_at = log.logged_at
+            tree.save(update_fields=['current_health', 'last_inspected_at', 'updated_at'])
         return tree
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    errors_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = ['id', 'status', 'format', 'default_planted_date', 'dry_run', 'rows', 'created', 'failed',
+                  'error', 'errors_url', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+    def get_errors_url(self, obj):
+        if not obj.error_report:
+            return None
+        url = reverse('tree_import_errors', args=[obj.id])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
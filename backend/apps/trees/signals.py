@@ -0,0 +1,120 @@
+"""
+Keeps derived map data (clusters) and the ZoneStats rollup in step with
+Tree and HealthLog writes.
+bulk_create bypasses the model signals, so bulk paths send trees_bulk_created
+instead. Other bulk edits (queryset.update, bulk_update) must refresh clusters
+themselves, see clustering.rebuild().
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from apps.zones import stats
+
+from . import clustering
+from .models import HealthLog, Tree
+
+STATE_FIELDS = ('zone_id', 'latitude', 'longitude', 'current_health')
+
+# Sent inside the inserting transaction with trees=[Tree, ...] (pks set)
+trees_bulk_created = Signal()
+
+
+def _loaded_state(tree):
+    loaded = getattr(tree, '_loaded_values', None) or {}
+    if all(f in loaded for f in STATE_FIELDS):
+        return tuple(loaded[f] for f in STATE_FIELDS)
+    return None
+
+
+def _current_state(tree):
+    return tuple(getattr(tree, f) for f in STATE_FIELDS)
+
+
+@receiver(pre_save, sender=Tree)
+def remember_previous_state(sender, instance, **kwargs):
+    if instance._state.adding or instance.pk is None:
+        instance._previous_state = None
+        return
+    previous = _loaded_state(instance)
+    if previous is None:
+        # Instance was not loaded with all the fields we need (e.g. .only())
+        previous = Tree.objects.filter(pk=instance.pk).values_list(*STATE_FIELDS).first()
+    instance._previous_state = previous
+
+
+@receiver(post_save, sender=Tree)
+def update_clusters_on_save(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_previous_state', None)
+    current = _current_state(instance)
+    if previous == current:
+        return
+
+    deltas = clustering.new_deltas()
+    if previous:
+        clustering.add_delta(deltas, *previous, sign=-1)
+    clustering.add_delta(deltas, *current)
+
+    # Later saves of the same instance diff against what is now stored
+    instance._loaded_values = {
+        **(getattr(instance, '_loaded_values', None) or {}),
+        **dict(zip(STATE_FIELDS, current)),
+    }
+    transaction.on_commit(lambda: clustering.apply_deltas(deltas))
+
+
+@receiver(post_delete, sender=Tree)
+def update_clusters_on_delete(sender, instance, **kwargs):
+    state = _loaded_state(instance) or _current_state(instance)
+    deltas = clustering.new_deltas()
+    clustering.add_delta(deltas, *state, sign=-1)
+    transaction.on_commit(lambda: clustering.apply_deltas(deltas))
+
+
+@receiver(trees_bulk_created, sender=Tree)
+def update_clusters_on_bulk_create(sender, trees, **kwargs):
+    deltas = clustering.new_deltas()
+    for tree in trees:
+        clustering.add_delta(deltas, *_current_state(tree))
+    transaction.on_commit(lambda: clustering.apply_deltas(deltas))
+
+
+# ── Zone stats ────────────────────────────────────────────────
+# Applied inside the writing transaction, not on commit
+
+ZONE_INDEX = STATE_FIELDS.index('zone_id')
+HEALTH_INDEX = STATE_FIELDS.index('current_health')
+
+
+@receiver(post_save, sender=Tree)
+def update_zone_stats_on_save(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_previous_state', None)
+    deltas = stats.new_deltas()
+    if previous:
+        stats.add_tree(deltas, previous[ZONE_INDEX], previous[HEALTH_INDEX], sign=-1)
+    stats.add_tree(deltas, instance.zone_id, instance.current_health)
+    stats.apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Tree)
+def update_zone_stats_on_delete(sender, instance, **kwargs):
+    state = _loaded_state(instance) or _current_state(instance)
+    deltas = stats.new_deltas()
+    stats.add_tree(deltas, state[ZONE_INDEX], state[HEALTH_INDEX], sign=-1)
+    stats.apply_deltas(deltas)
+
+
+@receiver(trees_bulk_created, sender=Tree)
+def update_zone_stats_on_bulk_create(sender, trees, **kwargs):
+    deltas = stats.new_deltas()
+    for tree in trees:
+        stats.add_tree(deltas, tree.zone_id, tree.current_health)
+    stats.apply_deltas(deltas)
+
+
+@receiver(post_save, sender=HealthLog)
+def update_zone_activity_on_health_log(sender, instance, created, **kwargs):
+    if created:
+        deltas = stats.new_deltas()
+        stats.touch(deltas, instance.tree.zone_id)
+        stats.apply_deltas(deltas, activity_at=instance.logged_at)
@@ -0,0 +1,430 @@
+"""
+Synthetic data at benchmark scale (seed_data only creates a demo city).
+
+    counts = generate(**PROFILES['medium'], seed=1)
+
+Zones are square cells tiled around real city centres. Trees are weighted
+towards each city's centre and gathered around a few hotspots per zone
+(parks, avenues), with some scatter, so map viewports and clusters see
+realistic densities. Users are one supervisor per zone and field workers
+spread round-robin over the zones.
+
+Each tree gets a random walk of health logs between its planting date and
+now (healthy -> at risk -> dead, with recoveries); its current health is
+the last state of the walk, so health history, snapshots and trees agree.
+
+Everything is drawn with NumPy a batch at a time and written with
+bulk_create, or COPY / executemany for health logs (bulk_create would
+overwrite their logged_at). Signals are skipped, so clusters, zone stats,
+tree activity, snapshots and the report cache are rebuilt at the end, as
+in seed_data.
+Daily snapshots are only written for the last `history_days` days: there
+is one row per day, zone and species, which over ten years of plantings
+and thousands of zones would dwarf every other table. The years before
+that window are only summed up in the database (see snapshots.replay), so
+the rebuild's time and memory follow `history_days` and the number of
+zones and species, not the ten years of plantings.
+
+Everything created is named with PREFIX, and reset() removes exactly that.
+"""
+import csv
+import io
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import HealthLog, Species, Tree, format_tag, reserve_tag_numbers
+
+PREFIX = 'synth'
+
+PROFILES = {
+    'small': {'zones': 20, 'users': 100, 'trees': 10_000, 'logs': 50_000, 'tasks': 1_000},
+    'medium': {'zones': 200, 'users': 1_000, 'trees': 100_000, 'logs': 1_000_000, 'tasks': 10_000},
+    'large': {'zones': 2_000, 'users': 5_000, 'trees': 1_000_000, 'logs': 10_000_000, 'tasks': 100_000},
+}
+
+CITIES = [
+    ('Bangalore', 12.9716, 77.5946), ('Chennai', 13.0827, 80.2707),
+    ('Hyderabad', 17.3850, 78.4867), ('Pune', 18.5204, 73.8567),
+    ('Mumbai', 19.0760, 72.8777), ('Delhi', 28.6139, 77.2090),
+    ('Kolkata', 22.5726, 88.3639), ('Ahmedabad', 23.0225, 72.5714),
+]
+SPECIES = [
+    ('Neem', 'Azadirachta indica'), ('Peepal', 'Ficus religiosa'),
+    ('Gulmohar', 'Delonix regia'), ('Banyan', 'Ficus benghalensis'),
+    ('Rain Tree', 'Samanea saman'), ('Tamarind', 'Tamarindus indica'),
+    ('Ashoka', 'Saraca asoca'), ('Silver Oak', 'Grevillea robusta'),
+    ('Jamun', 'Syzygium cumini'), ('Indian Laburnum', 'Cassia fistula'),
+    ('Pongamia', 'Millettia pinnata'), ('Mango', 'Mangifera indica'),
+]
+ZONE_SIZE = 0.02        # degrees, ~2 km squares
+HOTSPOTS_PER_ZONE = 3
+SCATTER = 0.2           # share of trees placed uniformly in their zone
+MAX_AGE_DAYS = 10 * 365
+HISTORY_DAYS = 400      # snapshot days rebuilt; covers the 12-month trend
+
+HEALTH = np.array(['healthy', 'at_risk', 'dead'], dtype=object)
+# P(next state | current state); rows and columns follow HEALTH
+TRANSITIONS = np.array([
+    [0.80, 0.17, 0.03],
+    [0.50, 0.35, 0.15],
+    [0.02, 0.03, 0.95],
+])
+TASK_TYPES = np.array(['water', 'prune', 'treat', 'fertilize', 'inspect', 'remove'], dtype=object)
+PRIORITIES = np.array(['low', 'medium', 'high', 'urgent'], dtype=object)
+TASK_STATUSES = np.array(['pending', 'in_progress', 'completed', 'cancelled'], dtype=object)
+TASK_STATUS_WEIGHTS = [0.45, 0.15, 0.35, 0.05]
+LOCATIONS = np.array(['Near main road', 'Park entrance', 'School boundary', 'Roadside median',
+                      'Near water body', 'Colony compound'], dtype=object)
+
+
+def _log(stdout, message):
+    if stdout:
+        stdout.write(message)
+
+
+def insert_rows(model, fields, rows):
+    """
+    Insert raw value tuples for `fields` without touching model save logic
+    (no auto_now, no signals): COPY on PostgreSQL, executemany elsewhere.
+    """
+    fields = [model._meta.get_field(name) for name in fields]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ', '.join(quote(f.column) for f in fields)
+    prepared = ([f.get_db_prep_save(v, connection) for f, v in zip(fields, row)] for row in rows)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in prepared:
+                writer.writerow(['\\N' if v is None else v for v in row])
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", list(prepared))
+
+
+class Generator:
+    def __init__(self, zones, users, trees, logs, tasks, seed=0, batch_size=50_000,
+                 history_days=HISTORY_DAYS, stdout=None):
+        self.sizes = {'zones': zones, 'users': users, 'trees': trees, 'logs': logs, 'tasks': tasks}
+        self.history_days = history_days
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.today = timezone.localdate()
+        self.now = timezone.now()
+
+    def run(self):
+        self.species_ids = np.array(self.make_species())
+        self.zones = self.make_zones()
+        self.make_users()
+        tree_ids, tree_zones, log_count = self.make_trees()
+        task_count = self.make_tasks(tree_ids, tree_zones)
+        self.refresh_derived()
+        return {
+            'zones': len(self.zones), 'users': 1 + len(self.supervisor_ids) + len(self.worker_ids),
+            'trees': len(tree_ids), 'logs': log_count, 'tasks': task_count,
+        }
+
+    # ── Reference data ────────────────────────────────────────
+
+    def make_species(self):
+        ids = []
+        for common, scientific in SPECIES:
+            species, _ = Species.objects.get_or_create(
+                common_name=common, defaults={'scientific_name': scientific})
+            ids.append(species.id)
+        return ids
+
+    def make_zones(self):
+        from apps.zones.models import Zone
+
+        count = self.sizes['zones']
+        rows = []
+        # Each city gets a square block of zone cells around its centre
+        for c, (city, lat, lng) in enumerate(CITIES):
+            share = count // len(CITIES) + (1 if c < count % len(CITIES) else 0)
+            side = int(np.ceil(np.sqrt(share)))
+            for i in range(share):
+                gx, gy = i % side - (side - 1) / 2, i // side - (side - 1) / 2
+                clat, clng = lat + gy * ZONE_SIZE, lng + gx * ZONE_SIZE
+                rows.append((city, i, clat, clng, np.hypot(gx, gy)))
+
+        half = ZONE_SIZE / 2
+        zones = [
+            Zone(
+                name=f'{PREFIX} {city} {i + 1:04d}', city=city,
+                center_lat=round(clat, 6), center_lng=round(clng, 6),
+                area_sq_km=round(float((ZONE_SIZE * 111.32) ** 2 * np.cos(np.radians(clat))), 2),
+                boundary={'type': 'Polygon', 'coordinates': [[
+                    [clng - half, clat - half], [clng + half, clat - half],
+                    [clng + half, clat + half], [clng - half, clat + half],
+                    [clng - half, clat - half],
+                ]]},
+            )
+            for city, i, clat, clng, _ in rows
+        ]
+        zones = Zone.objects.bulk_create(zones, batch_size=1000)
+
+        self.zone_ids = np.array([z.id for z in zones])
+        self.zone_centres = np.array([[z.center_lat, z.center_lng] for z in zones])
+        # Denser towards the city centre, with a long tail between neighbours
+        distance = np.array([r[4] for r in rows])
+        weights = self.rng.lognormal(0, 0.6, len(zones)) / (1 + distance) ** 1.5
+        self.zone_weights = weights / weights.sum()
+        self.hotspots = self.zone_centres[:, None, :] + self.rng.uniform(
+            -ZONE_SIZE * 0.35, ZONE_SIZE * 0.35, (len(zones), HOTSPOTS_PER_ZONE, 2))
+        _log(self.stdout, f'  Created {len(zones)} zones in {len(CITIES)} cities')
+        return zones
+
+    def make_users(self):
+        User = get_user_model()
+
+        zone_count = len(self.zones)
+        total = self.sizes['users']
+        supervisors = min(zone_count, total // 5)
+        password = make_password(None)
+        users = [
+            User(username=f'{PREFIX}-admin', email=f'{PREFIX}-admin@example.com', first_name='Synthetic',
+                 last_name='Admin', role='admin', password=password, is_staff=True),
+        ]
+        users += [
+            User(username=f'{PREFIX}-supervisor-{i + 1:05d}', email=f'{PREFIX}-supervisor-{i + 1:05d}@example.com',
+                 first_name='Supervisor', last_name=str(i + 1), role='supervisor',
+                 zone=self.zones[i], password=password)
+            for i in range(supervisors)
+        ]
+        users += [
+            User(username=f'{PREFIX}-worker-{i + 1:06d}', email=f'{PREFIX}-worker-{i + 1:06d}@example.com',
+                 first_name='Field Worker', last_name=str(i + 1), role='field_worker',
+                 zone=self.zones[i % zone_count], password=password)
+            for i in range(max(total - supervisors - 1, 1))
+        ]
+        users = User.objects.bulk_create(users, batch_size=1000)
+        self.admin_id = users[0].id
+        self.supervisor_ids = np.array([u.id for u in users[1:supervisors + 1]])
+        # Worker i works in zone i % zone_count
+        self.worker_ids = np.array([u.id for u in users[supervisors + 1:]])
+        _log(self.stdout, f'  Created {len(users)} users ({supervisors} supervisors)')
+
+    def zone_workers(self, zone_index):
+        """A random field worker of each zone (-1 where the zone has none)."""
+        zone_count = len(self.zones)
+        per_zone = (len(self.worker_ids) - zone_index + zone_count - 1) // zone_count
+        pick = (self.rng.random(len(zone_index)) * np.maximum(per_zone, 1)).astype(int)
+        index = zone_index + pick * zone_count
+        return np.where(per_zone > 0, self.worker_ids[np.minimum(index, len(self.worker_ids) - 1)], -1)
+
+    # ── Trees and health history ─────────────────────────────
+
+    def make_trees(self):
+        total = self.sizes['trees']
+        logs_per_tree = self.sizes['logs'] / total if total else 0
+        tree_ids, tree_zones = [], []
+        log_count = 0
+        for start in range(0, total, self.batch_size):
+            size = min(self.batch_size, total - start)
+            with transaction.atomic():
+                ids, zones, logs = self.make_tree_batch(size, logs_per_tree)
+            tree_ids.append(ids)
+            tree_zones.append(zones)
+            log_count += logs
+            _log(self.stdout, f'  {start + size} trees, {log_count} health logs')
+        if not tree_ids:
+            return np.array([], dtype=int), np.array([], dtype=int), 0
+        return np.concatenate(tree_ids), np.concatenate(tree_zones), log_count
+
+    def points(self, zone_index):
+        rng = self.rng
+        size = len(zone_index)
+        spot = self.hotspots[zone_index, rng.integers(0, HOTSPOTS_PER_ZONE, size)]
+        points = spot + rng.normal(0, ZONE_SIZE / 10, (size, 2))
+        scatter = rng.random(size) < SCATTER
+        points[scatter] = self.zone_centres[zone_index[scatter]] + rng.uniform(
+            -ZONE_SIZE / 2, ZONE_SIZE / 2, (scatter.sum(), 2))
+        # Keep every tree inside its own zone's square
+        inset = ZONE_SIZE / 2 * 0.999
+        centres = self.zone_centres[zone_index]
+        return np.clip(points, centres - inset, centres + inset)
+
+    def health_walks(self, planted, logs_per_tree):
+        """
+        Random health walks for a batch of trees. Returns (current state per
+        tree, and per log: tree index, previous state, new state, logged_at).
+        """
+        rng = self.rng
+        size = len(planted)
+        counts = rng.poisson(logs_per_tree, size)
+        tree_index = np.repeat(np.arange(size), counts)
+        # Log times are uniform between planting and now, ordered per tree
+        offsets = rng.random(len(tree_index))
+        order = np.lexsort((offsets, tree_index))
+        offsets = offsets[order]
+        # Epoch seconds, from 08:00 UTC on the planting day
+        starts = planted.astype('datetime64[s]').astype(np.int64) + 8 * 3600
+        span = np.maximum(self.now.timestamp() - starts[tree_index], 0)
+        logged_at = starts[tree_index] + offsets * span
+
+        position = np.arange(len(tree_index)) - np.repeat(np.cumsum(counts) - counts, counts)
+        state = np.zeros(size, dtype=int)
+        previous = np.empty(len(tree_index), dtype=int)
+        new = np.empty(len(tree_index), dtype=int)
+        cumulative = TRANSITIONS.cumsum(axis=1)
+        for step in range(counts.max() if size else 0):
+            at = np.flatnonzero(position == step)
+            trees = tree_index[at]
+            before = state[trees]
+            after = (rng.random(len(at))[:, None] > cumulative[before]).sum(axis=1)
+            previous[at], new[at] = before, after
+            state[trees] = after
+        return state, tree_index, previous, new, logged_at
+
+    def make_tree_batch(self, size, logs_per_tree):
+        rng = self.rng
+        zone_index = rng.choice(len(self.zones), size, p=self.zone_weights)
+        points = self.points(zone_index)
+        # Skewed towards recent plantings
+        age = (MAX_AGE_DAYS * rng.random(size) ** 1.5).astype(int) + 1
+        planted = np.datetime64(self.today, 'D') - age
+        state, log_tree, previous, new, logged_at = self.health_walks(planted, logs_per_tree)
+        planted_by = self.zone_workers(zone_index)
+        heights = (50 + age * rng.uniform(0.1, 0.4, size)).astype(int)
+        notes = np.where(rng.random(size) < 0.2, 'Needs attention', '')
+
+        tags = [format_tag(n) for n in reserve_tag_numbers(size)]
+        planted_dates = planted.astype(object)
+        trees = []
+        for i in range(size):
+            tree = Tree(
+                tag_number=tags[i],
+                species_id=int(self.species_ids[rng.integers(0, len(self.species_ids))]),
+                zone_id=int(self.zone_ids[zone_index[i]]),
+                planted_by_id=int(planted_by[i]) if planted_by[i] >= 0 else None,
+                latitude=round(float(points[i, 0]), 6),
+                longitude=round(float(points[i, 1]), 6),
+                current_health=HEALTH[state[i]],
+                planted_date=planted_dates[i],
+                height_cm=int(heights[i]),
+                location_description=LOCATIONS[rng.integers(0, len(LOCATIONS))],
+                notes=notes[i],
+            )
+            tree.set_geohash()
+            trees.append(tree)
+        Tree.objects.bulk_create(trees, batch_size=2000)
+        ids = np.array([t.id for t in trees])
+
+        logged_by = self.zone_workers(zone_index[log_tree])
+        log_ids = ids[log_tree]
+        insert_rows(HealthLog, ['tree', 'logged_by', 'previous_health', 'health_status', 'notes', 'logged_at'], (
+            (int(log_ids[j]), int(logged_by[j]) if logged_by[j] >= 0 else None,
+             HEALTH[previous[j]], HEALTH[new[j]], '',
+             datetime.fromtimestamp(logged_at[j], tz=dt_timezone.utc))
+            for j in range(len(log_tree))
+        ))
+        return ids, zone_index, len(log_tree)
+
+    # ── Tasks ─────────────────────────────────────────────────
+
+    def make_tasks(self, tree_ids, tree_zones):
+        from apps.tasks.models import MaintenanceTask
+
+        rng = self.rng
+        total = self.sizes['tasks']
+        created = 0
+        for start in range(0, total, self.batch_size):
+            size = min(self.batch_size, total - start)
+            # Most tasks are about one tree; the rest cover a whole zone
+            pick = rng.integers(0, max(len(tree_ids), 1), size)
+            on_tree = (rng.random(size) < 0.7) & (len(tree_ids) > 0)
+            zone_index = np.where(on_tree, tree_zones[pick] if len(tree_ids) else 0,
+                                  rng.choice(len(self.zones), size, p=self.zone_weights))
+            assignee = self.zone_workers(zone_index)
+            status = rng.choice(TASK_STATUSES, size, p=TASK_STATUS_WEIGHTS)
+            due = rng.integers(-60, 30, size)
+            task_type = rng.choice(TASK_TYPES, size)
+
+            tasks = []
+            for i in range(size):
+                zone = self.zones[zone_index[i]]
+                due_date = self.today + timedelta(days=int(due[i]))
+                completed = status[i] == 'completed'
+                supervisor = self.supervisor_ids[zone_index[i]] if zone_index[i] < len(self.supervisor_ids) \
+                    else self.admin_id
+                tasks.append(MaintenanceTask(
+                    title=f"{task_type[i].title()} trees in {zone.name}",
+                    task_type=task_type[i],
+                    priority=PRIORITIES[rng.integers(0, len(PRIORITIES))],
+                    zone_id=zone.id,
+                    tree_id=int(tree_ids[pick[i]]) if on_tree[i] else None,
+                    created_by_id=int(supervisor),
+                    assigned_to_id=int(assignee[i]) if assignee[i] >= 0 else None,
+                    due_date=due_date,
+                    status=status[i],
+                    completed_at=self.now - timedelta(days=int(rng.integers(0, 60))) if completed else None,
+                    completed_by_id=int(assignee[i]) if completed and assignee[i] >= 0 else None,
+                ))
+            MaintenanceTask.objects.bulk_create(tasks, batch_size=2000)
+            created += size
+        _log(self.stdout, f'  Created {created} maintenance tasks')
+        return created
+
+    def refresh_derived(self):
+        from apps.reports import snapshots
+        from apps.reports.cache import bump_version
+        from apps.zones import stats
+        from . import activity, clustering
+
+        zone_ids = [int(pk) for pk in self.zone_ids]
+        _log(self.stdout, '  Rebuilding clusters, zone stats, tree activity and health snapshots...')
+        clustering.rebuild(zone_ids)
+        stats.rebuild(zone_ids)
+        activity.rebuild(zone_ids)
+        snapshots.rebuild(start=self.today - timedelta(days=self.history_days), end=self.today)
+        bump_version()
+
+
+def generate(zones, users, trees, logs, tasks, seed=0, batch_size=50_000, history_days=HISTORY_DAYS,
+             stdout=None):
+    """Create a synthetic dataset of about these sizes; returns the counts created."""
+    return Generator(zones, users, trees, logs, tasks, seed=seed, batch_size=batch_size,
+                     history_days=history_days, stdout=stdout).run()
+
+
+def reset():
+    """
+    Delete everything generate() created. Rows are deleted with plain DELETE
+    statements: per-object delete signals would take hours at these sizes.
+    """
+    from apps.reports.cache import bump_version
+    from apps.reports.models import HealthSnapshot
+    from apps.tasks.models import MaintenanceTask
+    from apps.zones.models import Zone, ZoneStats
+    from .models import TreeCluster
+
+    zones = Zone.objects.filter(name__startswith=f'{PREFIX} ')
+    zone_ids = list(zones.values_list('id', flat=True))
+    if zone_ids:
+        with transaction.atomic():
+            for queryset in (
+                HealthLog.objects.filter(tree__zone__in=zone_ids),
+                MaintenanceTask.objects.filter(zone__in=zone_ids),
+                TreeCluster.objects.filter(zone__in=zone_ids),
+                ZoneStats.objects.filter(zone__in=zone_ids),
+                HealthSnapshot.objects.filter(zone__in=zone_ids),
+                Tree.objects.filter(zone__in=zone_ids),
+            ):
+                queryset._raw_delete(queryset.db)
+            get_user_model().objects.filter(username__startswith=f'{PREFIX}-').delete()
+            zones.delete()
+    else:
+        get_user_model().objects.filter(username__startswith=f'{PREFIX}-').delete()
+    bump_version()
+    return len(zone_ids)
@@ -1,68 +1,86 @@
+import logging
+
 from celery import shared_task
 from django.utils import timezone
-from datetime import timedelta
+
+logger = logging.getLogger(__name__)
 
 
 def send_health_check_reminders_resend(send_fn):
-    """Send inspection reminders using provided send function"""
-    from .models import Tree, HealthLog
+    """
+    Queue inspection reminders through the provided send function (see reports/cron.py).
+
+    Which trees are due, with their last inspection, is computed once for
+    every zone (see inspections.py); each supervisor then gets their own
+    zone's list, admins and supervisors without a zone get all zones.
+    """
+    from .inspections import needing_inspection
     from django.contrib.auth import get_user_model
     User = get_user_model()
 
-    cutoff = timezone.now() - timedelta(days=14)
-    today = timezone.now().date()
-
-    recently_logged_ids = HealthLog.objects.filter(
-        logged_at__gte=cutoff
-    ).values_list('tree_id', flat=True)
+    now = timezone.now()
+    due = needing_inspection(now, limit=20)
 
-    trees_needing = Tree.objects.exclude(
-        current_health='dead'
-    ).exclude(
-        id__in=recently_logged_ids
-    ).select_related('zone', 'species')
-
-    if not trees_needing.exists():
+    if not due.counts:
         return "All trees recently inspected"
 
     supervisors = User.objects.filter(
         role__in=['supervisor', 'admin']
     ).exclude(email='').exclude(email__isnull=True)
 
-    sent_count = 0
+    queued_count = 0
     for supervisor in supervisors:
-        zone_trees = trees_needing if supervisor.role == 'admin' else \
-            trees_needing.filter(zone__isnull=False)
+        if supervisor.role == 'supervisor' and supervisor.zone_id:
+            count, trees = due.for_zone(supervisor.zone_id)
+        else:
+            count, trees = due.for_all()
 
-        if not zone_trees.exists():
+        if not count:
             continue
 
-        tree_rows = ""
-        for t in zone_trees[:20]:
-            last_log = HealthLog.objects.filter(tree=t).order_by('-logged_at').first()
-            days_since = (timezone.now() - last_log.logged_at).days if last_log else 'Never'
-            health_color = {'healthy': '#16a34a', 'at_risk': '#d97706'}.get(t.current_health, '#6b7280')
+        html_body = inspection_reminder_html(
+            supervisor.get_full_name() or supervisor.username, count, trees, now
+        )
+
+        send_fn(
+            to_email=supervisor.email,
+            subject=f'[Tree Tracker] 🔍 {count} tree{"s" if count != 1 else ""} need inspection',
+            html_body=html_body,
+        )
+        queued_count += 1
+        logger.info('Queued inspection reminder for %s', supervisor.email)
+
+    return f"Queued {queued_count} inspection reminder emails"
+
 
-            tree_rows += f"""
+def inspection_reminder_html(name, count, trees, now):
+    """The reminder email for `count` trees needing inspection, listing the rows in `trees`."""
+    from .inspections import INSPECTION_INTERVAL
+    today = now.date()
+    tree_rows = ""
+    for t in trees:
+        days_since = f"{(now - t['last_inspected_at']).days} days" if t['last_inspected_at'] else 'Never'
+        health_color = {'healthy': '#16a34a', 'at_risk': '#d97706'}.get(t['current_health'], '#6b7280')
+        tree_rows += f"""
             <tr style="border-bottom:1px solid #f0f0f0;">
                 <td style="padding:10px 12px;font-size:13px;">
                     <span style="font-family:monospace;background:#f3f4f6;padding:2px 6px;border-radius:4px;font-size:11px;">
-                        {t.tag_number}
+                        {t['tag_number']}
                     </span>
                 </td>
-                <td style="padding:10px 12px;font-size:13px;">{t.species.common_name if t.species else 'Unknown'}</td>
-                <td style="padding:10px 12px;font-size:13px;">{t.zone.name if t.zone else 'N/A'}</td>
+                <td style="padding:10px 12px;font-size:13px;">{t['species_name'] or 'Unknown'}</td>
+                <td style="padding:10px 12px;font-size:13px;">{t['zone_name'] or 'N/A'}</td>
                 <td style="padding:10px 12px;">
                     <span style="color:{health_color};font-weight:600;font-size:13px;">
-                        {t.current_health.replace('_', ' ').title()}
+                        {t['current_health'].replace('_', ' ').title()}
                     </span>
                 </td>
                 <td style="padding:10px 12px;font-size:13px;color:#dc2626;font-weight:600;">
-                    {days_since} days
+                    {days_since}
                 </td>
             </tr>"""
 
-        html_body = f"""<!DOCTYPE html>
+    return f"""<!DOCTYPE html>
 <html>
 <body style="margin:0;padding:0;font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',sans-serif;background:#f9fafb;">
 <div style="max-width:640px;margin:32px auto;background:white;border-radius:12px;overflow:hidden;box-shadow:0 1px 3px rgba(0,0,0,0.1);">
@@ -72,15 +90,15 @@ def send_health_check_reminders_resend(send_fn):
     </div>
     <div style="background:#fffbeb;border-left:4px solid #d97706;padding:16px 32px;">
         <div style="font-weight:600;color:#d97706;font-size:15px;">
-            🔍 {zone_trees.count()} Tree{'s' if zone_trees.count() != 1 else ''} Need Inspection
+            🔍 {count} Tree{'s' if count != 1 else ''} Need Inspection
         </div>
         <div style="color:#6b7280;font-size:13px;margin-top:4px;">
-            These trees haven't been inspected in over 14 days.
+            These trees haven't been inspected in over {INSPECTION_INTERVAL.days} days.
         </div>
     </div>
     <div style="padding:24px 32px;">
         <p style="color:#374151;font-size:14px;margin:0 0 20px 0;">
-            Hello {supervisor.get_full_name() or supervisor.username},
+            Hello {name},
         </p>
         <table style="width:100%;border-collapse:collapse;">
             <thead>
@@ -111,32 +129,54 @@ def send_health_check_reminders_resend(send_fn):
 </body>
 </html>"""
 
-        try:
-            send_fn(
-                to_email=supervisor.email,
-                subject=f'[Tree Tracker] 🔍 {zone_trees.count()} tree{"s" if zone_trees.count() != 1 else ""} need inspection',
-                html_body=html_body,
-            )
-            sent_count += 1
-            print(f"Sent inspection reminder to {supervisor.email}")
-        except Exception as e:
-            print(f"Failed to send to {supervisor.email}: {e}")
 
-    return f"Sent {sent_count} inspection reminder emails"
+@shared_task
+def send_health_check_reminders():
+    """Today's run through the cron runner, shared with /api/cron/, so it goes out once a day"""
+    from apps.reports.cron import trigger
+    from apps.reports.tasks import run_cron_job
+
+    run, dispatch = trigger('inspection_reminders')
+    return run_cron_job(run.id) if dispatch else 'skipped'
 
 
 @shared_task
-def send_health_check_reminders():
-    """Celery version - kept for compatibility"""
-    from django.core.mail import EmailMultiAlternatives
-    from django.conf import settings
-
-    def django_send(to_email, subject, html_body):
-        msg = EmailMultiAlternatives(
-            subject=subject, body='Please enable HTML email.',
-            from_email=settings.DEFAULT_FROM_EMAIL, to=[to_email]
-        )
-        msg.attach_alternative(html_body, "text/html")
-        msg.send()
+def run_import_job(job_id):
+    import tempfile
+    from django.core.files import File
+    from .importer import import_trees
+    from .models import ImportJob
+
+    job = ImportJob.objects.select_related('created_by').get(pk=job_id)
+    if job.is_finished:
+        return job.status
+
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+
+    def progress(counts):
+        ImportJob.objects.filter(pk=job.pk).update(**counts)
+
+    with tempfile.TemporaryFile('w+', newline='', encoding='utf-8') as report:
+        try:
+            with job.source.open('rb') as fh:
+                counts = import_trees(
+                    fh, job.format, progress=progress, user=job.created_by, report=report,
+                    default_planted_date=job.default_planted_date, dry_run=job.dry_run,
+                )
+            for field, value in counts.items():
+                setattr(job, field, value)
+            job.status = 'completed'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+            job.refresh_from_db(fields=['rows', 'created', 'failed'])
+
+        if job.failed:
+            report.seek(0)
+            job.error_report.save(f'import-{job.id}-errors.csv', File(report), save=False)
 
-    return send_health_check_reminders_resend(django_send)
\ No newline at end of file
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'rows', 'created', 'failed', 'error_report', 'error', 'finished_at'])
+    return job.status
@@ -0,0 +1,83 @@
+import io
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.zones.models import Zone
+
+from .importer import import_trees
+from .models import Species, Tree, format_tag, reserve_tag_numbers
+
+
+class TreeListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('admin', password='admin', role='admin')
+        zone = Zone.objects.create(name='North', city='Pune', center_lat=18.52, center_lng=73.85)
+        species = Species.objects.create(common_name='Neem')
+        for i in range(2):
+            Tree.objects.create(zone=zone, species=species, latitude=18.52 + i / 1000, longitude=73.85,
+                                planted_date=date(2024, 1, 1))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_get_lists_trees(self):
+        response = self.client.get('/api/trees/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['results'][0]['zone_name'], 'North')
+
+    def test_head_matches_get_without_a_body(self):
+        get = self.client.get('/api/trees/')
+        response = self.client.head('/api/trees/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Type'], get['Content-Type'])
+        if get.has_header('Content-Length'):
+            self.assertEqual(response['Content-Length'], get['Content-Length'])
+
+
+class MapBBoxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('worker', password='worker')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_non_finite_bbox_is_rejected(self):
+        for bbox, zoom in [('nan,nan,nan,nan', 5), ('nan,0,1,1', None), ('-inf,0,inf,1', None)]:
+            with self.subTest(bbox=bbox, zoom=zoom):
+                query = {'bbox': bbox, **({'zoom': zoom} if zoom is not None else {})}
+                response = self.client.get('/api/trees/map/', query)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('finite', response.data['error'])
+
+
+class TagSequenceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.zone = Zone.objects.create(name='North', city='Pune', center_lat=18.52, center_lng=73.85)
+        cls.species = Species.objects.create(common_name='Neem')
+
+    def test_imported_generated_looking_tags_advance_the_sequence(self):
+        upcoming = [format_tag(n + 1) for n in reserve_tag_numbers(2)]
+        csv = 'tag_number,species,zone,latitude,longitude,planted_date\n' + ''.join(
+            f'{tag},Neem,North,18.52,73.85,2024-01-01\n' for tag in upcoming)
+        counts = import_trees(io.BytesIO(csv.encode()), 'csv')
+        self.assertEqual(counts['created'], 2)
+
+        tree = Tree.objects.create(zone=self.zone, species=self.species, latitude=18.52, longitude=73.85,
+                                   planted_date=date(2024, 1, 1))
+        self.assertNotIn(tree.tag_number, upcoming)
+
+    def test_saved_generated_looking_tag_advances_the_sequence(self):
+        tag = format_tag(reserve_tag_numbers(1)[0] + 1)
+        Tree.objects.create(tag_number=tag, zone=self.zone, species=self.species, latitude=18.52,
+                            longitude=73.85, planted_date=date(2024, 1, 1))
+        self.assertGreater(reserve_tag_numbers(1)[0], int(tag[4:]))
@@ -1,14 +1,18 @@
 from django.urls import path
 from .views import (
     TreeListCreateView, TreeDetailView, TreeHealthUpdateView,
-    SpeciesListCreateView, MapDataView, TreeBulkCreateView,
-    SatelliteDetectView
+    SpeciesListCreateView, MapDataView, NearbyTreesView, TreeBulkCreateView,
+    TreeImportView, TreeImportDetailView, TreeImportErrorsView,
 )
 
 urlpatterns = [
     path('trees/map/', MapDataView.as_view(), name='tree_map'),
+    path('trees/map/tiles/<int:z>/<int:x>/<int:y>/', MapDataView.as_view(), name='tree_map_tile'),
+    path('trees/nearby/', NearbyTreesView.as_view(), name='tree_nearby'),
     path('trees/bulk-create/', TreeBulkCreateView.as_view(), name='tree_bulk_create'),
-    path('trees/detect-satellite/', SatelliteDetectView.as_view(), name='tree_detect_satellite'),
+    path('trees/import/', TreeImportView.as_view(), name='tree_import'),
+    path('trees/import/<int:pk>/', TreeImportDetailView.as_view(), name='tree_import_detail'),
+    path('trees/import/<int:pk>/errors/', TreeImportErrorsView.as_view(), name='tree_import_errors'),
     path('trees/', TreeListCreateView.as_view(), name='tree_list'),
     path('trees/<int:pk>/', TreeDetailView.as_view(), name='tree_detail'),
     path('trees/<int:pk>/health/', TreeHealthUpdateView.as_view(), name='tree_health'),
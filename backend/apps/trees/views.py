@@ -1,13 +1,31 @@
+import hashlib
+import json
+import math
+
 from rest_framework import generics, permissions, filters, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework as django_filters
-from .models import Tree, HealthLog, Species
+from django import forms
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers, quote_etag
+from django.utils.http import http_date, parse_http_date_safe
+from apps.accounts.permissions import IsAdminOrSupervisor
+from apps.common.queries import display_name
+from . import clustering, geo
+from .models import Tree, HealthLog, Species, ImportJob
+from .renderers import ColumnarJSONRenderer, NDJSONRenderer, PointsBinaryRenderer
 from .serializers import (
     TreeListSerializer, TreeDetailSerializer, TreeCreateSerializer,
-    HealthUpdateSerializer, HealthLogSerializer, SpeciesSerializer
+    HealthUpdateSerializer, HealthLogSerializer, SpeciesSerializer, ImportJobSerializer
 )
 
 
@@ -17,17 +35,22 @@ class TreeFilter(django_filters.FilterSet):
     species = django_filters.NumberFilter(field_name='species')
     planted_after = django_filters.DateFilter(field_name='planted_date', lookup_expr='gte')
     planted_before = django_filters.DateFilter(field_name='planted_date', lookup_expr='lte')
+    # Not inspected since (never-inspected trees included)
+    inspected_before = django_filters.DateTimeFilter(method='filter_inspected_before')
+
+    def filter_inspected_before(self, queryset, name, value):
+        return queryset.not_inspected_since(value)
 
     class Meta:
         model = Tree
-        fields = ['health', 'zone', 'species', 'planted_after', 'planted_before']
+        fields = ['health', 'zone', 'species', 'planted_after', 'planted_before', 'inspected_before']
 
 
 class TreeListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     filterset_class = TreeFilter
     search_fields = ['tag_number', 'location_description', 'notes']
-    ordering_fields = ['planted_date', 'created_at', 'current_health']
+    ordering_fields = ['planted_date', 'created_at', 'current_health', 'last_inspected_at']
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -35,7 +58,17 @@ class TreeListCreateView(generics.ListCreateAPIView):
         return TreeListSerializer
 
     def get_queryset(self):
-        return Tree.objects.select_related('species', 'zone', 'planted_by').all()
+        if self.request.method == 'POST':
+            return Tree.objects.all()
+        return TreeListSerializer.rows(Tree.objects.all())
+
+
+def tree_detail_queryset():
+    # Log authors' names come with the logs instead of one user per log
+    logs = HealthLog.objects.annotate(logged_by_display=display_name('logged_by'))
+    return Tree.objects.select_related('species', 'zone', 'planted_by').prefetch_related(
+        Prefetch('health_logs', queryset=logs)
+    )
 
 
 class TreeDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -47,9 +80,7 @@ class TreeDetailView(generics.RetrieveUpdateDestroyAPIView):
         return TreeDetailSerializer
 
     def get_queryset(self):
-        return Tree.objects.select_related(
-            'species', 'zone', 'planted_by'
-        ).prefetch_related('health_logs__logged_by').all()
+        return tree_detail_queryset()
 
 
 class TreeHealthUpdateView(APIView):
@@ -59,8 +90,8 @@ class TreeHealthUpdateView(APIView):
         tree = Tree.objects.get(pk=pk)
         serializer = HealthUpdateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            updated_tree = serializer.update_tree_health(tree, serializer.validated_data)
-            return Response(TreeDetailSerializer(updated_tree).data)
+            serializer.update_tree_health(tree, serializer.validated_data)
+            return Response(TreeDetailSerializer(tree_detail_queryset().get(pk=pk)).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -71,26 +102,140 @@ class SpeciesListCreateView(generics.ListCreateAPIView):
 
 
 class MapDataView(APIView):
-    """Returns lightweight tree data optimized for map rendering"""
+    """
+    Returns lightweight tree data optimized for map rendering.
+    GET /api/trees/map/?bbox=min_lng,min_lat,max_lng,max_lat  — trees in the viewport
+    GET /api/trees/map/tiles/<z>/<x>/<y>/                     — trees in one XYZ tile
+    Without bbox or tile the whole (filtered) city is returned.
+    When a zoom below settings.MAP_CLUSTER_ZOOM is given (tile z, or ?zoom= with
+    bbox) the response holds grid clusters {cluster, latitude, longitude, count,
+    healthy, at_risk, dead} instead of individual trees. ?inspected_before= keeps
+    trees not inspected since then; clusters don't know that, so it always
+    returns individual trees.
+    Responses carry ETag/Last-Modified so unchanged viewports come back as 304.
+    Compact columnar/binary encodings are negotiated via Accept, see renderers.py.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [
+        ColumnarJSONRenderer, PointsBinaryRenderer,
+    ]
 
-    def get(self, request):
-        queryset = Tree.objects.select_related('species', 'zone').all()
+    MAP_FIELDS = (
+        'id', 'latitude', 'longitude', 'current_health',
+        'tag_number', 'species__common_name', 'zone__name',
+        'planted_date', 'photo',
+    )
 
-        # Apply filters
+    def get(self, request, z=None, x=None, y=None):
         zone = request.query_params.get('zone')
         health = request.query_params.get('health')
-        if zone:
-            queryset = queryset.filter(zone=zone)
-        if health:
-            queryset = queryset.filter(current_health=health)
 
-        data = queryset.values(
-            'id', 'latitude', 'longitude', 'current_health',
-            'tag_number', 'species__common_name', 'zone__name',
-            'planted_date', 'photo'
-        )
-        return Response(list(data))
+        try:
+            if z is not None:
+                bbox = geo.tile_bbox(z, x, y)
+                zoom = z
+            elif request.query_params.get('bbox'):
+                bbox = geo.parse_bbox(request.query_params['bbox'])
+                zoom = request.query_params.get('zoom')
+                zoom = int(zoom) if zoom not in (None, '') else None
+            else:
+                bbox = zoom = None
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        try:
+            inspected_before = forms.DateTimeField(required=False).clean(
+                request.query_params.get('inspected_before'))
+        except forms.ValidationError:
+            return Response({'error': 'inspected_before must be a date or a date and time'}, status=400)
+
+        clustered = (bbox is not None and zoom is not None and zoom < clustering.cluster_zoom()
+                     and inspected_before is None)
+        if clustered:
+            queryset = clustering.clusters_in_bbox(bbox, max(zoom, 0), zone=zone)
+        else:
+            queryset = Tree.objects.all()
+            if zone:
+                queryset = queryset.filter(zone=zone)
+            if health:
+                queryset = queryset.filter(current_health=health)
+            if inspected_before:
+                queryset = queryset.not_inspected_since(inspected_before)
+            if bbox:
+                queryset = queryset.in_bbox(bbox)
+
+        # Cheap fingerprint of the result set: any insert, edit or move changes
+        # max(updated_at), any removal changes the count.
+        stamp = queryset.aggregate(last_modified=Max('updated_at'), count=Count('id'))
+        last_modified = stamp['last_modified']
+        etag = quote_etag(hashlib.md5(
+            f"{request.get_full_path()}|{request.accepted_media_type}|"
+            f"{stamp['count']}|{last_modified}".encode()
+        ).hexdigest())
+
+        if self._not_modified(request, etag, last_modified):
+            response = Response(status=304)
+        else:
+            data = (clustering.summarise(queryset, health) if clustered
+                    else list(queryset.values(*self.MAP_FIELDS)))
+            response = Response(data)
+
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    @staticmethod
+    def _not_modified(request, etag, last_modified):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            return etag in (tag.strip() for tag in if_none_match.split(','))
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return bool(last_modified and if_modified_since and
+                    int(last_modified.timestamp()) <= if_modified_since)
+
+
+class NearbyTreesView(APIView):
+    """
+    Trees within a radius of a point, nearest first.
+    GET /api/trees/nearby/?lat=12.97&lng=77.59&radius=50&limit=20
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    MAX_RADIUS_M = 5000
+    MAX_LIMIT = 200
+
+    def get(self, request):
+        try:
+            lat = float(request.query_params['lat'])
+            lng = float(request.query_params['lng'])
+            radius = float(request.query_params.get('radius', 50))
+            limit = int(request.query_params.get('limit', 20))
+            if not all(math.isfinite(v) for v in (lat, lng, radius)) or abs(lat) > 90 or abs(lng) > 180:
+                raise ValueError
+        except (KeyError, ValueError):
+            return Response({'error': 'lat (-90..90) and lng (-180..180) are required; '
+                                      'radius and limit must be numbers'}, status=400)
+
+        radius = min(max(radius, 1), self.MAX_RADIUS_M)
+        limit = min(max(limit, 1), self.MAX_LIMIT)
+
+        trees = Tree.objects.select_related('species', 'zone').nearest(lat, lng, radius, limit)
+        return Response([
+            {
+                'id': t.id,
+                'tag_number': t.tag_number,
+                'latitude': t.latitude,
+                'longitude': t.longitude,
+                'current_health': t.current_health,
+                'species__common_name': t.species.common_name if t.species else None,
+                'zone__name': t.zone.name,
+                'distance_m': round(t.distance_m, 1),
+            }
+            for t in trees
+        ])
 
 
 class TreeBulkCreateView(APIView):
@@ -98,174 +243,123 @@ class TreeBulkCreateView(APIView):
     Bulk create trees from satellite detection results.
     POST /api/trees/bulk-create/
     Body: { trees: [{latitude, longitude, confidence}, ...], source: "satellite_detection" }
-    Auto-assigns zone based on closest zone center.
-    Auto-generates tag numbers.
+    Auto-assigns zones via ZoneLocator and tag numbers from the tag sequence,
+    inserting the whole batch in one transaction (see ingest.py).
+    With Accept: application/x-ndjson the reply streams one result line per
+    input row followed by a {"summary": ...} line.
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
 
     def post(self, request):
-        from apps.zones.models import Zone
-        import math
+        from apps.zones.locator import ZoneLocator
+        from .ingest import ingest_detections
 
         trees_data = request.data.get('trees', [])
         source_note = request.data.get('source', 'satellite_detection')
+        max_trees = settings.TREE_BULK_CREATE_MAX
 
-        if not trees_data:
+        if not trees_data or not isinstance(trees_data, list):
             return Response({'error': 'No trees provided'}, status=400)
 
-        if len(trees_data) > 200:
-            return Response({'error': 'Max 200 trees per batch'}, status=400)
+        if len(trees_data) > max_trees:
+            return Response({'error': f'Max {max_trees} trees per batch'}, status=400)
 
-        zones = list(Zone.objects.all())
-        if not zones:
+        locator = ZoneLocator.load()
+        if not locator:
             return Response({'error': 'No zones configured'}, status=400)
 
-        def closest_zone(lat, lng):
-            """Find nearest zone by Euclidean distance to center"""
-            return min(zones, key=lambda z: math.sqrt(
-                (z.center_lat - lat) ** 2 + (z.center_lng - lng) ** 2
-            ))
-
-        created = []
-        skipped = 0
-
-        for t in trees_data:
-            lat = t.get('latitude')
-            lng = t.get('longitude')
-            confidence = t.get('confidence', 0)
-
-            if lat is None or lng is None:
-                skipped += 1
-                continue
-
-            # Skip very low confidence detections
-            if confidence < 0.3:
-                skipped += 1
-                continue
-
-            zone = closest_zone(lat, lng)
-
-            tree = Tree.objects.create(
-                latitude=round(lat, 6),
-                longitude=round(lng, 6),
-                zone=zone,
-                planted_by=request.user,
-                current_health='at_risk',  # Will be properly assessed after field inspection
-                notes=f"Auto-detected via satellite imagery. Confidence: {round(confidence * 100)}%. Source: {source_note}",
-            )
-            created.append({
-                'id': tree.id,
-                'tag_number': tree.tag_number,
-                'latitude': tree.latitude,
-                'longitude': tree.longitude,
-                'zone': zone.name,
-            })
-
-        return Response({
+        results = ingest_detections(trees_data, request.user, locator, source=source_note)
+        created = [r for r in results if r['status'] == 'created']
+        summary = {
             'success': True,
             'created': len(created),
-            'skipped': skipped,
-            'trees': created,
-        }, status=201)
+            'skipped': len(results) - len(created),
+        }
 
+        if request.accepted_renderer.format == 'ndjson':
+            def lines():
+                for row in results:
+                    yield json.dumps(row).encode() + b'\n'
+                yield json.dumps({'summary': summary}).encode() + b'\n'
+            return StreamingHttpResponse(lines(), status=201, content_type='application/x-ndjson')
 
-class SatelliteDetectionProxyView(APIView):
-    """
-    Proxy endpoint for Hugging Face tree detection.
-    Receives base64 image from frontend, forwards to HF API server-side
-    (avoids CORS block on direct browser→HF calls).
-    POST /api/trees/detect-satellite/
-    Body: { image_base64: "...", mime_type: "image/jpeg" }
-    """
-    permission_classes = [IsAuthenticated]
-
-    def post(self, request):
-        import urllib.request
-        import urllib.error
-        import base64
-        import os
-        import json
-
-        image_b64 = request.data.get('image_base64')
-        mime_type = request.data.get('mime_type', 'image/jpeg')
-
-        if not image_b64:
-            return Response({'error': 'image_base64 required'}, status=400)
-
-        try:
-            image_bytes = base64.b64decode(image_b64)
-        except Exception:
-            return Response({'error': 'Invalid base64 image'}, status=400)
-
-        hf_token = os.environ.get('HF_TOKEN', '')
-        url = 'https://api-inference.huggingface.co/models/facebook/detr-resnet-50'
-
-        headers = {'Content-Type': mime_type}
-        if hf_token:
-            headers['Authorization'] = f'Bearer {hf_token}'
-
-        try:
-            req = urllib.request.Request(url, data=image_bytes, headers=headers, method='POST')
-            with urllib.request.urlopen(req, timeout=60) as resp:
-                result = json.loads(resp.read().decode())
-            return Response(result)
-
-        except urllib.error.HTTPError as e:
-            body = e.read().decode()
-            # Model loading (cold start) — tell frontend to retry
-            if e.code == 503:
-                return Response({'error': 'model_loading', 'message': 'Model is warming up, retry in 10s'}, status=503)
-            return Response({'error': f'HF API error {e.code}: {body}'}, status=502)
-
-        except Exception as e:
-            return Response({'error': str(e)}, status=500)
+        for row in created:
+            del row['index'], row['status']
+        return Response({**summary, 'trees': created}, status=201)
 
 
-class SatelliteDetectView(APIView):
+class TreeImportView(APIView):
     """
-    Backend proxy for Hugging Face tree detection.
-    Avoids CORS — browser can't call HF directly.
-    POST /api/trees/detect-satellite/
-    Body: { image_base64: "...", mime_type: "image/jpeg" }
+    Bulk import trees from a CSV or GeoJSON file in a Celery job.
+    POST /api/trees/import/  (multipart/form-data)
+    Fields: file, format ("csv"|"geojson", default from the file name),
+            planted_date (YYYY-MM-DD for rows without one), dry_run
+    The upload is streamed to disk and rejected with 413 past
+    TREE_IMPORT_MAX_BYTES. Returns 202 with the job; poll
+    GET /api/trees/import/<id>/. Rejected rows are listed at errors_url.
     """
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAdminOrSupervisor]
+    parser_classes = [MultiPartParser]
 
     def post(self, request):
-        import urllib.request
-        import base64
-        import json
-        import os
-
-        image_base64 = request.data.get('image_base64')
-        mime_type = request.data.get('mime_type', 'image/jpeg')
-
-        if not image_base64:
-            return Response({'error': 'image_base64 required'}, status=400)
+        from datetime import date
+        from apps.detection.uploads import LimitedTemporaryFileUploadHandler, PayloadTooLarge
+        from .importer import FORMATS, guess_format
+        from .tasks import run_import_job
 
+        max_bytes = settings.TREE_IMPORT_MAX_BYTES
         try:
-            image_bytes = base64.b64decode(image_base64)
-        except Exception:
-            return Response({'error': 'Invalid base64 image'}, status=400)
-
-        hf_token = os.environ.get('HF_TOKEN', '')
-        headers = {'Content-Type': mime_type}
-        if hf_token:
-            headers['Authorization'] = f'Bearer {hf_token}'
-
-        url = 'https://api-inference.huggingface.co/models/facebook/detr-resnet-50'
-
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length > max_bytes:
+            raise PayloadTooLarge()
+        request._request.upload_handlers = [
+            LimitedTemporaryFileUploadHandler(request._request, max_bytes)
+        ]
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file required'}, status=400)
         try:
-            req = urllib.request.Request(url, data=image_bytes, headers=headers, method='POST')
-            with urllib.request.urlopen(req, timeout=60) as resp:
-                result = json.loads(resp.read().decode())
-                return Response(result)
-
-        except urllib.error.HTTPError as e:
-            body = e.read().decode()
-            # Model loading — tell frontend to retry
-            if e.code == 503:
-                return Response({'error': 'model_loading', 'message': 'Model warming up, retry in 15s'}, status=503)
-            return Response({'error': f'HF API error {e.code}: {body}'}, status=502)
-
-        except Exception as e:
-            return Response({'error': str(e)}, status=500)
+            fmt = request.data.get('format') or guess_format(upload.name)
+            if fmt not in FORMATS:
+                return Response({'error': f"format must be one of: {', '.join(FORMATS)}"}, status=400)
+            try:
+                planted_date = request.data.get('planted_date')
+                planted_date = date.fromisoformat(planted_date) if planted_date else None
+            except ValueError:
+                return Response({'error': 'planted_date must be YYYY-MM-DD'}, status=400)
+
+            job = ImportJob(
+                created_by=request.user,
+                format=fmt,
+                default_planted_date=planted_date,
+                dry_run=str(request.data.get('dry_run', '')).lower() in ('1', 'true'),
+            )
+            job.source.save(f'import.{fmt}', upload, save=False)
+            job.save()
+        finally:
+            upload.close()
+        transaction.on_commit(lambda: run_import_job.delay(job.id))
+        return Response(ImportJobSerializer(job, context={'request': request}).data,
+                        status=status.HTTP_202_ACCEPTED)
+
+
+class TreeImportDetailView(generics.RetrieveAPIView):
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAdminOrSupervisor]
+
+
+class TreeImportErrorsView(APIView):
+    """Download the rejected-rows CSV of an import job."""
+    permission_classes = [IsAdminOrSupervisor]
+
+    def get(self, request, pk):
+        job = get_object_or_404(ImportJob, pk=pk)
+        if not job.error_report:
+            return Response({'error': 'No rejected rows'}, status=404)
+        return FileResponse(job.error_report.open('rb'), as_attachment=True, content_type='text/csv',
+                            filename=f'import-{job.id}-errors.csv')
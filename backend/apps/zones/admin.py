@@ -6,3 +6,4 @@ from .models import Zone
 class ZoneAdmin(admin.ModelAdmin):
     list_display = ['name', 'city', 'tree_count', 'survival_rate', 'area_sq_km']
     search_fields = ['name', 'city']
+    list_select_related = ['stats']
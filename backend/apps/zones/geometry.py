@@ -0,0 +1,129 @@
+"""
+Zone boundary geometry: GeoJSON parsing, a bounding-box R-tree and a
+vectorised point-in-polygon test.
+Coordinates follow GeoJSON order, i.e. x = longitude, y = latitude.
+"""
+import numpy as np
+
+
+def polygons_from_geojson(geometry):
+    """
+    Normalise a GeoJSON Polygon / MultiPolygon (or a Feature wrapping one) into
+    a list of polygons, each a list of rings as float arrays of shape (n, 2).
+    The first ring of a polygon is its exterior, the rest are holes.
+    Raises ValueError for anything else.
+    """
+    if not isinstance(geometry, dict):
+        raise ValueError('Boundary must be a GeoJSON object')
+    if geometry.get('type') == 'Feature':
+        geometry = geometry.get('geometry') or {}
+
+    kind = geometry.get('type')
+    coordinates = geometry.get('coordinates')
+    if kind == 'Polygon':
+        raw_polygons = [coordinates]
+    elif kind == 'MultiPolygon':
+        raw_polygons = coordinates
+    else:
+        raise ValueError('Boundary must be a Polygon or MultiPolygon')
+
+    polygons = []
+    try:
+        for raw_polygon in raw_polygons:
+            rings = [np.asarray(ring, dtype=float)[:, :2] for ring in raw_polygon]
+            if not rings or any(len(ring) < 4 for ring in rings):
+                raise ValueError('Every ring needs at least four positions')
+            polygons.append(rings)
+    except (TypeError, IndexError):
+        raise ValueError('Malformed polygon coordinates')
+    if not polygons:
+        raise ValueError('Boundary has no polygons')
+    for rings in polygons:
+        for ring in rings:
+            if not (np.all(np.abs(ring[:, 0]) <= 180) and np.all(np.abs(ring[:, 1]) <= 90)):
+                raise ValueError('Coordinates must be [longitude, latitude]')
+    return polygons
+
+
+def polygons_bbox(polygons):
+    """(min_x, min_y, max_x, max_y) over the exterior rings."""
+    exteriors = np.concatenate([rings[0] for rings in polygons])
+    return (*exteriors.min(axis=0), *exteriors.max(axis=0))
+
+
+def points_in_polygons(xs, ys, polygons, max_cells=2_000_000):
+    """
+    Even-odd ray cast of many points against one (multi)polygon.
+    Edges and points are broadcast against each other, in point chunks of at
+    most max_cells edge×point pairs to bound memory.
+    """
+    edges = []
+    for rings in polygons:
+        for ring in rings:
+            edges.append(np.column_stack([ring, np.roll(ring, -1, axis=0)]))
+    edges = np.concatenate(edges)
+    ax, ay, bx, by = (edges[:, i:i + 1] for i in range(4))
+    # Horizontal edges never cross a horizontal ray; avoid dividing by zero
+    dy = np.where(by == ay, np.inf, by - ay)
+
+    inside = np.zeros(len(xs), dtype=bool)
+    step = max(1, max_cells // len(edges))
+    for start in range(0, len(xs), step):
+        px = xs[start:start + step][None, :]
+        py = ys[start:start + step][None, :]
+        straddles = (ay > py) != (by > py)
+        x_cross = ax + (bx - ax) * (py - ay) / dy
+        crossings = np.count_nonzero(straddles & (px < x_cross), axis=0)
+        inside[start:start + step] = crossings % 2 == 1
+    return inside
+
+
+class BBoxRTree:
+    """
+    Static R-tree over bounding boxes, bulk-loaded with Sort-Tile-Recursive.
+    Items are (bbox, payload); query(bbox) yields payloads whose boxes intersect.
+    """
+
+    def __init__(self, items, node_size=16):
+        self.node_size = node_size
+        level = [(tuple(bbox), payload, None) for bbox, payload in items]
+        while len(level) > node_size:
+            level = self._pack(level)
+        self.root = (self._union([n[0] for n in level]), None, level) if level else None
+
+    def _pack(self, nodes):
+        count = len(nodes)
+        leaves = -(-count // self.node_size)
+        slices = max(1, int(np.ceil(np.sqrt(leaves))))
+        per_slice = -(-count // slices)
+
+        nodes = sorted(nodes, key=lambda n: n[0][0] + n[0][2])
+        packed = []
+        for s in range(0, count, per_slice):
+            column = sorted(nodes[s:s + per_slice], key=lambda n: n[0][1] + n[0][3])
+            for g in range(0, len(column), self.node_size):
+                children = column[g:g + self.node_size]
+                packed.append((self._union([c[0] for c in children]), None, children))
+        return packed
+
+    @staticmethod
+    def _union(boxes):
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    @staticmethod
+    def _intersects(a, b):
+        return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+    def query(self, bbox):
+        if self.root is None:
+            return
+        stack = [self.root]
+        while stack:
+            box, payload, children = stack.pop()
+            if not self._intersects(box, bbox):
+                continue
+            if children is None:
+                yield payload
+            else:
+                stack.extend(children)
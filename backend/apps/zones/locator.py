@@ -0,0 +1,86 @@
+"""
+Point → zone assignment.
+
+Zones with a boundary polygon own the points inside it. Candidate polygons are
+found through a bounding-box R-tree and tested with a vectorised ray cast, so a
+batch of thousands of points costs a handful of NumPy operations per zone.
+Points outside every boundary (or when zones have no boundary) fall back to the
+zone whose centre is nearest by great-circle distance.
+"""
+import numpy as np
+
+from .geometry import BBoxRTree, points_in_polygons, polygons_bbox, polygons_from_geojson
+from .models import Zone
+
+
+class ZoneLocator:
+    def __init__(self, zones):
+        self.zones = list(zones)
+        self._polygons = {}
+        entries = []
+        for index, zone in enumerate(self.zones):
+            if not zone.boundary:
+                continue
+            try:
+                polygons = polygons_from_geojson(zone.boundary)
+            except ValueError:
+                continue
+            self._polygons[index] = polygons
+            entries.append((polygons_bbox(polygons), index))
+        self._rtree = BBoxRTree(entries)
+
+        self._center_lat = np.radians([z.center_lat for z in self.zones])
+        self._center_lng = np.radians([z.center_lng for z in self.zones])
+
+    @classmethod
+    def load(cls):
+        return cls(Zone.objects.all())
+
+    def __bool__(self):
+        return bool(self.zones)
+
+    def locate(self, lat, lng):
+        """Zone for a point, or None when no zones are configured."""
+        return self.locate_many([lat], [lng])[0]
+
+    def locate_many(self, lats, lngs):
+        """Zones for parallel sequences of latitudes and longitudes."""
+        if not self.zones:
+            return [None] * len(lats)
+        return [self.zones[i] for i in self.locate_indexes(lats, lngs)]
+
+    def locate_indexes(self, lats, lngs):
+        """Like locate_many() but returns indexes into self.zones as an int array."""
+        ys = np.asarray(lats, dtype=float)
+        xs = np.asarray(lngs, dtype=float)
+        result = np.full(len(xs), -1, dtype=np.int64)
+        if not len(xs):
+            return result
+
+        batch_bbox = (xs.min(), ys.min(), xs.max(), ys.max())
+        for index in sorted(self._rtree.query(batch_bbox)):
+            min_x, min_y, max_x, max_y = polygons_bbox(self._polygons[index])
+            candidates = np.flatnonzero(
+                (result == -1) & (xs >= min_x) & (xs <= max_x) & (ys >= min_y) & (ys <= max_y)
+            )
+            if not len(candidates):
+                continue
+            inside = points_in_polygons(xs[candidates], ys[candidates], self._polygons[index])
+            result[candidates[inside]] = index
+
+        unassigned = np.flatnonzero(result == -1)
+        if len(unassigned):
+            result[unassigned] = self._nearest_centres(ys[unassigned], xs[unassigned])
+        return result
+
+    def _nearest_centres(self, lats, lngs, max_cells=2_000_000):
+        nearest = np.empty(len(lats), dtype=np.int64)
+        step = max(1, max_cells // len(self.zones))
+        for start in range(0, len(lats), step):
+            lat = np.radians(lats[start:start + step])[:, None]
+            lng = np.radians(lngs[start:start + step])[:, None]
+            # Haversine term; monotonic in distance so the arcsin can be skipped
+            a = (np.sin((self._center_lat - lat) / 2) ** 2 +
+                 np.cos(lat) * np.cos(self._center_lat) * np.sin((self._center_lng - lng) / 2) ** 2)
+            nearest[start:start + step] = np.argmin(a, axis=1)
+        return nearest
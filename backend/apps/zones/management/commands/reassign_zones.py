@@ -0,0 +1,71 @@
+"""
+Re-run zone assignment for every tree against the current zone boundaries.
+Run after drawing or editing zone polygons.
+Usage: python manage.py reassign_zones [--dry-run] [--batch-size 5000]
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = 'Reassign trees to zones using zone boundary polygons'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report how many trees would move without saving')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        from apps.reports.cache import bump_version
+        from apps.trees import clustering
+        from apps.trees.models import Tree
+        from apps.zones import stats
+        from apps.zones.locator import ZoneLocator
+
+        locator = ZoneLocator.load()
+        if not locator:
+            self.stdout.write(self.style.ERROR('No zones configured'))
+            return
+
+        zone_ids = [z.id for z in locator.zones]
+        batch_size = options['batch_size']
+        rows = Tree.objects.order_by('id').values_list('id', 'latitude', 'longitude', 'zone_id')
+
+        checked = 0
+        touched_zones = set()
+        moves = []
+        batch = []
+
+        def flush(batch):
+            ids, lats, lngs, current = zip(*batch)
+            for tree_id, old_zone, index in zip(ids, current, locator.locate_indexes(lats, lngs)):
+                new_zone = zone_ids[index]
+                if new_zone != old_zone:
+                    moves.append((tree_id, new_zone))
+                    touched_zones.update((old_zone, new_zone))
+
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush(batch)
+                checked += len(batch)
+                batch = []
+        if batch:
+            flush(batch)
+            checked += len(batch)
+
+        self.stdout.write(f'Checked {checked} trees, {len(moves)} change zone')
+        if options['dry_run'] or not moves:
+            return
+
+        with transaction.atomic():
+            for start in range(0, len(moves), batch_size):
+                Tree.objects.bulk_update(
+                    [Tree(id=tree_id, zone_id=zone_id) for tree_id, zone_id in moves[start:start + batch_size]],
+                    ['zone'],
+                )
+        # bulk_update bypasses the cluster and report-cache signals
+        clustering.rebuild(touched_zones)
+        stats.rebuild(touched_zones)
+        bump_version()
+        self.stdout.write(self.style.SUCCESS(f'Moved {len(moves)} trees'))
@@ -0,0 +1,20 @@
+"""
+Recompute the ZoneStats rollup from trees, tasks and health logs.
+Run after bulk edits that bypass signals, or to repair drift.
+Usage: python manage.py rebuild_zone_stats [--zone 3 --zone 5]
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-zone statistics for all zones (or the given zones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zone', type=int, action='append', dest='zones',
+                            help='Zone id to rebuild (repeatable)')
+
+    def handle(self, *args, **options):
+        from apps.zones import stats
+
+        rows = stats.rebuild(options['zones'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {rows} zones'))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zones', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zone',
+            name='boundary',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.9 on 2026-10-17 02:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zones', '0002_zone_boundary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZoneStats',
+            fields=[
+                ('zone', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='zones.zone')),
+                ('total_trees', models.IntegerField(default=0)),
+                ('healthy_trees', models.IntegerField(default=0)),
+                ('at_risk_trees', models.IntegerField(default=0)),
+                ('dead_trees', models.IntegerField(default=0)),
+                ('pending_tasks', models.IntegerField(default=0)),
+                ('overdue_tasks', models.IntegerField(default=0)),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True)),
+                ('overdue_refreshed_on', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'zone stats',
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+from django.db.models import Count, Q
+from django.utils import timezone
+
+HEALTH_FIELDS = {'healthy': 'healthy_trees', 'at_risk': 'at_risk_trees', 'dead': 'dead_trees'}
+
+
+def backfill_zone_stats(apps, schema_editor):
+    Zone = apps.get_model('zones', 'Zone')
+    ZoneStats = apps.get_model('zones', 'ZoneStats')
+    Tree = apps.get_model('trees', 'Tree')
+    MaintenanceTask = apps.get_model('tasks', 'MaintenanceTask')
+
+    today = timezone.localdate()
+    rows = {zid: ZoneStats(zone_id=zid, overdue_refreshed_on=today)
+            for zid in Zone.objects.values_list('id', flat=True)}
+
+    for r in Tree.objects.values('zone_id').annotate(
+        total=Count('id'),
+        **{field: Count('id', filter=Q(current_health=health)) for health, field in HEALTH_FIELDS.items()},
+    ):
+        row = rows[r['zone_id']]
+        row.total_trees = r['total']
+        for field in HEALTH_FIELDS.values():
+            setattr(row, field, r[field])
+
+    for r in MaintenanceTask.objects.values('zone_id').annotate(
+        pending=Count('id', filter=Q(status='pending')),
+        overdue=Count('id', filter=Q(status='pending', due_date__lt=today)),
+    ):
+        rows[r['zone_id']].pending_tasks = r['pending']
+        rows[r['zone_id']].overdue_tasks = r['overdue']
+
+    ZoneStats.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zones', '0003_zonestats'),
+        ('trees', '0006_tag_number_sequence'),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_zone_stats, migrations.RunPython.noop),
+    ]
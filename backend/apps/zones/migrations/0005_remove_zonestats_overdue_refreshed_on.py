@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-17 03:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zones', '0004_backfill_zone_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='zonestats',
+            name='overdue_refreshed_on',
+        ),
+    ]
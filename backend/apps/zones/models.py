@@ -5,11 +5,12 @@ class Zone(models.Model):
     name = models.CharField(max_length=100)
     city = models.CharField(max_length=100)
     description = models.TextField(blank=True)
-    # Store as JSON: {"lat": 12.97, "lng": 77.59, "radius_km": 5}
-    # For production with PostGIS: use gis_models.PolygonField()
     center_lat = models.FloatField(default=0)
     center_lng = models.FloatField(default=0)
     area_sq_km = models.FloatField(default=0, help_text="Area in square kilometers")
+    # GeoJSON Polygon or MultiPolygon geometry ([lng, lat] positions).
+    # Zones without a boundary are assigned points by nearest centre, see locator.py
+    boundary = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -19,18 +20,53 @@ class Zone(models.Model):
     def __str__(self):
         return f"{self.name}, {self.city}"
 
+    # Counts come from the ZoneStats rollup; select_related('stats') to avoid a query per zone
+
+    @property
+    def rollup(self):
+        try:
+            return self.stats
+        except ZoneStats.DoesNotExist:
+            return ZoneStats(zone=self)
+
     @property
     def tree_count(self):
-        return self.trees.count()
+        return self.rollup.total_trees
 
     @property
     def healthy_count(self):
-        return self.trees.filter(current_health='healthy').count()
+        return self.rollup.healthy_trees
+
+    @property
+    def survival_rate(self):
+        return self.rollup.survival_rate
+
+
+class ZoneStats(models.Model):
+    """
+    Per-zone counters kept in step with Tree, HealthLog and MaintenanceTask
+    writes inside the writing transaction (see stats.py). overdue_tasks
+    depends on the date, so it is also recomputed nightly.
+    """
+    zone = models.OneToOneField(Zone, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_trees = models.IntegerField(default=0)
+    healthy_trees = models.IntegerField(default=0)
+    at_risk_trees = models.IntegerField(default=0)
+    dead_trees = models.IntegerField(default=0)
+    pending_tasks = models.IntegerField(default=0)
+    overdue_tasks = models.IntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'zone stats'
+
+    def __str__(self):
+        return f"Stats for zone #{self.zone_id}"
 
     @property
     def survival_rate(self):
-        total = self.tree_count
-        if total == 0:
+        if self.total_trees == 0:
             return 0
-        alive = self.trees.exclude(current_health='dead').count()
-        return round((alive / total) * 100, 1)
+        alive = self.total_trees - self.dead_trees
+        return round((alive / self.total_trees) * 100, 1)
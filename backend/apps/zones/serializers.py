@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from .models import Zone
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from apps.common.serializers import RowSerializer
+from .geometry import polygons_from_geojson
+from .models import Zone, ZoneStats
 
 
 class ZoneSerializer(serializers.ModelSerializer):
@@ -10,44 +14,64 @@ class ZoneSerializer(serializers.ModelSerializer):
     class Meta:
         model = Zone
         fields = ['id', 'name', 'city', 'description', 'center_lat', 'center_lng',
-                  'area_sq_km', 'tree_count', 'healthy_count', 'survival_rate',
+                  'area_sq_km', 'boundary', 'tree_count', 'healthy_count', 'survival_rate',
                   'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    def validate_boundary(self, value):
+        if value is None:
+            return value
+        try:
+            polygons_from_geojson(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        if value.get('type') == 'Feature':
+            value = value['geometry']
+        return value
+
+
+class ZoneListSerializer(RowSerializer):
+    """ZoneSerializer's output from ZoneListSerializer.rows(queryset), counts joined from ZoneStats."""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    city = serializers.CharField()
+    description = serializers.CharField()
+    center_lat = serializers.FloatField()
+    center_lng = serializers.FloatField()
+    area_sq_km = serializers.FloatField()
+    boundary = serializers.JSONField()
+    tree_count = serializers.IntegerField()
+    healthy_count = serializers.IntegerField()
+    survival_rate = serializers.SerializerMethodField()
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+
+    @classmethod
+    def rows(cls, queryset):
+        return cls.values(
+            queryset, 'dead_count',
+            tree_count=Coalesce(F('stats__total_trees'), Value(0)),
+            healthy_count=Coalesce(F('stats__healthy_trees'), Value(0)),
+            dead_count=Coalesce(F('stats__dead_trees'), Value(0)),
+        )
+
+    def get_survival_rate(self, row):
+        return ZoneStats(total_trees=row['tree_count'], dead_trees=row['dead_count']).survival_rate
+
 
 class ZoneStatsSerializer(serializers.ModelSerializer):
-    total_trees = serializers.SerializerMethodField()
-    healthy_trees = serializers.SerializerMethodField()
-    at_risk_trees = serializers.SerializerMethodField()
-    dead_trees = serializers.SerializerMethodField()
+    """Reads the ZoneStats rollup; select_related('stats') on the queryset."""
+    total_trees = serializers.IntegerField(source='rollup.total_trees', read_only=True)
+    healthy_trees = serializers.IntegerField(source='rollup.healthy_trees', read_only=True)
+    at_risk_trees = serializers.IntegerField(source='rollup.at_risk_trees', read_only=True)
+    dead_trees = serializers.IntegerField(source='rollup.dead_trees', read_only=True)
     survival_rate = serializers.ReadOnlyField()
-    pending_tasks = serializers.SerializerMethodField()
-    overdue_tasks = serializers.SerializerMethodField()
+    pending_tasks = serializers.IntegerField(source='rollup.pending_tasks', read_only=True)
+    overdue_tasks = serializers.IntegerField(source='rollup.overdue_tasks', read_only=True)
+    last_activity_at = serializers.DateTimeField(source='rollup.last_activity_at', read_only=True)
 
     class Meta:
         model = Zone
         fields = ['id', 'name', 'city', 'total_trees', 'healthy_trees',
                   'at_risk_trees', 'dead_trees', 'survival_rate',
-                  'pending_tasks', 'overdue_tasks']
-
-    def get_total_trees(self, obj):
-        return obj.trees.count()
-
-    def get_healthy_trees(self, obj):
-        return obj.trees.filter(current_health='healthy').count()
-
-    def get_at_risk_trees(self, obj):
-        return obj.trees.filter(current_health='at_risk').count()
-
-    def get_dead_trees(self, obj):
-        return obj.trees.filter(current_health='dead').count()
-
-    def get_pending_tasks(self, obj):
-        return obj.maintenance_tasks.filter(status='pending').count()
-
-    def get_overdue_tasks(self, obj):
-        from django.utils import timezone
-        return obj.maintenance_tasks.filter(
-            status='pending',
-            due_date__lt=timezone.now().date()
-        ).count()
+                  'pending_tasks', 'overdue_tasks', 'last_activity_at']
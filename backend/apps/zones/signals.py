@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Zone, ZoneStats
+
+
+@receiver(post_save, sender=Zone)
+def create_zone_stats(sender, instance, created, **kwargs):
+    if created:
+        ZoneStats.objects.get_or_create(zone=instance)
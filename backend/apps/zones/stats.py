@@ -0,0 +1,149 @@
+"""
+Maintenance of the ZoneStats rollup.
+
+Signal handlers collect deltas per zone and apply them with F() updates in
+the same transaction as the write, so the counters commit or roll back
+with the data:
+
+    deltas = stats.new_deltas()
+    stats.add_tree(deltas, zone_id, 'healthy')               # +1 tree
+    stats.add_tree(deltas, old_zone_id, 'dead', sign=-1)      # -1 tree
+    stats.add_task(deltas, zone_id, 'pending', due_date)
+    stats.touch(deltas, zone_id)                              # activity only
+    stats.apply_deltas(deltas)
+
+rebuild() recomputes rows from scratch (rebuild_zone_stats command, bulk
+paths that bypass signals) and refresh_overdue() rolls the overdue counts
+over to a new day.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+HEALTH_FIELDS = {
+    'healthy': 'healthy_trees',
+    'at_risk': 'at_risk_trees',
+    'dead': 'dead_trees',
+}
+
+
+def new_deltas():
+    return defaultdict(Counter)
+
+
+def add_tree(deltas, zone_id, health, sign=1):
+    if zone_id is None:
+        return
+    counts = deltas[zone_id]
+    counts['total_trees'] += sign
+    field = HEALTH_FIELDS.get(health)
+    if field:
+        counts[field] += sign
+
+
+def add_task(deltas, zone_id, status, due_date, sign=1, today=None):
+    if zone_id is None:
+        return
+    # Touched zones get last_activity_at bumped even when no counter moves
+    counts = deltas.setdefault(zone_id, Counter())
+    if status != 'pending':
+        return
+    today = today or timezone.localdate()
+    counts['pending_tasks'] += sign
+    if due_date is not None and due_date < today:
+        counts['overdue_tasks'] += sign
+
+
+def touch(deltas, zone_id):
+    if zone_id is not None:
+        deltas.setdefault(zone_id, Counter())
+
+
+def apply_deltas(deltas, activity_at=None):
+    """Apply counter deltas (and bump last_activity_at) for every touched zone."""
+    from .models import ZoneStats
+
+    activity_at = activity_at or timezone.now()
+    for zone_id, counts in deltas.items():
+        if zone_id is None:
+            continue
+        changes = {field: F(field) + value for field, value in counts.items() if value}
+        changes['last_activity_at'] = activity_at
+        ZoneStats.objects.filter(zone_id=zone_id).update(**changes)
+
+
+def rebuild(zone_ids=None):
+    """Recompute ZoneStats rows for the given zones (all zones when None)."""
+    from apps.tasks.models import MaintenanceTask
+    from apps.trees.models import HealthLog, Tree
+    from .models import Zone, ZoneStats
+
+    today = timezone.localdate()
+    zones = Zone.objects.all()
+    if zone_ids is not None:
+        zones = zones.filter(id__in=zone_ids)
+    zone_ids = list(zones.values_list('id', flat=True))
+
+    rows = {zid: ZoneStats(zone_id=zid) for zid in zone_ids}
+
+    tree_counts = Tree.objects.filter(zone_id__in=zone_ids).values('zone_id').annotate(
+        total=Count('id'),
+        activity=Max('updated_at'),
+        **{field: Count('id', filter=Q(current_health=health)) for health, field in HEALTH_FIELDS.items()},
+    )
+    for r in tree_counts:
+        row = rows[r['zone_id']]
+        row.total_trees = r['total']
+        for field in HEALTH_FIELDS.values():
+            setattr(row, field, r[field])
+        row.last_activity_at = r['activity']
+
+    task_counts = MaintenanceTask.objects.filter(zone_id__in=zone_ids).values('zone_id').annotate(
+        pending=Count('id', filter=Q(status='pending')),
+        overdue=Count('id', filter=Q(status='pending', due_date__lt=today)),
+        activity=Max('updated_at'),
+    )
+    log_activity = HealthLog.objects.filter(tree__zone_id__in=zone_ids).values(
+        'tree__zone_id').annotate(activity=Max('logged_at'))
+
+    for r in task_counts:
+        row = rows[r['zone_id']]
+        row.pending_tasks = r['pending']
+        row.overdue_tasks = r['overdue']
+        row.last_activity_at = _latest(row.last_activity_at, r['activity'])
+    for r in log_activity:
+        row = rows[r['tree__zone_id']]
+        row.last_activity_at = _latest(row.last_activity_at, r['activity'])
+
+    with transaction.atomic():
+        ZoneStats.objects.filter(zone_id__in=zone_ids).delete()
+        ZoneStats.objects.bulk_create(rows.values())
+    return len(rows)
+
+
+def refresh_overdue(today=None):
+    """Recompute overdue_tasks for every zone in one grouped query."""
+    from apps.tasks.models import MaintenanceTask
+    from .models import ZoneStats
+
+    today = today or timezone.localdate()
+    overdue = dict(
+        MaintenanceTask.objects.filter(status='pending', due_date__lt=today)
+        .values('zone_id').annotate(n=Count('id')).values_list('zone_id', 'n')
+    )
+    with transaction.atomic():
+        rows = list(ZoneStats.objects.select_for_update())
+        for row in rows:
+            row.overdue_tasks = overdue.get(row.zone_id, 0)
+        ZoneStats.objects.bulk_update(rows, ['overdue_tasks'])
+    return len(rows)
+
+
+def _latest(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
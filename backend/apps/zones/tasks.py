@@ -0,0 +1,8 @@
+from celery import shared_task
+
+
+@shared_task
+def refresh_zone_overdue_counts():
+    """Nightly: tasks become overdue by the date changing, not by a write."""
+    from .stats import refresh_overdue
+    return f"Refreshed overdue counts for {refresh_overdue()} zones"
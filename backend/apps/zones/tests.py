@@ -0,0 +1,60 @@
+from datetime import date, datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.tasks.models import MaintenanceTask
+
+from . import stats
+from .models import Zone, ZoneStats
+
+
+class ZoneListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('admin', password='admin', role='admin')
+        Zone.objects.create(name='North', city='Pune')
+        Zone.objects.create(name='South', city='Pune')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_get_lists_zones(self):
+        response = self.client.get('/api/zones/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_head_matches_get_without_a_body(self):
+        get = self.client.get('/api/zones/')
+        response = self.client.head('/api/zones/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Type'], get['Content-Type'])
+        if get.has_header('Content-Length'):
+            self.assertEqual(response['Content-Length'], get['Content-Length'])
+
+
+class OverdueCountTests(TestCase):
+    # 01:30 on 2 January in Asia/Kolkata, still 1 January in UTC
+    AFTER_LOCAL_MIDNIGHT = datetime(2026, 1, 1, 20, 0, tzinfo=dt_timezone.utc)
+
+    def overdue(self, zone):
+        return ZoneStats.objects.get(zone=zone).overdue_tasks
+
+    def test_counts_use_the_local_date(self):
+        zone = Zone.objects.create(name='North', city='Pune')
+        with mock.patch('django.utils.timezone.now', return_value=self.AFTER_LOCAL_MIDNIGHT):
+            task = MaintenanceTask.objects.create(title='Water', task_type='water', zone=zone,
+                                                  due_date=date(2026, 1, 1))
+            self.assertEqual(self.overdue(zone), 1)
+            stats.refresh_overdue()
+            self.assertEqual(self.overdue(zone), 1)
+            stats.rebuild([zone.id])
+            self.assertEqual(self.overdue(zone), 1)
+
+            task.status = 'completed'
+            task.save()
+            self.assertEqual(self.overdue(zone), 0)
@@ -1,23 +1,31 @@
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from .models import Zone
-from .serializers import ZoneSerializer, ZoneStatsSerializer
+from .serializers import ZoneListSerializer, ZoneSerializer, ZoneStatsSerializer
 from apps.accounts.permissions import IsAdminOrSupervisor
 
 
 class ZoneListCreateView(generics.ListCreateAPIView):
-    queryset = Zone.objects.all()
-    serializer_class = ZoneSerializer
-
     def get_permissions(self):
         if self.request.method == 'POST':
             return [IsAdminOrSupervisor()]
         return [permissions.IsAuthenticated()]
 
+    def get_serializer_class(self):
+        if self.request.method == 'POST':
+            return ZoneSerializer
+        return ZoneListSerializer
+
+    def get_queryset(self):
+        if self.request.method == 'POST':
+            return Zone.objects.select_related('stats')
+        return ZoneListSerializer.rows(Zone.objects.all())
+
 
 class ZoneDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Zone.objects.all()
+    queryset = Zone.objects.select_related('stats')
     serializer_class = ZoneSerializer
 
     def get_permissions(self):
@@ -30,6 +38,6 @@ class ZoneStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, pk):
-        zone = Zone.objects.get(pk=pk)
+        zone = get_object_or_404(Zone.objects.select_related('stats'), pk=pk)
         serializer = ZoneStatsSerializer(zone)
         return Response(serializer.data)
@@ -17,4 +17,20 @@ app.conf.beat_schedule = {
         'task': 'apps.trees.tasks.send_health_check_reminders',
         'schedule': crontab(hour=9, minute=0),
     },
+    'nightly-zone-overdue-counts': {
+        'task': 'apps.zones.tasks.refresh_zone_overdue_counts',
+        'schedule': crontab(hour=0, minute=5),
+    },
+    'nightly-health-snapshot': {
+        'task': 'apps.reports.tasks.take_health_snapshot',
+        'schedule': crontab(hour=23, minute=55),
+    },
+    'deliver-email-outbox': {
+        'task': 'apps.notifications.tasks.deliver_outbox',
+        'schedule': 60.0,
+    },
+    'hourly-tile-cache-eviction': {
+        'task': 'apps.detection.tasks.evict_tile_cache',
+        'schedule': crontab(minute=30),
+    },
 }
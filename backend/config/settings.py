@@ -32,9 +32,14 @@ INSTALLED_APPS = [
     'apps.trees',
     'apps.tasks',
     'apps.reports',
+    'apps.detection',
+    'apps.metrics',
+    'apps.notifications',
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'apps.metrics.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # serve static files in production
     'corsheaders.middleware.CorsMiddleware',
@@ -97,6 +102,48 @@ else:
         }
     }
 
+# ── Cache ─────────────────────────────────────────────────────
+# Redis when REDIS_URL is set (shared by all workers), per-process memory otherwise
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': 'treetracker',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Cached report payloads are invalidated on every write; the timeout only
+# bounds staleness from writes that bypass model signals (queryset.update)
+REPORTS_CACHE_TIMEOUT = int(os.environ.get('REPORTS_CACHE_TIMEOUT', 3600))
+# Rows fetched per server-side cursor round trip when streaming exports
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+# Processes rendering PDF report sections in parallel
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 0))  # 0 = one per CPU
+# Benchmarks (manage.py benchmark): stored baseline, timed runs per case and
+# how far p95 latency may drift above the baseline before it counts as a regression
+BENCHMARK_BASELINE = os.environ.get('BENCHMARK_BASELINE', str(BASE_DIR / 'benchmarks' / 'baseline.json'))
+BENCHMARK_REPEAT = int(os.environ.get('BENCHMARK_REPEAT', 10))
+BENCHMARK_LATENCY_TOLERANCE = float(os.environ.get('BENCHMARK_LATENCY_TOLERANCE', 0.5))
+BENCHMARK_LATENCY_SLACK_MS = 5
+
+# ── Request metrics ───────────────────────────────────────────
+# Per-view query counts and timings, scraped from /api/metrics/ (see apps/metrics)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+# Bearer token Prometheus must send; without one /api/metrics/ only works in DEBUG
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Recent requests kept per worker for /api/metrics/hot-paths/
+METRICS_RECENT_REQUESTS = int(os.environ.get('METRICS_RECENT_REQUESTS', 1000))
+# Same SQL statement this many times in one request is logged as a possible N+1
+METRICS_N_PLUS_ONE_THRESHOLD = int(os.environ.get('METRICS_N_PLUS_ONE_THRESHOLD', 5))
+# Add X-Query-Count and Server-Timing headers to responses
+METRICS_RESPONSE_HEADERS = os.environ.get('METRICS_RESPONSE_HEADERS', str(DEBUG)) == 'True'
+
 AUTH_USER_MODEL = 'accounts.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -138,6 +185,17 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 50,
 }
 
+# ── Trees & map ───────────────────────────────────────────────
+# Below this zoom the map API returns grid clusters instead of single trees.
+# Changing it requires `python manage.py rebuild_clusters`.
+MAP_CLUSTER_ZOOM = int(os.environ.get('MAP_CLUSTER_ZOOM', 15))
+
+# Upper bound on detections accepted by one /api/trees/bulk-create/ request
+TREE_BULK_CREATE_MAX = int(os.environ.get('TREE_BULK_CREATE_MAX', 20000))
+# File imports (import_trees / /api/trees/import/): rows per COPY batch and max upload size
+TREE_IMPORT_BATCH_SIZE = int(os.environ.get('TREE_IMPORT_BATCH_SIZE', 5000))
+TREE_IMPORT_MAX_BYTES = int(os.environ.get('TREE_IMPORT_MAX_BYTES', 512 * 1024 * 1024))
+
 # ── JWT ───────────────────────────────────────────────────────
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
@@ -180,6 +238,43 @@ if USE_CLOUDINARY:
 CELERY_BROKER_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 CELERY_TIMEZONE = TIME_ZONE
+# Run tasks inline (no worker needed) — handy for local development
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+
+# ── Tree detection ────────────────────────────────────────────
+HF_TOKEN = os.environ.get('HF_TOKEN', '')
+HF_INFERENCE_URL = os.environ.get(
+    'HF_INFERENCE_URL',
+    'https://api-inference.huggingface.co/models/facebook/detr-resnet-50'
+)
+HF_INFERENCE_TIMEOUT = int(os.environ.get('HF_INFERENCE_TIMEOUT', 60))
+# Retries on cold-start 503s and network errors: 5s, 10s, 20s ... capped at 120s
+DETECTION_MAX_ATTEMPTS = int(os.environ.get('DETECTION_MAX_ATTEMPTS', 6))
+DETECTION_RETRY_BASE_DELAY = 5
+DETECTION_RETRY_MAX_DELAY = 120
+# 'remote' (HF DETR) or 'local' (NumPy vegetation index, no network needed)
+DETECTION_ENGINE = os.environ.get('DETECTION_ENGINE', 'remote')
+# Large images are split into overlapping chips, run in parallel and merged with NMS
+DETECTION_CHIP_SIZE = int(os.environ.get('DETECTION_CHIP_SIZE', 512))
+DETECTION_CHIP_OVERLAP = int(os.environ.get('DETECTION_CHIP_OVERLAP', 64))
+DETECTION_WORKERS = int(os.environ.get('DETECTION_WORKERS', 0))  # 0 = one per CPU
+DETECTION_NMS_IOU = 0.3
+# Largest image accepted by /api/detection/jobs/upload/
+DETECTION_UPLOAD_MAX_BYTES = int(os.environ.get('DETECTION_UPLOAD_MAX_BYTES', 50 * 1024 * 1024))
+
+# Satellite imagery for bbox detection jobs: an XYZ URL template,
+# an .mbtiles file or a z/x/y directory
+SATELLITE_TILE_SOURCE = os.environ.get(
+    'SATELLITE_TILE_SOURCE',
+    'https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}'
+)
+SATELLITE_TILE_ZOOM = 17
+SATELLITE_TILE_SIZE = 256
+SATELLITE_MAX_TILES = int(os.environ.get('SATELLITE_MAX_TILES', 1024))
+SATELLITE_TILE_WORKERS = 8
+SATELLITE_TILE_TIMEOUT = 20
+SATELLITE_TILE_CACHE_DIR = os.environ.get('SATELLITE_TILE_CACHE_DIR', str(BASE_DIR / 'tile_cache'))
+SATELLITE_TILE_CACHE_MAX_MB = int(os.environ.get('SATELLITE_TILE_CACHE_MAX_MB', 512))
 
 # ── Email ─────────────────────────────────────────────────────
 EMAIL_BACKEND = os.environ.get(
@@ -193,6 +288,33 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'treetracker@example.com')
 
+# ── Email outbox ──────────────────────────────────────────────
+# Provider the delivery worker sends through: 'resend' (HTTP API) or 'smtp' (EMAIL_BACKEND)
+RESEND_API_KEY = os.environ.get('RESEND_API_KEY', '')
+EMAIL_OUTBOX_BACKEND = os.environ.get('EMAIL_OUTBOX_BACKEND', 'resend' if RESEND_API_KEY else 'smtp')
+# Configurable so the stand-in server in apps/notifications/testing.py can be used
+RESEND_API_URL = os.environ.get('RESEND_API_URL', 'https://api.resend.com')
+# Concurrent provider requests, and the keep-alive connections kept for them
+EMAIL_OUTBOX_WORKERS = int(os.environ.get('EMAIL_OUTBOX_WORKERS', 4))
+# Provider requests per second (token bucket); Resend allows 2 by default. 0 = no limit
+EMAIL_OUTBOX_RATE_LIMIT = float(os.environ.get('EMAIL_OUTBOX_RATE_LIMIT', 2))
+EMAIL_OUTBOX_TIMEOUT = 30
+# Messages claimed per pass, and how long a claim holds before another worker may retake it
+EMAIL_OUTBOX_CLAIM_SIZE = 500
+EMAIL_OUTBOX_LEASE_SECONDS = 300
+# Retries: 30s, 60s, 120s ... capped at 1h; after the last attempt a message is marked dead
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 8))
+EMAIL_OUTBOX_RETRY_BASE_DELAY = 30
+EMAIL_OUTBOX_RETRY_MAX_DELAY = 3600
+# How long one deliver_outbox run keeps sending (it is scheduled every minute)
+EMAIL_OUTBOX_RUN_SECONDS = 50
+
+# ── Cron jobs ─────────────────────────────────────────────────
+# Shared secret for /api/cron/ (X-Cron-Token header)
+CRON_SECRET_TOKEN = os.environ.get('CRON_SECRET_TOKEN', '')
+# How long a worker may hold a run before another one may take it over
+CRON_LEASE_SECONDS = int(os.environ.get('CRON_LEASE_SECONDS', 900))
+
 # ── DRF Spectacular ───────────────────────────────────────────
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Tree & Green Asset Tracker API',
@@ -13,4 +13,6 @@ urlpatterns = [
     path('api/', include('apps.trees.urls')),
     path('api/', include('apps.tasks.urls')),
     path('api/', include('apps.reports.urls')),
+    path('api/', include('apps.detection.urls')),
+    path('api/', include('apps.metrics.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
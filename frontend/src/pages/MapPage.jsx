@@ -1,8 +1,9 @@
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { Link } from 'react-router-dom'
-import { MapContainer, TileLayer, CircleMarker, Popup } from 'react-leaflet'
+import { MapContainer, TileLayer, CircleMarker, Popup, Tooltip, useMapEvents } from 'react-leaflet'
 import 'leaflet/dist/leaflet.css'
 import api from '../services/api'
+import { decodePoints, POINTS_MEDIA_TYPE } from '../services/mapCodec'
 import { Filter } from 'lucide-react'
 
 const HEALTH_COLORS = {
@@ -11,39 +12,70 @@ const HEALTH_COLORS = {
   dead: '#ef4444',
 }
 
+// Reports the visible bounds and zoom whenever the user pans or zooms
+function ViewportWatcher({ onChange }) {
+  const map = useMapEvents({
+    moveend: () => onChange({ bounds: map.getBounds(), zoom: map.getZoom() }),
+  })
+  useEffect(() => { onChange({ bounds: map.getBounds(), zoom: map.getZoom() }) }, [])
+  return null
+}
+
+// Colour a cluster by its most common health status
+const dominantHealth = c =>
+  ['healthy', 'at_risk', 'dead'].reduce((a, b) => (c[b] > c[a] ? b : a), 'healthy')
+
 export default function MapPage() {
   const [trees, setTrees] = useState([])
   const [zones, setZones] = useState([])
   const [filters, setFilters] = useState({ zone: '', health: '' })
+  const [viewport, setViewport] = useState(null)
   const [loading, setLoading] = useState(true)
+  const requestId = useRef(0)
 
-  const fetchTrees = (params = {}) => {
+  const fetchTrees = (params = {}, viewport) => {
     const q = new URLSearchParams()
     if (params.zone) q.set('zone', params.zone)
     if (params.health) q.set('health', params.health)
-    return api.get(`/trees/map/?${q}`).then(r => setTrees(r.data))
+    if (viewport) {
+      q.set('bbox', viewport.bounds.toBBoxString())
+      q.set('zoom', viewport.zoom)
+    }
+    // Only the latest viewport wins when pans overlap
+    const id = ++requestId.current
+    return api.get(`/trees/map/?${q}`, {
+      headers: { Accept: POINTS_MEDIA_TYPE },
+      responseType: 'arraybuffer',
+    }).then(r => {
+      if (id === requestId.current) setTrees(decodePoints(r.data))
+    })
   }
 
   useEffect(() => {
-    Promise.all([
-      fetchTrees(),
-      api.get('/zones/').then(r => setZones(r.data.results || r.data)),
-    ]).finally(() => setLoading(false))
+    api.get('/zones/')
+      .then(r => setZones(r.data.results || r.data))
+      .finally(() => setLoading(false))
   }, [])
 
   useEffect(() => {
-    if (!loading) fetchTrees(filters)
-  }, [filters])
+    if (viewport) fetchTrees(filters, viewport)
+  }, [filters, viewport])
 
-  const center = trees.length > 0
-    ? [trees[0].latitude, trees[0].longitude]
+  const firstZone = zones.find(z => z.center_lat && z.center_lng)
+  const center = firstZone
+    ? [firstZone.center_lat, firstZone.center_lng]
     : [12.9716, 77.5946]
 
-  const counts = {
-    healthy: trees.filter(t => t.current_health === 'healthy').length,
-    at_risk: trees.filter(t => t.current_health === 'at_risk').length,
-    dead: trees.filter(t => t.current_health === 'dead').length,
-  }
+  // At low zoom the API returns clusters instead of trees
+  const clusters = trees.filter(t => t.cluster)
+  const points = trees.filter(t => !t.cluster)
+
+  const counts = ['healthy', 'at_risk', 'dead'].reduce((acc, h) => ({
+    ...acc,
+    [h]: points.filter(t => t.current_health === h).length +
+      clusters.reduce((sum, c) => sum + c[h], 0),
+  }), {})
+  const total = points.length + clusters.reduce((sum, c) => sum + c.count, 0)
 
   return (
     <div className="flex flex-col h-[calc(100vh-57px)]">
@@ -108,7 +140,34 @@ export default function MapPage() {
               attribution='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a>'
               url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
             />
-            {trees.map(tree => (
+            <ViewportWatcher onChange={setViewport} />
+            {clusters.map(c => (
+              <CircleMarker
+                key={`c-${c.latitude}-${c.longitude}`}
+                center={[c.latitude, c.longitude]}
+                radius={Math.min(10 + Math.log2(c.count) * 3, 32)}
+                pathOptions={{
+                  fillColor: HEALTH_COLORS[dominantHealth(c)],
+                  fillOpacity: 0.7,
+                  color: '#fff',
+                  weight: 2,
+                }}
+              >
+                <Tooltip direction="center" permanent className="!bg-transparent !border-0 !shadow-none font-semibold">
+                  {c.count}
+                </Tooltip>
+                <Popup>
+                  <div style={{ minWidth: 140, fontSize: 12 }}>
+                    <div style={{ fontWeight: 600, marginBottom: 4 }}>{c.count} trees</div>
+                    <div>🟢 Healthy: {c.healthy}</div>
+                    <div>🟡 At Risk: {c.at_risk}</div>
+                    <div>🔴 Dead: {c.dead}</div>
+                    <div style={{ color: '#888', marginTop: 6 }}>Zoom in to see individual trees</div>
+                  </div>
+                </Popup>
+              </CircleMarker>
+            ))}
+            {points.map(tree => (
               <CircleMarker
                 key={tree.id}
                 center={[tree.latitude, tree.longitude]}
@@ -144,8 +203,8 @@ export default function MapPage() {
 
         <div className="absolute bottom-4 left-4 bg-white rounded-xl shadow-lg px-4 py-3 z-[1000] border border-gray-100">
           <div className="text-xs text-gray-500 mb-1">Showing</div>
-          <div className="text-2xl font-bold text-gray-900">{trees.length}</div>
-          <div className="text-xs text-gray-500">trees on map</div>
+          <div className="text-2xl font-bold text-gray-900">{total}</div>
+          <div className="text-xs text-gray-500">trees in view</div>
         </div>
       </div>
     </div>
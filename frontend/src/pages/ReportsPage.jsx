@@ -7,6 +7,9 @@ import {
 } from 'recharts'
 import toast from 'react-hot-toast'
 
+const REPORT_POLL_MS = 2000
+const REPORT_TIMEOUT_MS = 5 * 60 * 1000
+
 export default function ReportsPage() {
   const [summary, setSummary] = useState(null)
   const [trends, setTrends] = useState([])
@@ -21,7 +24,17 @@ export default function ReportsPage() {
 
   const downloadPDF = async () => {
     try {
-      const res = await api.get('/reports/export/pdf/', { responseType: 'blob' })
+      // The report renders as a background job on the server — submit, then poll
+      let { data: job } = await api.post('/reports/export/pdf/')
+      const deadline = Date.now() + REPORT_TIMEOUT_MS
+      while (job.status !== 'completed' && job.status !== 'failed') {
+        if (Date.now() > deadline) throw new Error('Report is taking too long')
+        await new Promise(resolve => setTimeout(resolve, REPORT_POLL_MS))
+        job = (await api.get(`/reports/exports/${job.id}/`)).data
+      }
+      if (job.status === 'failed') throw new Error(job.error)
+
+      const res = await api.get(job.download_url, { responseType: 'blob' })
       const url = URL.createObjectURL(new Blob([res.data], { type: 'application/pdf' }))
       const a = document.createElement('a')
       a.href = url
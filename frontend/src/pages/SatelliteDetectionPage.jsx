@@ -1,13 +1,13 @@
 /**
  * Satellite Tree Detection
  * 1. User draws a rectangle on the Leaflet map
- * 2. We fetch satellite tiles from OpenStreetMap and stitch into one image
- * 3. Send to Hugging Face YOLO model for tree detection
- * 4. Convert pixel bounding boxes → GPS coordinates
- * 5. Show results overlay + bulk import to registry
+ * 2. The bbox is sent to the backend as a detection job; the server fetches
+ *    and caches the satellite tiles and runs the detector over them
+ * 3. Detections come back with GPS coordinates
+ * 4. Show results overlay + bulk import to registry
  */
-import { useState, useRef, useEffect, useCallback } from 'react'
-import { MapContainer, TileLayer, Rectangle, useMapEvents, useMap } from 'react-leaflet'
+import { useState, useEffect, useCallback } from 'react'
+import { MapContainer, TileLayer, Rectangle, CircleMarker, useMapEvents, useMap } from 'react-leaflet'
 import 'leaflet/dist/leaflet.css'
 import api from '../services/api'
 import toast from 'react-hot-toast'
@@ -28,161 +28,45 @@ const STEPS = {
   DONE: 'done',
 }
 
-// ── Tile math helpers ──────────────────────────────────────────────────────
-function latLngToTile(lat, lng, zoom) {
-  const n = Math.pow(2, zoom)
-  const x = Math.floor((lng + 180) / 360 * n)
-  const latRad = lat * Math.PI / 180
-  const y = Math.floor((1 - Math.log(Math.tan(latRad) + 1 / Math.cos(latRad)) / Math.PI) / 2 * n)
-  return { x, y }
-}
-
-function tileToLatLng(x, y, zoom) {
-  const n = Math.pow(2, zoom)
-  const lng = x / n * 360 - 180
-  const latRad = Math.atan(Math.sinh(Math.PI * (1 - 2 * y / n)))
-  const lat = latRad * 180 / Math.PI
-  return { lat, lng }
-}
-
-function pixelToLatLng(px, py, canvasW, canvasH, bounds) {
-  const { north, south, east, west } = bounds
-  const lat = north - (py / canvasH) * (north - south)
-  const lng = west + (px / canvasW) * (east - west)
-  return { lat, lng }
-}
-
-// ── Fetch and stitch satellite tiles ──────────────────────────────────────
-async function fetchSatelliteTiles(bounds, zoom = 17) {
-  const { north, south, east, west } = bounds
-  const topLeft = latLngToTile(north, west, zoom)
-  const bottomRight = latLngToTile(south, east, zoom)
+// ── Run tree detection as a backend job ───────────────────────────────────
+const DETECTION_POLL_MS = 2000
+const DETECTION_TIMEOUT_MS = 5 * 60 * 1000
 
-  const tilesX = bottomRight.x - topLeft.x + 1
-  const tilesY = bottomRight.y - topLeft.y + 1
-
-  // Limit to reasonable area
-  if (tilesX * tilesY > 16) {
-    throw new Error('Area too large — please draw a smaller rectangle (max ~500m × 500m)')
-  }
+async function detectTrees(bounds) {
+  // Detection runs as a background job on the server — submit, then poll
+  const { data: job } = await api.post('/detection/jobs/', {
+    bbox: [bounds.west, bounds.south, bounds.east, bounds.north],
+  })
 
-  const TILE_SIZE = 256
-  const canvasW = tilesX * TILE_SIZE
-  const canvasH = tilesY * TILE_SIZE
-
-  const canvas = document.createElement('canvas')
-  canvas.width = canvasW
-  canvas.height = canvasH
-  const ctx = canvas.getContext('2d')
-
-  // Fetch all tiles in parallel
-  const promises = []
-  for (let tx = topLeft.x; tx <= bottomRight.x; tx++) {
-    for (let ty = topLeft.y; ty <= bottomRight.y; ty++) {
-      const px = (tx - topLeft.x) * TILE_SIZE
-      const py = (ty - topLeft.y) * TILE_SIZE
-      // Use OpenStreetMap satellite-style via ESRI (public, free)
-      const url = `https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/${zoom}/${ty}/${tx}`
-      promises.push(
-        fetch(url)
-          .then(r => r.blob())
-          .then(blob => new Promise((resolve, reject) => {
-            const img = new Image()
-            img.onload = () => { ctx.drawImage(img, px, py); resolve() }
-            img.onerror = reject
-            img.src = URL.createObjectURL(blob)
-          }))
-      )
+  const deadline = Date.now() + DETECTION_TIMEOUT_MS
+  let current = job
+  while (current.status !== 'completed' && current.status !== 'failed') {
+    if (Date.now() > deadline) {
+      throw new Error('Detection is taking too long — please try again later')
     }
+    await new Promise(resolve => setTimeout(resolve, DETECTION_POLL_MS))
+    current = (await api.get(`/detection/jobs/${job.id}/`)).data
   }
 
-  await Promise.all(promises)
-
-  // Calculate actual bounds of stitched image
-  const actualBounds = {
-    north: tileToLatLng(topLeft.x, topLeft.y, zoom).lat,
-    west: tileToLatLng(topLeft.x, topLeft.y, zoom).lng,
-    south: tileToLatLng(bottomRight.x + 1, bottomRight.y + 1, zoom).lat,
-    east: tileToLatLng(bottomRight.x + 1, bottomRight.y + 1, zoom).lng,
+  if (current.status === 'failed') {
+    throw new Error(current.error || 'Detection failed')
   }
-
-  return {
-    canvas,
-    base64: canvas.toDataURL('image/jpeg', 0.85).split(',')[1],
-    width: canvasW,
-    height: canvasH,
-    bounds: actualBounds,
+  if (!Array.isArray(current.result)) {
+    throw new Error('Unexpected response from detection model')
   }
-}
-
-// ── Call backend proxy for tree detection (avoids CORS on HF) ────────────
-async function detectTreesHF(base64Image, hfToken) {
-  // HF blocks direct browser requests with CORS — we proxy through Django
-  const response = await api.post('/trees/detect-satellite/', {
-    image_base64: base64Image,
-    mime_type: 'image/jpeg',
-  })
-
-  if (response.status === 503) {
-    throw new Error('Model is warming up — please wait 15 seconds and try again')
-  }
-
-  const data = response.data
-  if (!Array.isArray(data)) {
-    if (data?.error === 'model_loading') {
-      throw new Error('HF model is warming up — please wait 15 seconds and try again')
-    }
-    throw new Error(data?.error || 'Unexpected response from detection model')
-  }
-  return data
+  return current.result
 }
 
 // Filter detections to likely trees/vegetation
-function filterTreeDetections(detections, imgW, imgH) {
+function filterTreeDetections(detections) {
   const TREE_LABELS = ['tree', 'plant', 'potted plant', 'broccoli', 'bush', 'shrub', 'palm tree', 'flower']
-  // For satellite imagery, we use a heuristic: look for roughly circular
-  // mid-sized objects (tree canopies are 5-20% of image width typically)
-  return detections
-    .filter(d => {
-      const label = d.label?.toLowerCase() || ''
-      const score = d.score || 0
-      const box = d.box || {}
-      const w = (box.xmax - box.xmin) / imgW
-      const h = (box.ymax - box.ymin) / imgH
-      const isVegetation = TREE_LABELS.some(t => label.includes(t))
-      const isReasonableSize = w > 0.02 && w < 0.4 && h > 0.02 && h < 0.4
-      // Accept vegetation labels OR any detection with reasonable canopy-like size + good confidence
-      return (isVegetation || (score > 0.7 && isReasonableSize)) && score > 0.4
-    })
-    .map(d => ({
-      ...d,
-      // Center of bounding box = tree trunk position estimate
-      cx: ((d.box.xmin + d.box.xmax) / 2),
-      cy: ((d.box.ymin + d.box.ymax) / 2),
-    }))
-}
-
-// ── Draw detections on canvas ──────────────────────────────────────────────
-function drawDetections(canvas, detections) {
-  const ctx = canvas.getContext('2d')
-  ctx.strokeStyle = '#22c55e'
-  ctx.lineWidth = 3
-  ctx.fillStyle = 'rgba(34, 197, 94, 0.15)'
-  ctx.font = 'bold 12px sans-serif'
-
-  detections.forEach((d, i) => {
-    const { xmin, ymin, xmax, ymax } = d.box
-    ctx.fillRect(xmin, ymin, xmax - xmin, ymax - ymin)
-    ctx.strokeRect(xmin, ymin, xmax - xmin, ymax - ymin)
-
-    // Label
-    ctx.fillStyle = '#16a34a'
-    ctx.fillRect(xmin, ymin - 18, 60, 18)
-    ctx.fillStyle = '#fff'
-    ctx.fillText(`🌳 ${Math.round(d.score * 100)}%`, xmin + 3, ymin - 4)
-    ctx.fillStyle = 'rgba(34, 197, 94, 0.15)'
+  return detections.filter(d => {
+    const label = d.label?.toLowerCase() || ''
+    const score = d.score || 0
+    const isVegetation = TREE_LABELS.some(t => label.includes(t))
+    // Accept vegetation labels OR any confident detection
+    return (isVegetation || score > 0.7) && score > 0.4
   })
-  return canvas.toDataURL()
 }
 
 // ── Rectangle Draw Tool ───────────────────────────────────────────────────
@@ -230,14 +114,10 @@ export default function SatelliteDetectionPage() {
   const [step, setStep] = useState(STEPS.DRAW)
   const [drawing, setDrawing] = useState(false)
   const [selectedBounds, setSelectedBounds] = useState(null)
-  const [resultImage, setResultImage] = useState(null)
   const [detections, setDetections] = useState([])
   const [treeCoords, setTreeCoords] = useState([])
-  const [imageMeta, setImageMeta] = useState(null)
   const [statusMsg, setStatusMsg] = useState('')
   const [importResult, setImportResult] = useState(null)
-  const [hfToken, setHfToken] = useState(import.meta.env.VITE_HF_TOKEN || '')
-  const canvasRef = useRef(null)
 
   const handleBoundsSet = useCallback((bounds) => {
     setSelectedBounds(bounds)
@@ -248,10 +128,8 @@ export default function SatelliteDetectionPage() {
     setStep(STEPS.DRAW)
     setDrawing(false)
     setSelectedBounds(null)
-    setResultImage(null)
     setDetections([])
     setTreeCoords([])
-    setImageMeta(null)
     setImportResult(null)
     setStatusMsg('')
   }
@@ -261,31 +139,18 @@ export default function SatelliteDetectionPage() {
     setStep(STEPS.DETECTING)
 
     try {
-      // Step 1: Fetch satellite tiles
-      setStatusMsg('📡 Fetching satellite imagery...')
-      const imageData = await fetchSatelliteTiles(selectedBounds, 17)
-      setImageMeta(imageData)
-
-      // Step 2: Run detection via backend proxy
-      setStatusMsg('🤖 Running AI tree detection (may take 10-20s on first run)...')
-      const raw = await detectTreesHF(imageData.base64, hfToken)
+      // Step 1: Server fetches the imagery and runs detection
+      setStatusMsg('🤖 Fetching satellite imagery and running tree detection...')
+      const raw = await detectTrees(selectedBounds)
 
-      if (!Array.isArray(raw)) {
-        throw new Error(raw?.error || 'Unexpected response from detection model')
-      }
-
-      // Step 3: Filter to trees
+      // Step 2: Filter to trees
       setStatusMsg('🌳 Filtering vegetation detections...')
-      const trees = filterTreeDetections(raw, imageData.width, imageData.height)
-
-      // Step 4: Draw boxes on image
-      const annotatedUrl = drawDetections(imageData.canvas, trees)
-      setResultImage(annotatedUrl)
+      const trees = filterTreeDetections(raw)
       setDetections(trees)
 
-      // Step 5: Convert pixel coords → GPS
       const coords = trees.map(d => ({
-        ...pixelToLatLng(d.cx, d.cy, imageData.width, imageData.height, imageData.bounds),
+        lat: d.latitude,
+        lng: d.longitude,
         confidence: d.score,
         label: d.label,
       }))
@@ -375,6 +240,14 @@ export default function SatelliteDetectionPage() {
                 pathOptions={{ color: '#7c3aed', weight: 2, fillOpacity: 0.1 }}
               />
             )}
+            {treeCoords.map((c, i) => (
+              <CircleMarker
+                key={i}
+                center={[c.lat, c.lng]}
+                radius={5}
+                pathOptions={{ color: '#22c55e', weight: 2, fillOpacity: 0.5 }}
+              />
+            ))}
           </MapContainer>
 
           {/* Draw instruction overlay */}
@@ -466,7 +339,7 @@ export default function SatelliteDetectionPage() {
                       <strong>Tips for best results:</strong>
                       <ul className="mt-1 space-y-1">
                         <li>• Zoom in to a tree-dense area first</li>
-                        <li>• Draw a small area (100m × 100m works best)</li>
+                        <li>• Large areas (up to a whole ward) work but take longer</li>
                         <li>• Areas with clear canopy separation detect better</li>
                         <li>• First run may take 20-30s (model warmup)</li>
                       </ul>
@@ -486,12 +359,6 @@ export default function SatelliteDetectionPage() {
                   </span>
                 </div>
 
-                {resultImage && (
-                  <div className="rounded-xl overflow-hidden border border-gray-200">
-                    <img src={resultImage} alt="Detection results" className="w-full" />
-                  </div>
-                )}
-
                 <div className="space-y-2">
                   {detections.slice(0, 6).map((d, i) => (
                     <div key={i} className="flex items-center justify-between text-xs p-2 bg-gray-50 rounded-lg">
@@ -0,0 +1,71 @@
+// Decoder for the compact map payload (application/vnd.treetracker.points).
+// Layout is documented in backend/apps/trees/renderers.py.
+
+export const POINTS_MEDIA_TYPE = 'application/vnd.treetracker.points'
+
+const MISSING_DAYS = -(2 ** 31)
+const DAY_MS = 24 * 60 * 60 * 1000
+
+const TYPED_ARRAYS = {
+  f: Float32Array,
+  I: Uint32Array,
+  i: Int32Array,
+  H: Uint16Array,
+  B: Uint8Array,
+}
+
+const toIsoDate = days =>
+  days === MISSING_DAYS ? null : new Date(days * DAY_MS).toISOString().slice(0, 10)
+
+export function decodePoints(buffer) {
+  const view = new DataView(buffer)
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4))
+  if (magic !== 'TTP1') throw new Error('Unexpected map payload')
+
+  const count = view.getUint32(4, true)
+  const headerLength = view.getUint32(8, true)
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 12, headerLength)))
+
+  const columns = {}
+  let offset = 12 + headerLength
+  for (const [name, typecode] of header.layout) {
+    const Type = TYPED_ARRAYS[typecode]
+    columns[name] = new Type(buffer, offset, count)
+    offset += count * Type.BYTES_PER_ELEMENT
+    offset += (4 - (offset % 4)) % 4
+  }
+
+  const rows = new Array(count)
+  if (header.kind === 'clusters') {
+    for (let i = 0; i < count; i++) {
+      rows[i] = {
+        cluster: true,
+        latitude: columns.latitude[i],
+        longitude: columns.longitude[i],
+        count: columns.count[i],
+        healthy: columns.healthy[i],
+        at_risk: columns.at_risk[i],
+        dead: columns.dead[i],
+      }
+    }
+    return rows
+  }
+
+  const { health, species, zone } = header.dictionaries
+  let id = 0
+  for (let i = 0; i < count; i++) {
+    id += columns.id[i]
+    rows[i] = {
+      id,
+      latitude: columns.latitude[i],
+      longitude: columns.longitude[i],
+      current_health: health[columns.health[i]],
+      species__common_name: species[columns.species[i]],
+      zone__name: zone[columns.zone[i]],
+      planted_date: toIsoDate(columns.planted_date[i]),
+      tag_number: header.strings.tag_number[i],
+      photo: header.strings.photo[i],
+    }
+  }
+  return rows
+}